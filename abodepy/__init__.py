@@ -24,23 +24,24 @@ much as possible. Please use this module responsibly.
 import json
 import logging
 import os
+import time
 import requests
 from requests.exceptions import RequestException
 
+from abodepy.auth import AbodeAuth
 from abodepy.automation import AbodeAutomation
-from abodepy.devices.binary_sensor import AbodeBinarySensor
-from abodepy.devices.camera import AbodeCamera
-from abodepy.devices.cover import AbodeCover
-from abodepy.devices.light import AbodeLight
-from abodepy.devices.lock import AbodeLock
-from abodepy.devices.switch import AbodeSwitch
-from abodepy.devices.sensor import AbodeSensor
-from abodepy.devices.valve import AbodeValve
-from abodepy.event_controller import AbodeEventController
-from abodepy.exceptions import AbodeAuthenticationException, AbodeException
+from abodepy.device_store import AbodeDeviceStore
+from abodepy.exceptions import (
+    AbodeAuthenticationException, AbodeException, AbodeNotFoundException)
+from abodepy.metrics import MetricsRegistry
+from abodepy.optimistic import AbodeOptimisticState
+from abodepy.tracing import AbodeTracer, traced
 import abodepy.devices.alarm as ALARM
+import abodepy.devices.registry as DEVICE_REGISTRY
 import abodepy.helpers.constants as CONST
 import abodepy.helpers.errors as ERROR
+import abodepy.metrics as METRICS
+import abodepy.tracing as TRACING
 import abodepy.utils as UTILS
 
 _LOGGER = logging.getLogger(__name__)
@@ -51,7 +52,9 @@ class Abode():
 
     def __init__(self, username=None, password=None,
                  auto_login=False, get_devices=False, get_automations=False,
-                 cache_path=CONST.CACHE_PATH, disable_cache=False):
+                 cache_path=CONST.CACHE_PATH, disable_cache=False,
+                 metrics=None, tracer=None, optimistic=False,
+                 session_path=None, broker_path=None):
         """Init Abode object."""
         self._session = None
         self._token = None
@@ -60,8 +63,31 @@ class Abode():
         self._cache_path = cache_path
         self._disable_cache = disable_cache
 
-        self._event_controller = AbodeEventController(self,
-                                                      url=CONST.SOCKETIO_URL)
+        # Instrumentation is disabled until metrics.enable() is called
+        self._metrics = metrics or MetricsRegistry()
+
+        # Spans are no-ops unless an OpenTelemetry compatible tracer is set
+        self._tracer = AbodeTracer(tracer)
+
+        # Concurrent requests share a single re-login, and processes
+        # sharing a session file share a single login between them
+        session_store = None
+
+        if session_path:
+            from abodepy.session_store import AbodeSessionStore
+
+            session_store = AbodeSessionStore(session_path)
+
+        self._auth = AbodeAuth(self, store=session_store)
+
+        # Device commands wait for Abode to confirm them unless enabled
+        self._optimistic = AbodeOptimisticState(self, optimistic)
+
+        # The event controller (and the SocketIO stack) is created on first
+        # use of the events property to keep imports light. With a broker
+        # path events come from a local AbodeEventBroker instead.
+        self._event_controller = None
+        self._broker_path = broker_path
 
         self._default_alarm_mode = CONST.MODE_AWAY
 
@@ -69,6 +95,10 @@ class Abode():
 
         self._automations = None
 
+        self._timeline = None
+
+        self._settings = None
+
         # Create a requests session to persist the cookies
         self._session = requests.session()
 
@@ -103,7 +133,7 @@ class Abode():
         if (self._cache[CONST.ID] is not None and
                 self._cache[CONST.PASSWORD] is not None and
                 auto_login):
-            self.login()
+            self._auth.ensure()
 
         if get_devices:
             self.get_devices()
@@ -112,12 +142,20 @@ class Abode():
             self.get_automations()
 
     def login(self, username=None, password=None, mfa_code=None):
-        """Explicit Abode login."""
+        """Explicit Abode login.
+
+        With a session path a session another process logged in is used
+        instead, if there is a usable one.
+        """
         if username is not None:
             self._cache[CONST.ID] = username
         if password is not None:
             self._cache[CONST.PASSWORD] = password
 
+        return self._auth.login(mfa_code)
+
+    @traced(TRACING.LOGIN)
+    def _login(self, mfa_code=None):
         if (self._cache[CONST.ID] is None or
                 not isinstance(self._cache[CONST.ID], str)):
             raise AbodeAuthenticationException(ERROR.USERNAME)
@@ -140,6 +178,8 @@ class Abode():
             login_data[CONST.MFA_CODE] = mfa_code
             login_data['remember_me'] = 1
 
+        self._metrics.inc(METRICS.LOGINS)
+
         response = self._session.post(CONST.LOGIN_URL, json=login_data)
 
         if response.status_code != 200:
@@ -155,8 +195,9 @@ class Abode():
 
             raise AbodeAuthenticationException(ERROR.UNKNOWN_MFA_TYPE)
 
-        # Persist cookies (which contains the UUID and the session ID) to disk
-        if self._session.cookies.get_dict():
+        # Persist cookies (which contains the UUID and the session ID) to
+        # disk, unless they are shared in the session store
+        if self._auth.store is None and self._session.cookies.get_dict():
             self._cache[CONST.COOKIES] = self._session.cookies
             self._save_cache()
 
@@ -175,6 +216,8 @@ class Abode():
         self._user = response_object['user']
         self._oauth_token = oauth_response_object['access_token']
 
+        self._auth.logged_in(response_object, oauth_response_object)
+
         _LOGGER.info("Login successful")
 
         return True
@@ -186,6 +229,7 @@ class Abode():
                 'ABODE-API-KEY': self._token
             }
 
+            self._auth.reset()
             self._session = requests.session()
             self._token = None
             self._panel = None
@@ -216,11 +260,12 @@ class Abode():
         self.get_devices(refresh=True)
         self.get_automations(refresh=True)
 
+    @traced(TRACING.GET_DEVICES)
     def get_devices(self, refresh=False, generic_type=None):
         """Get all devices from Abode."""
         if refresh or self._devices is None:
             if self._devices is None:
-                self._devices = {}
+                self._devices = AbodeDeviceStore()
 
             _LOGGER.info("Updating all devices...")
             response = self.send_request("get", CONST.DEVICES_URL)
@@ -232,6 +277,8 @@ class Abode():
 
             _LOGGER.debug("Get Devices Response: %s", response.text)
 
+            new_devices = []
+
             for device_json in response_object:
                 # Attempt to reuse an existing device
                 device = self._devices.get(device_json['id'])
@@ -240,16 +287,11 @@ class Abode():
                 if device:
                     device.update(device_json)
                 else:
+                    # Unknown device types are logged once by the registry
                     device = new_device(device_json, self)
 
-                    if not device:
-                        _LOGGER.debug(
-                            "Skipping unknown device: %s",
-                            device_json)
-
-                        continue
-
-                    self._devices[device.device_id] = device
+                    if device:
+                        new_devices.append(device)
 
             # We will be treating the Abode panel itself as an armable device.
             panel_response = self.send_request("get", CONST.PANEL_URL)
@@ -259,13 +301,19 @@ class Abode():
 
             _LOGGER.debug("Get Mode Panel Response: %s", response.text)
 
-            alarm_device = self._devices.get(CONST.ALARM_DEVICE_ID + '1')
+            # One alarm device per area, each with its own copy of the
+            # panel json so device state is only changed by its update
+            for area in ALARM.get_areas(self._panel):
+                alarm_device = self._devices.get(CONST.ALARM_DEVICE_ID + area)
 
-            if alarm_device:
-                alarm_device.update(self._panel)
-            else:
-                alarm_device = ALARM.create_alarm(self._panel, self)
-                self._devices[alarm_device.device_id] = alarm_device
+                if alarm_device:
+                    alarm_device.update(panel_json)
+                else:
+                    new_devices.append(ALARM.create_alarm(
+                        dict(self._panel), self, area))
+
+            # Publish all new devices as one snapshot
+            self._devices.update(new_devices)
 
         if generic_type:
             devices = []
@@ -275,7 +323,7 @@ class Abode():
                     devices.append(device)
             return devices
 
-        return list(self._devices.values())
+        return self._devices.values()
 
     def get_device(self, device_id, refresh=False):
         """Get a single device."""
@@ -308,18 +356,24 @@ class Abode():
             _LOGGER.debug("Get Automations Response: %s", response.text)
 
             for automation_json in response_object:
-                # Attempt to reuse an existing automation object
-                automation = self._automations.get(str(automation_json['id']))
-
-                # No existing automation, create a new one
-                if automation:
-                    automation.update(automation_json)
-                else:
-                    automation = AbodeAutomation(self, automation_json)
-                    self._automations[automation.automation_id] = automation
+                self._update_automation(automation_json)
 
         return list(self._automations.values())
 
+    def _update_automation(self, automation_json):
+        """Update a cached automation from its json, adding it if new."""
+        # Attempt to reuse an existing automation object
+        automation = self._automations.get(str(automation_json['id']))
+
+        # No existing automation, create a new one
+        if automation:
+            automation.update(automation_json)
+        else:
+            automation = AbodeAutomation(self, automation_json)
+            self._automations[automation.automation_id] = automation
+
+        return automation
+
     def get_automation(self, automation_id, refresh=False):
         """Get a single automation."""
         if self._automations is None:
@@ -333,6 +387,29 @@ class Abode():
 
         return automation
 
+    def execute_batch(self, commands, max_workers=CONST.BATCH_MAX_WORKERS):
+        """Run device commands concurrently, returning per command results.
+
+        Commands are (device or device_id, action, *args) tuples, e.g.
+        ('ZW:00000003', 'lock') or (light, 'set_level', 50).
+        """
+        from abodepy.batch import AbodeBatch
+        return AbodeBatch(self, max_workers).execute(commands)
+
+    def enable_automations(self, automations, enable=True,
+                           max_workers=CONST.BATCH_MAX_WORKERS):
+        """Enable or disable automations concurrently."""
+        from abodepy.batch import AbodeBatch
+        return AbodeBatch(self, max_workers).execute_automations(
+            automations, 'enable' if enable else 'disable')
+
+    def trigger_automations(self, automations,
+                            max_workers=CONST.BATCH_MAX_WORKERS):
+        """Trigger automations concurrently."""
+        from abodepy.batch import AbodeBatch
+        return AbodeBatch(self, max_workers).execute_automations(
+            automations, 'trigger')
+
     def get_alarm(self, area='1', refresh=False):
         """Shortcut method to get the alarm device."""
         if self._devices is None:
@@ -341,6 +418,31 @@ class Abode():
 
         return self.get_device(CONST.ALARM_DEVICE_ID + area, refresh)
 
+    def get_alarms(self, refresh=False):
+        """Get the alarm devices of all areas."""
+        return self.get_devices(refresh, generic_type=CONST.TYPE_ALARM)
+
+    def set_modes(self, modes, max_workers=CONST.BATCH_MAX_WORKERS):
+        """Set the mode of many areas concurrently.
+
+        Modes are an {area: mode} dict, or one mode for every area.
+        """
+        if not isinstance(modes, dict):
+            modes = {alarm.area: modes for alarm in self.get_alarms()}
+
+        commands = []
+
+        for area, mode in modes.items():
+            alarm = self.get_alarm(str(area))
+
+            if not alarm:
+                raise AbodeException(ERROR.INVALID_DEVICE_ID,
+                                     CONST.ALARM_DEVICE_ID + str(area))
+
+            commands.append((alarm, 'set_mode', mode))
+
+        return self.execute_batch(commands, max_workers)
+
     def set_default_mode(self, default_mode):
         """Set the default mode when alarms are turned 'on'."""
         if default_mode.lower() not in (CONST.MODE_AWAY, CONST.MODE_HOME):
@@ -350,6 +452,29 @@ class Abode():
 
     def set_setting(self, setting, value, area='1', validate_value=True):
         """Set an abode system setting to a given value."""
+        url, data = self._setting_request(setting, value, area,
+                                          validate_value)
+
+        response = self.send_request(method="put", url=url, data=data)
+
+        if self._settings:
+            self._settings.apply(setting, value, area)
+
+        return response
+
+    def set_settings(self, settings, area='1', validate_value=True,
+                     max_workers=CONST.BATCH_MAX_WORKERS):
+        """Set many abode system settings, returning per setting results.
+
+        Settings are a {setting: value} dict or (setting, value[, area])
+        tuples. All values are validated before anything is sent.
+        """
+        from abodepy.batch import AbodeBatch
+        return AbodeBatch(self, max_workers).execute_settings(
+            settings, area, validate_value)
+
+    def _setting_request(self, setting, value, area, validate_value):
+        """Will validate a setting and value, returns url and data packet."""
         setting = setting.lower()
 
         if setting not in CONST.ALL_SETTINGS:
@@ -368,7 +493,7 @@ class Abode():
             url = CONST.SIREN_URL
             data = self._siren_settings(setting, value, validate_value)
 
-        return self.send_request(method="put", url=url, data=data)
+        return url, data
 
     @staticmethod
     def _panel_settings(setting, value, validate_value):
@@ -435,8 +560,7 @@ class Abode():
     def send_request(self, method, url, headers=None,
                      data=None, is_retry=False):
         """Send requests to Abode."""
-        if not self._token:
-            self.login()
+        generation = self._auth.ensure()
 
         if not headers:
             headers = {}
@@ -444,34 +568,114 @@ class Abode():
         headers['Authorization'] = 'Bearer ' + self._oauth_token
         headers['ABODE-API-KEY'] = self._token
 
+        if self._metrics.enabled:
+            labels = {
+                'method': method,
+                'endpoint': METRICS.endpoint(url, CONST.BASE_URL)
+            }
+            start = time.perf_counter()
+
         try:
-            response = getattr(self._session, method)(
-                url, headers=headers, json=data)
+            with self._tracer.span(TRACING.SEND_REQUEST, {
+                    'http.method': method.upper(),
+                    'http.url': url,
+                    'abodepy.retry': is_retry}) as span:
+                response = getattr(self._session, method)(
+                    url, headers=headers, json=data)
+
+                span.set_attribute('http.status_code', response.status_code)
+
+            if self._metrics.enabled:
+                self._observe_request(labels, start, response.status_code)
 
             if response and response.status_code < 400:
                 return response
+
+            # A new token won't find what is gone, keep the current one
+            if response.status_code == 404:
+                raise AbodeNotFoundException((ERROR.NOT_FOUND), url)
         except RequestException:
             _LOGGER.info("Abode connection reset...")
 
+            if self._metrics.enabled:
+                self._observe_request(labels, start, 'error')
+
         if not is_retry:
             # Delete our current token and try again -- will force a login
-            # attempt.
-            self._token = None
+            # attempt, shared with any other request that failed with it.
+            self._auth.invalidate(generation)
+
+            self._metrics.inc(METRICS.REQUEST_RETRIES)
 
             return self.send_request(method, url, headers, data, True)
 
         raise AbodeException((ERROR.REQUEST))
 
+    def _observe_request(self, labels, start, status):
+        self._metrics.observe(METRICS.REQUEST_SECONDS,
+                              time.perf_counter() - start, labels)
+        self._metrics.inc(METRICS.REQUESTS, dict(labels, status=str(status)))
+
     @property
     def default_mode(self):
         """Get the default mode."""
         return self._default_alarm_mode
 
+    @property
+    def metrics(self):
+        """Get the metrics registry."""
+        return self._metrics
+
+    @property
+    def tracer(self):
+        """Get the tracer adapter; enable it with set_tracer on the adapter."""
+        return self._tracer
+
+    @property
+    def optimistic(self):
+        """Get the optimistic device state tracker."""
+        return self._optimistic
+
+    @property
+    def device_snapshot(self):
+        """Get an immutable, versioned snapshot of the devices.
+
+        The version increases whenever a device is added, removed or
+        changes state.
+        """
+        if self._devices is None:
+            self.get_devices()
+
+        return self._devices.snapshot
+
     @property
     def events(self):
         """Get the event controller."""
+        if self._event_controller is None:
+            from abodepy.event_controller import AbodeEventController
+            self._event_controller = AbodeEventController(
+                self, url=CONST.SOCKETIO_URL, broker_path=self._broker_path)
+
         return self._event_controller
 
+    @property
+    def panel_settings(self):
+        """Get the cached panel settings, loaded on first read."""
+        if self._settings is None:
+            from abodepy.panel_settings import AbodePanelSettings
+            self._settings = AbodePanelSettings(self)
+
+        return self._settings
+
+    @property
+    def timeline(self):
+        """Get the timeline history, cached in memory."""
+        if self._timeline is None:
+            from abodepy.timeline_history import AbodeTimelineHistory
+            self._timeline = AbodeTimelineHistory(self)
+
+        return self._timeline
+
     @property
     def uuid(self):
         """Get the UUID."""
@@ -504,59 +708,6 @@ class Abode():
             UTILS.save_cache(self._cache, self._cache_path)
 
 
-def _new_sensor(device_json, abode):
-    statuses = device_json.get(CONST.STATUSES_KEY, {})
-
-    if any(key in statuses for key in CONST.SENSOR_KEYS):
-        device_json['generic_type'] = CONST.TYPE_SENSOR
-        return AbodeSensor(device_json, abode)
-
-    version = device_json.get('version', '')
-
-    # this.version.startsWith('MINIPIR') == true ? 'Occupancy Sensor'
-    # : 'Motion Sensor';
-    if version and version.lower().startswith('minipir'):
-        device_json['generic_type'] = CONST.TYPE_OCCUPANCY
-    else:
-        device_json['generic_type'] = CONST.TYPE_MOTION
-
-    return AbodeBinarySensor(device_json, abode)
-
-
 def new_device(device_json, abode):
     """Create new device object for the given type."""
-    type_tag = device_json.get('type_tag')
-
-    if not type_tag:
-        raise AbodeException((ERROR.UNABLE_TO_MAP_DEVICE))
-
-    generic_type = CONST.get_generic_type(type_tag.lower())
-    device_json['generic_type'] = generic_type
-
-    if (generic_type in
-            [CONST.TYPE_CONNECTIVITY, CONST.TYPE_MOISTURE,
-             CONST.TYPE_OPENING]):
-        return AbodeBinarySensor(device_json, abode)
-
-    if generic_type == CONST.TYPE_CAMERA:
-        return AbodeCamera(device_json, abode)
-
-    if generic_type == CONST.TYPE_COVER:
-        return AbodeCover(device_json, abode)
-
-    if generic_type == CONST.TYPE_LIGHT:
-        return AbodeLight(device_json, abode)
-
-    if generic_type == CONST.TYPE_LOCK:
-        return AbodeLock(device_json, abode)
-
-    if generic_type == CONST.TYPE_SWITCH:
-        return AbodeSwitch(device_json, abode)
-
-    if generic_type == CONST.TYPE_VALVE:
-        return AbodeValve(device_json, abode)
-
-    if generic_type == CONST.TYPE_UNKNOWN_SENSOR:
-        return _new_sensor(device_json, abode)
-
-    return None
+    return DEVICE_REGISTRY.create_device(device_json, abode)
@@ -18,13 +18,14 @@ much as possible. Please use this module responsibly.
 """
 import json
 import logging
+import sys
 import time
 
 import argparse
 
 import abodepy
-import abodepy.helpers.timeline as TIMELINE
 from abodepy.exceptions import AbodeException
+import abodepy.helpers.constants as CONST
 
 _LOGGER = logging.getLogger('abodecl')
 
@@ -42,6 +43,12 @@ def setup_logging(log_level=logging.INFO):
     logging.getLogger('urllib3').setLevel(logging.WARNING)
     logging.getLogger('aiohttp.access').setLevel(logging.WARNING)
 
+    # Colors are only useful on a terminal, skip importing colorlog when
+    # running from cron or with redirected output.
+    if not sys.stderr.isatty():
+        logging.getLogger('').setLevel(log_level)
+        return
+
     try:
         from colorlog import ColoredFormatter
         logging.getLogger().handlers[0].setFormatter(ColoredFormatter(
@@ -187,6 +194,18 @@ def get_arguments():
         help='Block and listen for device_id',
         required=False, default=False, action="store_true")
 
+    parser.add_argument(
+        '--serve',
+        help='Block and serve commands on a local control socket',
+        required=False, default=False, action="store_true")
+
+    parser.add_argument(
+        '--socket',
+        metavar='socket_file',
+        help='Control socket to serve on, or to send commands to a running '
+             '--serve daemon',
+        required=False)
+
     parser.add_argument(
         '--debug',
         help='Enable debug logging',
@@ -200,6 +219,77 @@ def get_arguments():
     return parser.parse_args()
 
 
+def call_daemon(args):
+    """Execute the command line arguments against a running daemon."""
+    from abodepy.daemon import AbodeDaemonClient
+
+    client = AbodeDaemonClient(args.socket)
+
+    def _execute(command, message, **kwargs):
+        try:
+            result = client.execute(command, **kwargs)
+        except AbodeException as exc:
+            _LOGGER.warning("%s: %s", exc, exc.details)
+            return None
+
+        if message and result:
+            _LOGGER.info(message, *kwargs.values())
+
+        return result
+
+    if args.mode:
+        _LOGGER.info("Current alarm mode: %s", _execute('mode', None))
+
+    if args.arm:
+        _execute('arm', "Alarm mode changed to: %s", mode=args.arm)
+
+    for setting in args.set or []:
+        keyval = setting.split("=")
+        _execute('set', "Setting %s changed to %s",
+                 setting=keyval[0], value=keyval[1])
+
+    for command, message, device_ids in (
+            ('on', "Switched on device with id: %s", args.on),
+            ('off', "Switched off device with id: %s", args.off),
+            ('lock', "Locked device with id: %s", args.lock),
+            ('unlock', "Unlocked device with id: %s", args.unlock),
+            ('capture', "Image requested from device with id: %s",
+             args.capture)):
+        for device_id in device_ids or []:
+            _execute(command, message, device_id=device_id)
+
+    for device_id in args.json or []:
+        print(json.dumps(_execute('json', None, device_id=device_id),
+                         sort_keys=True, indent=4, separators=(',', ': ')))
+
+    if args.automations:
+        for desc in _execute('automations', None) or []:
+            _LOGGER.info("%s", desc)
+
+    for command, message, automation_ids in (
+            ('activate', "Activated automation with id: %s", args.activate),
+            ('deactivate', "Deactivated automation with id: %s",
+             args.deactivate),
+            ('trigger', "Triggered automation with id: %s", args.trigger)):
+        for automation_id in automation_ids or []:
+            _execute(command, message, automation_id=automation_id)
+
+    for keyval in args.image or []:
+        devloc = keyval.split("=")
+        _execute('image', "Saved image for device id: %s to %s",
+                 device_id=devloc[0], path=devloc[1])
+
+    if args.devices:
+        for desc in _execute('devices', None) or []:
+            _LOGGER.info("%s", desc)
+
+    for device_id in args.device or []:
+        desc = _execute('device', None, device_id=device_id)
+
+        if desc:
+            _LOGGER.info("%s", desc)
+
+
 def call():
     """Execute command line helper."""
     args = get_arguments()
@@ -214,6 +304,11 @@ def call():
 
     setup_logging(log_level)
 
+    # Hand the commands to a running daemon instead of logging in
+    if args.socket and not args.serve:
+        call_daemon(args)
+        return
+
     abode = None
 
     if not args.cache:
@@ -421,15 +516,28 @@ def call():
                     _LOGGER.warning(
                         "Could not find device with id: %s", device_id)
 
+        # Serve commands from a local control socket.
+        if args.serve:
+            from abodepy.daemon import AbodeDaemon
+
+            daemon = AbodeDaemon(abode, args.socket or
+                                 CONST.DAEMON_SOCKET_PATH)
+            try:
+                daemon.serve_forever()
+            except KeyboardInterrupt:
+                daemon.stop()
+                _LOGGER.info("Daemon stopped.")
+
         # Start device change listener.
         if args.listen:
+            import abodepy.helpers.timeline as TIMELINE
+
             # If no devices were specified then we listen to all devices.
             if args.device is None:
                 _LOGGER.info("Adding all devices to listener...")
 
-                for device in abode.get_devices():
-                    abode.events.add_device_callback(device.device_id,
-                                                     _device_callback)
+                abode.events.add_device_callback(CONST.ALL_DEVICES,
+                                                 _device_callback)
 
             abode.events.add_timeline_callback(TIMELINE.ALL,
                                                _timeline_callback)
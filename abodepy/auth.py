@@ -0,0 +1,191 @@
+"""Single-flight Abode authentication with token expiry tracking."""
+import datetime
+import logging
+import threading
+import time
+
+import abodepy.helpers.constants as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AbodeAuth():
+    """Serialize logins so concurrent requests share one re-login.
+
+    Every login gets a new generation number. A request that fails with
+    a token invalidates only the generation it used, so requests failing
+    together cause one login and then replay with the new token. Tokens
+    are also refreshed shortly before the expiry Abode reported.
+
+    With a session store the login is shared between processes: whoever
+    holds the store lock first logs in and publishes the session, and
+    everyone else adopts it instead of logging in themselves.
+    """
+
+    def __init__(self, abode, margin=CONST.AUTH_REFRESH_MARGIN, store=None):
+        """Init the auth manager for an Abode instance."""
+        self._abode = abode
+        self._margin = margin
+        self._store = store
+        self._generation = 0
+        self._expires_at = None
+        self._stale_token = None
+        self._lock = threading.RLock()
+
+    def ensure(self):
+        """Log in unless the token is valid, returning its generation.
+
+        Concurrent callers wait for the login in flight instead of
+        starting their own.
+        """
+        # pylint: disable=protected-access
+        generation = self._generation
+
+        if self._valid():
+            return generation
+
+        with self._lock:
+            # Someone else logged in while we waited for the lock
+            if not self._valid():
+                if self._store:
+                    with self._store.lock():
+                        if not self._adopt(self._store.load()):
+                            self._login()
+                else:
+                    self._login()
+
+            return self._generation
+
+    def login(self, mfa_code=None):
+        """Log in now, unless the store holds a usable session."""
+        with self._lock:
+            if self._store:
+                with self._store.lock():
+                    if self._adopt(self._store.load()):
+                        return True
+
+                    return self._login(mfa_code)
+
+            return self._login(mfa_code)
+
+    def invalidate(self, generation):
+        """Drop the token of a failed request, if it is still current."""
+        # pylint: disable=protected-access
+        with self._lock:
+            if generation == self._generation:
+                # Don't adopt the failed token back from the store
+                self._stale_token = self._abode._token
+                self._abode._token = None
+
+    def logged_in(self, login_json, oauth_json):
+        """Record a successful login and when its tokens expire."""
+        expires_at = []
+
+        expired_at = _parse_time(login_json.get('expired_at'))
+
+        # Ignore expiry times already past, the clocks don't agree
+        if expired_at and expired_at > time.time():
+            expires_at.append(expired_at)
+
+        expires_in = oauth_json.get('expires_in')
+
+        if isinstance(expires_in, (int, float)) and expires_in > 0:
+            expires_at.append(time.time() + expires_in)
+
+        with self._lock:
+            self._generation += 1
+            self._expires_at = min(expires_at) if expires_at else None
+
+            if self._store:
+                self._store.save(self._session())
+
+    def reset(self):
+        """Forget the token expiry after a logout."""
+        # pylint: disable=protected-access
+        with self._lock:
+            if self._store and self._abode._token:
+                with self._store.lock():
+                    session = self._store.load()
+
+                    # The token is no good to the other processes either
+                    if session and session.get('token') == self._abode._token:
+                        self._store.clear()
+
+            self._expires_at = None
+
+    @property
+    def store(self):
+        """Get the session store shared with other processes, if any."""
+        return self._store
+
+    @property
+    def generation(self):
+        """Get the number of the current login."""
+        return self._generation
+
+    @property
+    def expires_at(self):
+        """Get the time.time() the token expires at, if known."""
+        return self._expires_at
+
+    def _login(self, mfa_code=None):
+        # pylint: disable=protected-access
+        if self._abode._token:
+            _LOGGER.info("Abode token expiring, logging in again")
+
+        return self._abode._login(mfa_code)
+
+    def _session(self):
+        # pylint: disable=protected-access
+        return {
+            'username': self._abode._cache[CONST.ID],
+            'token': self._abode._token,
+            'oauth_token': self._abode._oauth_token,
+            'panel': self._abode._panel,
+            'user': self._abode._user,
+            'cookies': self._abode._session.cookies,
+            'expires_at': self._expires_at
+        }
+
+    def _adopt(self, session):
+        """Use a session another process logged in, if it is usable."""
+        # pylint: disable=protected-access
+        if (not session or
+                session.get('username') != self._abode._cache[CONST.ID] or
+                session.get('token') in (None, self._stale_token)):
+            return False
+
+        expires_at = session.get('expires_at')
+
+        if expires_at is not None and time.time() >= expires_at - self._margin:
+            return False
+
+        _LOGGER.debug("Using the session shared in %s", self._store.path)
+
+        self._abode._token = session['token']
+        self._abode._oauth_token = session['oauth_token']
+        self._abode._panel = session['panel']
+        self._abode._user = session['user']
+        self._abode._session.cookies.update(session['cookies'])
+
+        self._generation += 1
+        self._expires_at = expires_at
+
+        return True
+
+    def _valid(self):
+        # pylint: disable=protected-access
+        if not self._abode._token:
+            return False
+
+        return (self._expires_at is None or
+                time.time() < self._expires_at - self._margin)
+
+
+def _parse_time(value):
+    try:
+        return datetime.datetime.strptime(
+            value, '%Y-%m-%d %H:%M:%S').replace(
+                tzinfo=datetime.timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return None
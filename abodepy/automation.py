@@ -76,7 +76,7 @@ class AbodeAutomation:
     def update(self, automation):
         """Update the internal automation json."""
         self._automation.update(
-            {k: automation[k] for k in automation if self._automation.get(k)})
+            {k: automation[k] for k in automation if k in self._automation})
 
     @property
     def automation_id(self):
@@ -0,0 +1,252 @@
+"""Concurrent batches of device, automation and settings commands."""
+import collections
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from abodepy.automation import AbodeAutomation
+from abodepy.devices import AbodeDevice
+from abodepy.exceptions import AbodeException
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.errors as ERROR
+
+_LOGGER = logging.getLogger(__name__)
+
+# Device methods that may be called in a batch, with their argument count
+ACTIONS = {
+    'switch_on': 0,
+    'switch_off': 0,
+    'lock': 0,
+    'unlock': 0,
+    'open_cover': 0,
+    'close_cover': 0,
+    'set_status': 1,
+    'set_level': 1,
+    'set_color': 1,
+    'set_color_temp': 1,
+    'set_mode': 1,
+}
+
+# Automation methods that may be called in a batch, with their arguments
+AUTOMATION_ACTIONS = {
+    'enable': ('enable', (True,)),
+    'disable': ('enable', (False,)),
+    'trigger': ('trigger', ()),
+}
+
+BatchResult = collections.namedtuple(
+    'BatchResult', ['device_id', 'action', 'success', 'error'])
+
+AutomationResult = collections.namedtuple(
+    'AutomationResult', ['automation_id', 'action', 'success', 'error'])
+
+SettingResult = collections.namedtuple(
+    'SettingResult', ['setting', 'value', 'area', 'success', 'error'])
+
+
+class AbodeBatch():
+    """Validate and run batches of commands concurrently."""
+
+    def __init__(self, abode, max_workers=CONST.BATCH_MAX_WORKERS):
+        """Init the batch for an Abode instance."""
+        self._abode = abode
+        self._max_workers = max_workers
+
+    def validate(self, commands):
+        """Validate commands, returning (device, action, args) tuples.
+
+        A command is a (device or device_id, action, *args) tuple or a
+        dict with device_id, action and an optional value key.
+        """
+        validated = []
+
+        for command in commands:
+            if isinstance(command, dict):
+                device = command.get('device_id')
+                action = command.get('action')
+                args = ((command['value'],) if 'value' in command else ())
+            elif isinstance(command, (tuple, list)) and len(command) >= 2:
+                device, action, *args = command
+            else:
+                raise AbodeException(ERROR.INVALID_BATCH_COMMAND, command)
+
+            if not isinstance(device, AbodeDevice):
+                if not isinstance(device, str):
+                    raise AbodeException(ERROR.INVALID_DEVICE_ID, command)
+
+                device = self._abode.get_device(device)
+
+            if not device:
+                raise AbodeException(ERROR.INVALID_DEVICE_ID, command)
+
+            if (ACTIONS.get(action) != len(args) or
+                    not callable(getattr(device, action, None))):
+                raise AbodeException(ERROR.INVALID_BATCH_COMMAND, command)
+
+            validated.append((device, action, tuple(args)))
+
+        return validated
+
+    def execute(self, commands):
+        """Run commands concurrently, returning one result per command.
+
+        Commands for the same device run in order on one worker, different
+        devices run in parallel. Device callbacks fire as soon as each
+        device's commands have been applied.
+        """
+        commands = self.validate(commands)
+
+        if not commands:
+            return []
+
+        by_device = collections.OrderedDict()
+
+        for index, (device, action, args) in enumerate(commands):
+            by_device.setdefault(device.device_id, []).append(
+                (index, device, action, args))
+
+        results = [None] * len(commands)
+
+        for device_results in self._map(self._execute_device,
+                                        list(by_device.values())):
+            for index, result in device_results:
+                results[index] = result
+
+        return results
+
+    def execute_automations(self, automations, action):
+        """Enable, disable or trigger automations concurrently.
+
+        Returns one AutomationResult per automation.
+        """
+        if action not in AUTOMATION_ACTIONS:
+            raise AbodeException(ERROR.INVALID_BATCH_COMMAND, action)
+
+        validated = []
+
+        for automation in automations:
+            if not isinstance(automation, AbodeAutomation):
+                automation = self._abode.get_automation(automation)
+
+            if not automation:
+                raise AbodeException(ERROR.INVALID_AUTOMATION_ID)
+
+            validated.append(automation)
+
+        method, args = AUTOMATION_ACTIONS[action]
+
+        def _execute(automation):
+            try:
+                success = bool(getattr(automation, method)(*args))
+                error = None
+            # pylint: disable=W0703
+            except Exception as exc:
+                _LOGGER.warning("Batch %s of automation %s failed: %s",
+                                action, automation.automation_id, exc)
+                success = False
+                error = exc
+
+            return AutomationResult(automation.automation_id, action,
+                                    success, error)
+
+        return self._map(_execute, validated)
+
+    def execute_settings(self, settings, area='1', validate_value=True):
+        """Write settings with one request per endpoint and area.
+
+        Returns one SettingResult per setting.
+        """
+        if isinstance(settings, dict):
+            settings = settings.items()
+
+        validated = []
+        payloads = collections.OrderedDict()
+
+        for index, (setting, value, *setting_area) in enumerate(settings):
+            setting_area = setting_area[0] if setting_area else area
+
+            # pylint: disable=protected-access
+            url, data = self._abode._setting_request(
+                setting, value, setting_area, validate_value)
+
+            validated.append((setting.lower(), value, setting_area))
+
+            # Siren settings take one action per request, the other
+            # endpoints accept any number of keys for an area
+            key = (url, data.get('area'), data.get('action'))
+
+            if key not in payloads:
+                payloads[key] = (url, {}, [])
+
+            payloads[key][1].update(data)
+            payloads[key][2].append(index)
+
+        def _send(payload):
+            url, data, indexes = payload
+
+            try:
+                self._abode.send_request(method="put", url=url, data=data)
+                error = None
+            # pylint: disable=W0703
+            except Exception as exc:
+                _LOGGER.warning("Batch settings %s failed: %s", data, exc)
+                error = exc
+
+            return indexes, error
+
+        results = [None] * len(validated)
+        # pylint: disable=protected-access
+        panel_settings = self._abode._settings
+
+        for indexes, error in self._map(_send, list(payloads.values())):
+            for index in indexes:
+                results[index] = SettingResult(*validated[index],
+                                               success=error is None,
+                                               error=error)
+
+                if panel_settings and error is None:
+                    panel_settings.apply(*validated[index])
+
+        return results
+
+    def _map(self, func, items):
+        if not items:
+            return []
+
+        # Log in once up front rather than racing logins on every worker
+        # pylint: disable=protected-access
+        self._abode._auth.ensure()
+
+        workers = max(1, min(self._max_workers, len(items)))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+
+    def _execute_device(self, commands):
+        results = []
+        changed = None
+
+        for index, device, action, args in commands:
+            try:
+                success = bool(getattr(device, action)(*args))
+                error = None
+            # One failed command must not abort the rest of the batch
+            # pylint: disable=W0703
+            except Exception as exc:
+                _LOGGER.warning("Batch command %s for %s failed: %s",
+                                action, device.device_id, exc)
+                success = False
+                error = exc
+
+            if success:
+                changed = device
+
+            results.append(
+                (index, BatchResult(device.device_id, action, success, error)))
+
+        # Optimistic commands already notified on every state change
+        # pylint: disable=protected-access
+        if (changed and self._abode._event_controller and
+                not self._abode.optimistic.enabled):
+            self._abode._event_controller.notify_device(changed)
+
+        return results
@@ -0,0 +1,227 @@
+"""Long running abodepy daemon controlled over a local UNIX socket."""
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from abodepy.exceptions import AbodeException
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.errors as ERROR
+
+_LOGGER = logging.getLogger(__name__)
+
+COMMAND = 'command'
+ARGS = 'args'
+OK = 'ok'
+RESULT = 'result'
+ERROR_KEY = 'error'
+
+
+class AbodeDaemon():
+    """Serve commands against one warm, authenticated Abode instance."""
+
+    def __init__(self, abode, socket_path=CONST.DAEMON_SOCKET_PATH,
+                 listen=True):
+        """Init the daemon for an Abode instance."""
+        self._abode = abode
+        self._socket_path = socket_path
+        self._listen = listen
+        self._server = None
+        self._lock = threading.Lock()
+
+        self._commands = {
+            'mode': self._mode,
+            'arm': self._arm,
+            'set': self._set,
+            'on': self._device_command('switch_on'),
+            'off': self._device_command('switch_off'),
+            'lock': self._device_command('lock'),
+            'unlock': self._device_command('unlock'),
+            'capture': self._device_command('capture'),
+            'image': self._image,
+            'device': self._device,
+            'devices': self._devices,
+            'json': self._json,
+            'automations': self._automations,
+            'activate': self._automation_command('enable', True),
+            'deactivate': self._automation_command('enable', False),
+            'trigger': self._automation_command('trigger'),
+        }
+
+    def start(self):
+        """Bind the control socket and warm the device cache."""
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+
+        self._abode.get_devices()
+
+        if self._listen:
+            # Keep the device cache current from cloud push events
+            self._abode.events.start()
+
+        daemon = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    response = daemon.execute_line(line)
+                    self.wfile.write(json.dumps(response).encode() + b'\n')
+
+        self._server = socketserver.ThreadingUnixStreamServer(
+            self._socket_path, _Handler)
+        self._server.daemon_threads = True
+
+        _LOGGER.info("Listening for commands on: %s", self._socket_path)
+
+    def serve_forever(self):
+        """Start (if required) and serve commands until stopped."""
+        if not self._server:
+            self.start()
+
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving, close the socket and the event listener."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+
+        if self._listen:
+            self._abode.events.stop()
+
+    def execute_line(self, line):
+        """Execute one JSON encoded request line."""
+        try:
+            request = json.loads(line.decode())
+        except ValueError:
+            return {OK: False, ERROR_KEY: "Invalid request"}
+
+        if not isinstance(request, dict):
+            return {OK: False, ERROR_KEY: "Invalid request"}
+
+        command = request.get(COMMAND)
+        args = request.get(ARGS, {})
+
+        if not isinstance(command, str) or not isinstance(args, dict):
+            return {OK: False, ERROR_KEY: "Invalid request"}
+
+        return self.execute(command, **args)
+
+    def execute(self, command, **kwargs):
+        """Execute a command, returning a response dict."""
+        handler = self._commands.get(command)
+
+        if not handler:
+            return {OK: False, ERROR_KEY: "Unknown command: " + str(command)}
+
+        try:
+            # The Abode instance is shared between client connections
+            with self._lock:
+                return {OK: True, RESULT: handler(**kwargs)}
+        # A failed command must never take the client connection down
+        # pylint: disable=W0703
+        except Exception as exc:
+            _LOGGER.warning("Command %s failed: %s", command, exc)
+            return {OK: False, ERROR_KEY: str(exc)}
+
+    def _get_device(self, device_id):
+        device = self._abode.get_device(device_id)
+
+        if not device:
+            raise AbodeException(ERROR.INVALID_DEVICE_ID)
+
+        return device
+
+    def _get_automation(self, automation_id):
+        automation = self._abode.get_automation(automation_id)
+
+        if not automation:
+            raise AbodeException(ERROR.INVALID_AUTOMATION_ID)
+
+        return automation
+
+    def _device_command(self, method):
+        def _command(device_id):
+            return getattr(self._get_device(device_id), method)()
+
+        return _command
+
+    def _automation_command(self, method, *args):
+        def _command(automation_id):
+            return getattr(self._get_automation(automation_id),
+                           method)(*args)
+
+        return _command
+
+    def _mode(self):
+        return self._abode.get_alarm().mode
+
+    def _arm(self, mode):
+        return self._abode.get_alarm().set_mode(mode)
+
+    def _set(self, setting, value):
+        return bool(self._abode.set_setting(setting, value))
+
+    def _image(self, device_id, path):
+        device = self._get_device(device_id)
+
+        return device.refresh_image() and device.image_to_file(path)
+
+    def _device(self, device_id):
+        return self._get_device(device_id).desc
+
+    def _devices(self):
+        return [device.desc for device in self._abode.get_devices()]
+
+    def _json(self, device_id):
+        # pylint: disable=protected-access
+        return self._get_device(device_id)._json_state
+
+    def _automations(self):
+        return [automation.desc
+                for automation in self._abode.get_automations()]
+
+
+class AbodeDaemonClient():
+    """Thin client for an AbodeDaemon control socket."""
+
+    def __init__(self, socket_path=CONST.DAEMON_SOCKET_PATH, timeout=30):
+        """Init the daemon client."""
+        self._socket_path = socket_path
+        self._timeout = timeout
+
+    def execute(self, command, **kwargs):
+        """Send a command to the daemon and return its result."""
+        request = json.dumps({COMMAND: command, ARGS: kwargs}).encode()
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self._timeout)
+                sock.connect(self._socket_path)
+                sock.sendall(request + b'\n')
+
+                with sock.makefile('rb') as stream:
+                    line = stream.readline()
+
+            if not line:
+                raise AbodeException(ERROR.DAEMON_NO_RESPONSE)
+
+            response = json.loads(line.decode())
+
+            if not isinstance(response, dict):
+                raise ValueError(response)
+        except (OSError, ValueError) as exc:
+            # No daemon listening, a timeout or a garbled response
+            raise AbodeException(ERROR.DAEMON_NO_RESPONSE, str(exc))
+
+        if not response.get(OK):
+            raise AbodeException(ERROR.DAEMON_COMMAND_FAILED,
+                                 response.get(ERROR_KEY))
+
+        return response.get(RESULT)
@@ -0,0 +1,105 @@
+"""Versioned copy-on-write store of the cached devices."""
+import collections
+import threading
+from types import MappingProxyType
+
+DeviceSnapshot = collections.namedtuple('DeviceSnapshot',
+                                        ['version', 'devices'])
+
+
+class AbodeDeviceStore():
+    """Devices published as immutable, versioned snapshots.
+
+    Readers use the current snapshot without locking, so iterating it is
+    never disturbed by the SocketIO thread. Writers copy the device map,
+    change the copy and publish it as a new snapshot under a lock. The
+    version increases with every change to the device map and with every
+    device state change, so callers can skip work when it is unchanged.
+    """
+
+    def __init__(self, devices=None):
+        """Init the store with an optional {device_id: device} dict."""
+        self._lock = threading.Lock()
+        self._snapshot = DeviceSnapshot(0, MappingProxyType(
+            dict(devices or {})))
+
+    @property
+    def snapshot(self):
+        """Get the current DeviceSnapshot."""
+        return self._snapshot
+
+    @property
+    def version(self):
+        """Get the current version."""
+        return self._snapshot.version
+
+    def get(self, device_id, default=None):
+        """Get a device by id."""
+        return self._snapshot.devices.get(device_id, default)
+
+    def values(self):
+        """Get the devices of the current snapshot."""
+        return list(self._snapshot.devices.values())
+
+    def update(self, devices):
+        """Add or replace many devices at once."""
+        devices = {device.device_id: device for device in devices}
+
+        if not devices:
+            return
+
+        with self._lock:
+            self._publish(dict(self._snapshot.devices, **devices))
+
+    def setdefault(self, device_id, device):
+        """Add a device unless the id is taken, returning the stored one."""
+        with self._lock:
+            current = self._snapshot.devices.get(device_id)
+
+            if current is not None:
+                return current
+
+            devices = dict(self._snapshot.devices)
+            devices[device_id] = device
+            self._publish(devices)
+
+        return device
+
+    def pop(self, device_id, default=None):
+        """Remove a device, returning it."""
+        with self._lock:
+            if device_id not in self._snapshot.devices:
+                return default
+
+            devices = dict(self._snapshot.devices)
+            device = devices.pop(device_id)
+            self._publish(devices)
+
+        return device
+
+    def touch(self):
+        """Record a device state change."""
+        with self._lock:
+            self._publish(self._snapshot.devices)
+
+    def __setitem__(self, device_id, device):
+        """Add or replace a device."""
+        with self._lock:
+            devices = dict(self._snapshot.devices)
+            devices[device_id] = device
+            self._publish(devices)
+
+    def __contains__(self, device_id):
+        """Return True if a device is stored under the id."""
+        return device_id in self._snapshot.devices
+
+    def __len__(self):
+        """Get the number of devices."""
+        return len(self._snapshot.devices)
+
+    def _publish(self, devices):
+        if not isinstance(devices, MappingProxyType):
+            devices = MappingProxyType(devices)
+
+        # A single reference swap, readers see the old or the new snapshot
+        self._snapshot = DeviceSnapshot(self._snapshot.version + 1, devices)
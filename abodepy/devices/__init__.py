@@ -1,8 +1,10 @@
 """Init file for devices directory."""
+import collections
 import json
 import logging
+import threading
 
-from abodepy.exceptions import AbodeException
+from abodepy.exceptions import AbodeException, AbodeNotFoundException
 
 import abodepy.helpers.constants as CONST
 import abodepy.helpers.errors as ERROR
@@ -10,6 +12,8 @@ import abodepy.helpers.errors as ERROR
 
 _LOGGER = logging.getLogger(__name__)
 
+DeviceChange = collections.namedtuple('DeviceChange', ['old', 'new'])
+
 
 class AbodeDevice():
     """Class to represent each Abode device."""
@@ -24,6 +28,8 @@ class AbodeDevice():
         self._type_tag = json_obj.get('type_tag')
         self._generic_type = json_obj.get('generic_type')
         self._abode = abode
+        self._changes = {}
+        self._state_lock = threading.Lock()
 
         self._update_name()
 
@@ -58,6 +64,22 @@ class AbodeDevice():
 
         return False
 
+    def set_status_state(self, status, state):
+        """Set device status and the status string it results in.
+
+        Applied before Abode confirms it when optimistic updates are on.
+        """
+        if self._abode.optimistic.enabled:
+            return self._abode.optimistic.execute(
+                self, {'status': state}, self.set_status, status)
+
+        success = self.set_status(status)
+
+        if success:
+            self._apply_state({'status': state})
+
+        return success
+
     def set_level(self, level):
         """Set device level."""
         if self._json_state['control_url']:
@@ -99,11 +121,17 @@ class AbodeDevice():
     def refresh(self, url=CONST.DEVICE_URL):
         """Refresh the devices json object data.
 
-        Only needed if you're not using the notification service.
+        Only needed if you're not using the notification service. Returns
+        an empty list if Abode no longer has the device.
         """
         url = url.replace('$DEVID$', self.device_id)
 
-        response = self._abode.send_request(method="get", url=url)
+        try:
+            response = self._abode.send_request(method="get", url=url)
+        except AbodeNotFoundException:
+            _LOGGER.debug("Device not found: %s", self.device_id)
+            return []
+
         response_object = json.loads(response.text)
 
         _LOGGER.debug("Device Refresh Response: %s", response.text)
@@ -121,10 +149,78 @@ class AbodeDevice():
 
         Only updates if it already exists in the device.
         """
-        self._json_state.update(
+        optimistic = self._abode.optimistic
+        json_state, rollback = optimistic.reconcile(self, json_state)
+
+        self._apply_state(
             {k: json_state[k] for k in json_state if self._json_state.get(k)})
         self._update_name()
 
+        # Rollback callbacks see the state the device reported
+        if rollback:
+            optimistic.notify_rollback(self, *rollback)
+
+    def pop_changes(self):
+        """Get the fields changed since the last call and forget them.
+
+        Returns {field: DeviceChange(old, new)}, where keys of nested
+        objects are dotted fields such as statuses.temperature.
+        """
+        with self._state_lock:
+            changes, self._changes = self._changes, {}
+
+        return changes
+
+    def _apply_state(self, values):
+        """Update the json state, recording the fields that changed.
+
+        The state is copied, changed and swapped in, so readers always
+        see a whole old or a whole new state.
+        """
+        with self._state_lock:
+            json_state = dict(self._json_state)
+            changed = False
+
+            for key, value in values.items():
+                old = json_state.get(key)
+
+                if isinstance(old, dict) and isinstance(value, dict):
+                    for field in list(old) + [
+                            k for k in value if k not in old]:
+                        changed |= self._record_change(
+                            key + '.' + field, old.get(field),
+                            value.get(field))
+                else:
+                    changed |= self._record_change(key, old, value)
+
+                json_state[key] = value
+
+            self._json_state = json_state
+
+        # pylint: disable=protected-access
+        if changed and self._abode._devices is not None:
+            self._abode._devices.touch()
+
+    def _record_change(self, field, old, new):
+        """Record a field change, keeping the oldest value not notified.
+
+        Returns True if the field changed.
+        """
+        if old == new:
+            return False
+
+        previous = self._changes.get(field)
+
+        if previous:
+            old = previous.old
+
+        if old == new:
+            self._changes.pop(field, None)
+        else:
+            self._changes[field] = DeviceChange(old, new)
+
+        return True
+
     def _update_name(self):
         """Set the device name from _json_state, with a sensible default."""
         self._name = self._json_state.get('name')
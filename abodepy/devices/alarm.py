@@ -10,6 +10,9 @@ import abodepy.helpers.errors as ERROR
 
 _LOGGER = logging.getLogger(__name__)
 
+# Keys create_alarm() sets for each area, never taken from panel updates
+_ALARM_KEYS = ('id', 'name', 'type', 'type_tag', 'generic_type', 'uuid')
+
 
 def create_alarm(panel_json, abode, area='1'):
     """Create a new alarm device from a panel response."""
@@ -20,9 +23,23 @@ def create_alarm(panel_json, abode, area='1'):
     panel_json['generic_type'] = CONST.TYPE_ALARM
     panel_json['uuid'] = panel_json.get('mac').replace(':', '').lower()
 
+    # Additional areas need their own name and unique id
+    if area != '1':
+        panel_json['name'] += ' Area ' + area
+        panel_json['uuid'] += '_' + area
+
     return AbodeAlarm(panel_json, abode, area)
 
 
+def get_areas(panel_json):
+    """Get the areas of a panel response, from its mode map."""
+    areas = [key[len(CONST.ALARM_DEVICE_ID):]
+             for key in (panel_json.get('mode') or {})
+             if key.startswith(CONST.ALARM_DEVICE_ID)]
+
+    return sorted(areas, key=lambda area: (len(area), area)) or ['1']
+
+
 class AbodeAlarm(AbodeSwitch):
     """Class to represent the Abode alarm as a device."""
 
@@ -54,13 +71,35 @@ class AbodeAlarm(AbodeSwitch):
         if response_object['mode'] != mode:
             raise AbodeException(ERROR.SET_MODE_MODE)
 
-        self._json_state['mode'][(self.device_id)] = response_object['mode']
+        self._set_mode(response_object['mode'])
 
         _LOGGER.info("Set alarm %s mode to: %s",
                      self._device_id, response_object['mode'])
 
         return True
 
+    def apply_mode(self, mode):
+        """Set the mode locally, e.g. from a mode change event."""
+        self._set_mode(mode)
+
+    def update(self, json_state):
+        """Update the json data from a panel response."""
+        AbodeDevice.update(self, {key: value
+                                  for key, value in json_state.items()
+                                  if key not in _ALARM_KEYS})
+
+    def _set_mode(self, mode):
+        modes = dict(self._json_state['mode'])
+        modes[self.device_id] = mode
+        self._apply_state({'mode': modes})
+
+        # pylint: disable=W0212
+        panel = self._abode._panel
+
+        if panel is not None:
+            panel['mode'] = dict(panel.get('mode') or {},
+                                 **{self.device_id: mode})
+
     def set_home(self):
         """Arm Abode to home mode."""
         return self.set_mode(CONST.MODE_HOME)
@@ -89,6 +128,11 @@ class AbodeAlarm(AbodeSwitch):
 
         return response_object
 
+    @property
+    def area(self):
+        """Get the area of this alarm."""
+        return self._area
+
     @property
     def is_on(self):
         """Is alarm armed."""
@@ -9,21 +9,12 @@ class AbodeCover(AbodeSwitch):
 
     def switch_on(self):
         """Turn the switch on."""
-        success = self.set_status(CONST.STATUS_OPEN_INT)
-
-        if success:
-            self._json_state['status'] = CONST.STATUS_OPEN
-
-        return success
+        return self.set_status_state(CONST.STATUS_OPEN_INT, CONST.STATUS_OPEN)
 
     def switch_off(self):
         """Turn the switch off."""
-        success = self.set_status(CONST.STATUS_CLOSED_INT)
-
-        if success:
-            self._json_state['status'] = CONST.STATUS_CLOSED
-
-        return success
+        return self.set_status_state(CONST.STATUS_CLOSED_INT,
+                                     CONST.STATUS_CLOSED)
 
     def open_cover(self):
         """Open the cover."""
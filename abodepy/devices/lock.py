@@ -9,21 +9,13 @@ class AbodeLock(AbodeDevice):
 
     def lock(self):
         """Lock the device."""
-        success = self.set_status(CONST.STATUS_LOCKCLOSED_INT)
-
-        if success:
-            self._json_state['status'] = CONST.STATUS_LOCKCLOSED
-
-        return success
+        return self.set_status_state(CONST.STATUS_LOCKCLOSED_INT,
+                                     CONST.STATUS_LOCKCLOSED)
 
     def unlock(self):
         """Unlock the device."""
-        success = self.set_status(CONST.STATUS_LOCKOPEN_INT)
-
-        if success:
-            self._json_state['status'] = CONST.STATUS_LOCKOPEN
-
-        return success
+        return self.set_status_state(CONST.STATUS_LOCKOPEN_INT,
+                                     CONST.STATUS_LOCKOPEN)
 
     @property
     def is_locked(self):
@@ -0,0 +1,121 @@
+"""Registry mapping device type tags to device classes."""
+import collections
+import logging
+
+from abodepy.devices.binary_sensor import AbodeBinarySensor
+from abodepy.devices.cover import AbodeCover
+from abodepy.devices.light import AbodeLight
+from abodepy.devices.lock import AbodeLock
+from abodepy.devices.sensor import AbodeSensor
+from abodepy.devices.switch import AbodeSwitch
+from abodepy.devices.valve import AbodeValve
+from abodepy.exceptions import AbodeException
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.errors as ERROR
+
+_LOGGER = logging.getLogger(__name__)
+
+DeviceType = collections.namedtuple(
+    'DeviceType', ['generic_type', 'device_class', 'factory'])
+
+
+def _new_camera(device_json, abode):
+    # Cameras are imported on first use to keep imports light
+    from abodepy.devices.camera import AbodeCamera
+    return AbodeCamera(device_json, abode)
+
+
+def _new_sensor(device_json, abode):
+    statuses = device_json.get(CONST.STATUSES_KEY, {})
+
+    if any(key in statuses for key in CONST.SENSOR_KEYS):
+        device_json['generic_type'] = CONST.TYPE_SENSOR
+        return AbodeSensor(device_json, abode)
+
+    version = device_json.get('version', '')
+
+    # this.version.startsWith('MINIPIR') == true ? 'Occupancy Sensor'
+    # : 'Motion Sensor';
+    if version and version.lower().startswith('minipir'):
+        device_json['generic_type'] = CONST.TYPE_OCCUPANCY
+    else:
+        device_json['generic_type'] = CONST.TYPE_MOTION
+
+    return AbodeBinarySensor(device_json, abode)
+
+
+# Device class and factory of each generic type, alarms are created from
+# the panel rather than the device list
+_GENERIC_TYPE_CLASSES = {
+    CONST.TYPE_CONNECTIVITY: (AbodeBinarySensor, None),
+    CONST.TYPE_MOISTURE: (AbodeBinarySensor, None),
+    CONST.TYPE_OPENING: (AbodeBinarySensor, None),
+    CONST.TYPE_CAMERA: (None, _new_camera),
+    CONST.TYPE_COVER: (AbodeCover, None),
+    CONST.TYPE_LIGHT: (AbodeLight, None),
+    CONST.TYPE_LOCK: (AbodeLock, None),
+    CONST.TYPE_SWITCH: (AbodeSwitch, None),
+    CONST.TYPE_VALVE: (AbodeValve, None),
+    CONST.TYPE_UNKNOWN_SENSOR: (None, _new_sensor),
+}
+
+_REGISTRY = {
+    type_tag: DeviceType(generic_type,
+                         *_GENERIC_TYPE_CLASSES.get(generic_type,
+                                                    (None, None)))
+    for type_tag, generic_type in CONST.GENERIC_TYPES.items()
+}
+
+# Type tags seen without a registry entry, so they are only logged once
+_UNKNOWN_TYPE_TAGS = set()
+
+
+def register_device_type(type_tag, generic_type, device_class=None,
+                         factory=None):
+    """Register (or replace) the device class of a type tag.
+
+    The factory, if given, is called as factory(device_json, abode) and
+    may return None to skip the device.
+    """
+    if device_class is None and factory is None:
+        raise AbodeException(ERROR.INVALID_DEVICE_TYPE, type_tag)
+
+    type_tag = type_tag.lower()
+
+    _REGISTRY[type_tag] = DeviceType(generic_type, device_class, factory)
+    CONST.GENERIC_TYPES[type_tag] = generic_type
+    _UNKNOWN_TYPE_TAGS.discard(type_tag)
+
+
+def get_device_type(type_tag):
+    """Get the registered DeviceType of a type tag."""
+    return _REGISTRY.get(type_tag.lower())
+
+
+def create_device(device_json, abode):
+    """Create new device object for the given type."""
+    type_tag = device_json.get('type_tag')
+
+    if not type_tag:
+        raise AbodeException((ERROR.UNABLE_TO_MAP_DEVICE))
+
+    type_tag = type_tag.lower()
+    device_type = _REGISTRY.get(type_tag)
+
+    if device_type is None:
+        if type_tag not in _UNKNOWN_TYPE_TAGS:
+            _UNKNOWN_TYPE_TAGS.add(type_tag)
+            _LOGGER.debug("Skipping unknown device type: %s", type_tag)
+
+        device_json['generic_type'] = None
+        return None
+
+    device_json['generic_type'] = device_type.generic_type
+
+    if device_type.factory:
+        return device_type.factory(device_json, abode)
+
+    if device_type.device_class:
+        return device_type.device_class(device_json, abode)
+
+    return None
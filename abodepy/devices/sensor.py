@@ -2,22 +2,72 @@
 import re
 
 from abodepy.devices.binary_sensor import AbodeBinarySensor
+from abodepy.sensor_history import SensorHistory
 import abodepy.helpers.constants as CONST
 
+NON_NUMERIC = re.compile("[^0-9.]")
+
+# Units to look for in each statuses value, in order, mapped to the unit
+# that is reported for it.
+STATUS_UNITS = {
+    CONST.TEMP_STATUS_KEY: [(CONST.UNIT_FAHRENHEIT, CONST.UNIT_FAHRENHEIT),
+                            (CONST.UNIT_CELSIUS, CONST.UNIT_CELSIUS)],
+    CONST.HUMI_STATUS_KEY: [(CONST.UNIT_PERCENT, CONST.UNIT_PERCENT)],
+    CONST.LUX_STATUS_KEY: [(CONST.UNIT_LUX, CONST.LUX)]
+}
+
 
 class AbodeSensor(AbodeBinarySensor):
     """Class to represent a sensor device."""
 
+    def __init__(self, json_obj, abode):
+        """Set up Abode sensor device."""
+        AbodeBinarySensor.__init__(self, json_obj, abode)
+
+        self._readings = {}
+        self._history = {key: SensorHistory(CONST.SENSOR_HISTORY_SIZE)
+                         for key in CONST.SENSOR_KEYS}
+
+        self._parse_statuses()
+        self._record_history()
+
+    def update(self, json_state):
+        """Update the json data and record the new sensor readings."""
+        AbodeBinarySensor.update(self, json_state)
+
+        self._parse_statuses()
+        self._record_history()
+
+    def history(self, key):
+        """Get the reading history for a statuses key, e.g. temperature."""
+        return self._history.get(key)
+
+    def _parse_statuses(self):
+        """Parse the statuses strings, skipping ones that didn't change."""
+        for key in CONST.SENSOR_KEYS:
+            status = self._get_status(key)
+            reading = self._readings.get(key)
+
+            if reading is not None and reading[0] == status:
+                continue
+
+            self._readings[key] = (status, _parse_numeric(status),
+                                   _parse_unit(key, status))
+
+    def _record_history(self):
+        for key, history in self._history.items():
+            history.record(self._get_numeric_status(key))
+
     def _get_status(self, key):
         return self._json_state.get(CONST.STATUSES_KEY, {}).get(key)
 
     def _get_numeric_status(self, key):
-        """Extract the numeric value from the statuses object."""
-        value = self._get_status(key)
+        """Get the parsed numeric value from the statuses object."""
+        return self._readings[key][1]
 
-        if value and any(i.isdigit() for i in value):
-            return float(re.sub("[^0-9.]", "", value))
-        return None
+    def _get_unit(self, key):
+        """Get the parsed unit from the statuses object."""
+        return self._readings[key][2]
 
     @property
     def temp(self):
@@ -27,13 +77,23 @@ class AbodeSensor(AbodeBinarySensor):
     @property
     def temp_unit(self):
         """Get unit of temp."""
-        if CONST.UNIT_FAHRENHEIT in self._get_status(CONST.TEMP_STATUS_KEY):
-            return CONST.UNIT_FAHRENHEIT
+        return self._get_unit(CONST.TEMP_STATUS_KEY)
 
-        if CONST.UNIT_CELSIUS in self._get_status(CONST.TEMP_STATUS_KEY):
-            return CONST.UNIT_CELSIUS
+    @property
+    def temp_celsius(self):
+        """Get device temp in degrees Celsius."""
+        if self.temp is not None and self.temp_unit == CONST.UNIT_FAHRENHEIT:
+            return (self.temp - 32) * 5 / 9
 
-        return None
+        return self.temp
+
+    @property
+    def temp_fahrenheit(self):
+        """Get device temp in degrees Fahrenheit."""
+        if self.temp is not None and self.temp_unit == CONST.UNIT_CELSIUS:
+            return self.temp * 9 / 5 + 32
+
+        return self.temp
 
     @property
     def humidity(self):
@@ -43,9 +103,7 @@ class AbodeSensor(AbodeBinarySensor):
     @property
     def humidity_unit(self):
         """Get unit of humidity."""
-        if CONST.UNIT_PERCENT in self._get_status(CONST.HUMI_STATUS_KEY):
-            return CONST.UNIT_PERCENT
-        return None
+        return self._get_unit(CONST.HUMI_STATUS_KEY)
 
     @property
     def lux(self):
@@ -55,9 +113,7 @@ class AbodeSensor(AbodeBinarySensor):
     @property
     def lux_unit(self):
         """Get unit of lux."""
-        if CONST.UNIT_LUX in self._get_status(CONST.LUX_STATUS_KEY):
-            return CONST.LUX
-        return None
+        return self._get_unit(CONST.LUX_STATUS_KEY)
 
     @property
     def has_temp(self):
@@ -73,3 +129,22 @@ class AbodeSensor(AbodeBinarySensor):
     def has_lux(self):
         """Device reports light lux level."""
         return self.lux is not None
+
+
+def _parse_numeric(status):
+    """Extract the numeric value from a statuses string."""
+    if status and any(i.isdigit() for i in status):
+        return float(NON_NUMERIC.sub("", status))
+    return None
+
+
+def _parse_unit(key, status):
+    """Extract the unit from a statuses string."""
+    if not status:
+        return None
+
+    for unit, reported_unit in STATUS_UNITS.get(key, ()):
+        if unit in status:
+            return reported_unit
+
+    return None
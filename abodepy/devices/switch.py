@@ -9,21 +9,11 @@ class AbodeSwitch(AbodeDevice):
 
     def switch_on(self):
         """Turn the switch on."""
-        success = self.set_status(CONST.STATUS_ON_INT)
-
-        if success:
-            self._json_state['status'] = CONST.STATUS_ON
-
-        return success
+        return self.set_status_state(CONST.STATUS_ON_INT, CONST.STATUS_ON)
 
     def switch_off(self):
         """Turn the switch off."""
-        success = self.set_status(CONST.STATUS_OFF_INT)
-
-        if success:
-            self._json_state['status'] = CONST.STATUS_OFF
-
-        return success
+        return self.set_status_state(CONST.STATUS_OFF_INT, CONST.STATUS_OFF)
 
     @property
     def is_on(self):
@@ -9,21 +9,11 @@ class AbodeValve(AbodeSwitch):
 
     def switch_on(self):
         """Open the valve."""
-        success = self.set_status(CONST.STATUS_ON_INT)
-
-        if success:
-            self._json_state['status'] = CONST.STATUS_OPEN
-
-        return success
+        return self.set_status_state(CONST.STATUS_ON_INT, CONST.STATUS_OPEN)
 
     def switch_off(self):
         """Close the valve."""
-        success = self.set_status(CONST.STATUS_OFF_INT)
-
-        if success:
-            self._json_state['status'] = CONST.STATUS_CLOSED
-
-        return success
+        return self.set_status_state(CONST.STATUS_OFF_INT, CONST.STATUS_CLOSED)
 
     @property
     def is_on(self):
@@ -0,0 +1,130 @@
+"""Discovery of devices added or removed after the full device fetch."""
+import json
+import logging
+import threading
+import time
+
+from abodepy.devices import registry as DEVICE_REGISTRY
+from abodepy.exceptions import AbodeException
+import abodepy.helpers.constants as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AbodeDeviceDiscovery():
+    """Fetch single devices that push events name but the cache lacks.
+
+    Each unknown device id is fetched at most once per interval. Concurrent
+    lookups of the same id wait for the one request in flight and get its
+    device. Devices that Abode no longer returns are evicted from the cache.
+    """
+
+    def __init__(self, abode, interval=CONST.DISCOVERY_INTERVAL,
+                 on_added=None):
+        """Init device discovery for an Abode instance.
+
+        on_added is called once with each device discovery adds.
+        """
+        self._abode = abode
+        self._interval = interval
+        self._on_added = on_added
+        self._attempts = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def discover(self, device_id):
+        """Fetch and cache an unknown device, returning it if found."""
+        # pylint: disable=protected-access
+        devices = self._abode._devices
+
+        if not device_id or devices is None:
+            return None
+
+        device = devices.get(device_id)
+
+        if device:
+            return device
+
+        now = time.monotonic()
+
+        with self._lock:
+            pending = self._pending.get(device_id)
+
+            if pending is None:
+                attempt = self._attempts.get(device_id)
+
+                # Recently found not to exist
+                if attempt is not None and now - attempt < self._interval:
+                    return None
+
+                self._attempts[device_id] = now
+                self._pending[device_id] = threading.Event()
+
+        if pending is not None:
+            # Share the result of the request already in flight
+            pending.wait()
+            return devices.get(device_id)
+
+        try:
+            return self._fetch(devices, device_id)
+        finally:
+            with self._lock:
+                self._pending.pop(device_id).set()
+
+    def _fetch(self, devices, device_id):
+        _LOGGER.debug("Discovering unknown device: %s", device_id)
+
+        url = CONST.DEVICE_URL.replace('$DEVID$', device_id)
+
+        try:
+            response = self._abode.send_request(method="get", url=url)
+            response_object = json.loads(response.text)
+        except (AbodeException, ValueError) as exc:
+            _LOGGER.warning("Unable to discover device %s: %s",
+                            device_id, exc)
+            return None
+
+        _LOGGER.debug("Discover Device Response: %s", response.text)
+
+        if isinstance(response_object, (tuple, list)):
+            response_object = response_object[0] if response_object else None
+
+        if not response_object or response_object.get('id') != device_id:
+            _LOGGER.debug("No device found for id: %s", device_id)
+            return None
+
+        device = DEVICE_REGISTRY.create_device(response_object, self._abode)
+
+        if not device:
+            return None
+
+        with self._lock:
+            self._attempts.pop(device_id, None)
+
+        # A full fetch may have won the race
+        cached = devices.setdefault(device_id, device)
+
+        if cached is not device:
+            return cached
+
+        _LOGGER.info("Discovered new device: %s", device.desc)
+
+        if self._on_added:
+            self._on_added(device)
+
+        return device
+
+    def evict(self, device_id):
+        """Remove a device from the cache, returning it if it was cached."""
+        # pylint: disable=protected-access
+        devices = self._abode._devices
+
+        if devices is None:
+            return None
+
+        device = devices.pop(device_id, None)
+
+        if device:
+            _LOGGER.info("Removed device: %s", device.desc)
+
+        return device
@@ -0,0 +1,260 @@
+"""Share one Abode push event connection with local processes."""
+import collections
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from abodepy.local_server import AbodeLocalServer
+import abodepy.devices.alarm as ALARM
+import abodepy.devices.registry as DEVICE_REGISTRY
+import abodepy.helpers.constants as CONST
+import abodepy.socketio as sio
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT = 'event'
+DATA = 'data'
+
+SNAPSHOT = 'snapshot'
+DEVICE = 'device'
+REMOVED = 'removed'
+CONNECTION = 'connection'
+
+_BROKER_ID = 'abodepy.event_broker'
+
+
+class AbodeEventBroker(AbodeLocalServer):
+    """Publish the events of one Abode connection to subscriber processes.
+
+    The broker owns the SocketIO connection and the device cache. Every
+    subscriber first gets a snapshot of all device states and then the
+    device states, timeline and automation events as they are applied,
+    one JSON message per line. Subscribers that fall more than queue_size
+    messages behind are disconnected and resync from a new snapshot.
+    """
+
+    _ID = _BROKER_ID
+
+    def __init__(self, abode, socket_path=CONST.BROKER_SOCKET_PATH,
+                 queue_size=CONST.BROKER_QUEUE_SIZE, listen=True):
+        """Init the event broker for an Abode instance."""
+        AbodeLocalServer.__init__(self, abode, queue_size, listen)
+        self._socket_path = socket_path
+
+    def start(self):
+        """Bind the event socket and start listening to Abode."""
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+
+        self._abode.get_devices()
+
+        AbodeLocalServer.start(self)
+
+        _LOGGER.info("Publishing events on: %s", self._socket_path)
+
+    def stop(self):
+        """Stop publishing, disconnecting every subscriber."""
+        AbodeLocalServer.stop(self)
+
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+
+    def _create_server(self):
+        broker = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                messages = broker._subscribe()
+
+                try:
+                    for line in iter(messages.get, None):
+                        self.wfile.write(line)
+                except OSError:
+                    pass
+                finally:
+                    broker._unsubscribe(messages)
+
+        server = socketserver.ThreadingUnixStreamServer(
+            self._socket_path, _Handler)
+        server.daemon_threads = True
+
+        return server
+
+    def _encode(self, event, data):
+        return json.dumps({EVENT: event, DATA: data}).encode() + b'\n'
+
+    def _initial_messages(self):
+        return [self._encode(SNAPSHOT, self._snapshot()),
+                self._encode(CONNECTION, self._abode.events.connected)]
+
+    def _subscribe(self):
+        messages = AbodeLocalServer._subscribe(self)
+
+        _LOGGER.debug("Event subscriber connected")
+
+        return messages
+
+    def _unsubscribe(self, messages):
+        AbodeLocalServer._unsubscribe(self, messages)
+
+        _LOGGER.debug("Event subscriber disconnected")
+
+    def _snapshot(self):
+        # pylint: disable=protected-access
+        return {
+            'panel': self._abode._panel,
+            'devices': [device._json_state
+                        for device in self._abode._devices.values()]
+        }
+
+    def _on_connection(self):
+        connected = self._abode.events.connected
+
+        # Devices were refreshed on connect without device callbacks
+        if connected:
+            self.publish(SNAPSHOT, self._snapshot())
+
+        self.publish(CONNECTION, connected)
+
+    def _on_device(self, device):
+        # pylint: disable=protected-access
+        self.publish(DEVICE, device._json_state)
+
+    def _on_device_removed(self, device):
+        self.publish(REMOVED, device.device_id)
+
+    def _on_timeline(self, event):
+        self.publish(CONST.TIMELINE_EVENT, event)
+
+    def _on_automation(self, event):
+        self.publish(CONST.AUTOMATION_EVENT, event)
+
+
+class AbodeBrokerClient():
+    """Receive the events of an AbodeEventBroker.
+
+    Stands in for the SocketIO connection of an event controller, so a
+    subscriber registers callbacks exactly as it would with its own
+    connection. Lost broker connections are retried every retry_interval.
+    """
+
+    def __init__(self, socket_path=CONST.BROKER_SOCKET_PATH,
+                 retry_interval=CONST.BROKER_RETRY_INTERVAL):
+        """Init the broker client."""
+        self._socket_path = socket_path
+        self._retry_interval = retry_interval
+        self._callbacks = collections.defaultdict(list)
+        self._thread = None
+        self._socket = None
+        self._connected = False
+        self._exit_event = threading.Event()
+
+    # pylint: disable=C0103
+    def on(self, event_name, callback):
+        """Register callback for a broker event."""
+        if not event_name:
+            return False
+
+        self._callbacks[event_name].append(callback)
+
+        return True
+
+    def set_cookie(self, cookie=None):
+        """Ignore the cookie, the broker holds the Abode session."""
+
+    def start(self):
+        """Start a thread to receive broker events."""
+        if not self._thread:
+            _LOGGER.info("Starting event broker client thread...")
+
+            self._exit_event.clear()
+            self._thread = threading.Thread(target=self._run,
+                                            name='BrokerClientThread')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Tell the client thread to terminate."""
+        if self._thread:
+            _LOGGER.info("Stopping event broker client thread...")
+
+            self._exit_event.set()
+
+            sock = self._socket
+
+            if sock:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._exit_event.is_set():
+            try:
+                with socket.socket(socket.AF_UNIX,
+                                   socket.SOCK_STREAM) as sock:
+                    sock.connect(self._socket_path)
+                    self._socket = sock
+
+                    _LOGGER.debug("Connected to event broker: %s",
+                                  self._socket_path)
+
+                    with sock.makefile('rb') as stream:
+                        for line in stream:
+                            self._handle_line(line)
+            except OSError as exc:
+                _LOGGER.debug("Event broker connection failed: %s", exc)
+            finally:
+                self._socket = None
+                self._set_connected(False)
+
+            self._exit_event.wait(self._retry_interval)
+
+    def _handle_line(self, line):
+        try:
+            message = json.loads(line.decode())
+        except ValueError:
+            _LOGGER.warning("Invalid event broker message: %s", line)
+            return
+
+        event = message.get(EVENT)
+
+        if event == CONNECTION:
+            self._set_connected(bool(message.get(DATA)))
+        else:
+            self._handle_event(event, message.get(DATA))
+
+    def _set_connected(self, connected):
+        if connected == self._connected:
+            return
+
+        self._connected = connected
+        self._handle_event(sio.CONNECTED if connected else sio.DISCONNECTED)
+
+    def _handle_event(self, event_name, event_data=None):
+        for callback in self._callbacks.get(event_name, ()):
+            try:
+                if event_data is not None:
+                    callback(event_data)
+                else:
+                    callback()
+            # pylint: disable=W0703
+            except Exception as exc:
+                _LOGGER.exception(
+                    "Captured exception during broker event callback: %s",
+                    exc)
+
+
+def create_device(state, abode):
+    """Create a device from a state published by the broker."""
+    if state.get('generic_type') == CONST.TYPE_ALARM:
+        area = state['id'][len(CONST.ALARM_DEVICE_ID):]
+        return ALARM.AbodeAlarm(dict(state), abode, area)
+
+    return DEVICE_REGISTRY.create_device(dict(state), abode)
@@ -1,45 +1,100 @@
 """Abode cloud push events."""
-import collections
+import functools
 import logging
 
+from abodepy.device_store import AbodeDeviceStore
 from abodepy.devices import AbodeDevice
+from abodepy.discovery import AbodeDeviceDiscovery
+import abodepy.event_broker as BROKER
 from abodepy.exceptions import AbodeException
 import abodepy.helpers.constants as CONST
 import abodepy.helpers.errors as ERROR
 import abodepy.helpers.timeline as TIMELINE
+import abodepy.metrics as METRICS
 import abodepy.socketio as sio
+from abodepy.state_applier import AbodeStateApplier
+from abodepy.subscriptions import SubscriptionRegistry
+import abodepy.tracing as TRACING
 
 _LOGGER = logging.getLogger(__name__)
 
+_DEVICE_ADDED = 'added'
+_DEVICE_REMOVED = 'removed'
+
 
 class AbodeEventController():
     """Class for subscribing to abode events."""
 
-    def __init__(self, abode, url=CONST.SOCKETIO_URL):
-        """Init event subscription class."""
+    def __init__(self, abode, url=CONST.SOCKETIO_URL, compress=False,
+                 broker_path=None):
+        """Init event subscription class.
+
+        With a broker_path events come from the AbodeEventBroker serving
+        that socket instead of a SocketIO connection of our own.
+        """
         self._abode = abode
+        self._metrics = abode.metrics
+        self._tracer = abode.tracer
         self._thread = None
         self._running = False
         self._connected = False
-
-        # Setup callback dicts
-        self._connection_status_callbacks = collections.defaultdict(list)
-        self._device_callbacks = collections.defaultdict(list)
-        self._event_callbacks = collections.defaultdict(list)
-        self._timeline_callbacks = collections.defaultdict(list)
+        self._applier = AbodeStateApplier(abode)
+        self._discovery = AbodeDeviceDiscovery(
+            abode, on_added=self._device_added)
+
+        # Setup callback registries
+        self._connection_status_callbacks = SubscriptionRegistry(
+            self._update_callback_gauges)
+        self._device_callbacks = SubscriptionRegistry(
+            self._update_callback_gauges)
+        self._field_callbacks = SubscriptionRegistry(
+            self._update_callback_gauges)
+        self._device_change_callbacks = SubscriptionRegistry()
+        self._event_callbacks = SubscriptionRegistry(
+            self._update_callback_gauges)
+        self._timeline_callbacks = SubscriptionRegistry(
+            self._update_callback_gauges)
+
+        # Setup Abode push event handlers
+        self._event_handlers = {
+            CONST.DEVICE_UPDATE_EVENT: self._on_device_update,
+            CONST.GATEWAY_MODE_EVENT: self._on_mode_change,
+            CONST.TIMELINE_EVENT: self._on_timeline_update,
+            CONST.AUTOMATION_EVENT: self._on_automation_update
+        }
+
+        if broker_path:
+            self._setup_broker(broker_path)
+            return
 
         # Setup SocketIO
         self._socketio = sio.SocketIO(url=url,
-                                      origin=CONST.BASE_URL)
+                                      origin=CONST.BASE_URL,
+                                      compress=compress,
+                                      metrics=self._metrics)
 
         # Setup SocketIO Callbacks
         self._socketio.on(sio.STARTED, self._on_socket_started)
         self._socketio.on(sio.CONNECTED, self._on_socket_connected)
         self._socketio.on(sio.DISCONNECTED, self._on_socket_disconnected)
-        self._socketio.on(CONST.DEVICE_UPDATE_EVENT, self._on_device_update)
-        self._socketio.on(CONST.GATEWAY_MODE_EVENT, self._on_mode_change)
-        self._socketio.on(CONST.TIMELINE_EVENT, self._on_timeline_update)
-        self._socketio.on(CONST.AUTOMATION_EVENT, self._on_automation_update)
+
+        for event_name in self._event_handlers:
+            self._socketio.on(event_name,
+                              functools.partial(self.dispatch, event_name))
+
+    def _setup_broker(self, broker_path):
+        # The broker applied the events already, only its device states
+        # are applied here so subscribers never call Abode themselves
+        self._socketio = BROKER.AbodeBrokerClient(broker_path)
+
+        self._socketio.on(sio.CONNECTED, self._on_broker_connected)
+        self._socketio.on(sio.DISCONNECTED, self._on_socket_disconnected)
+        self._socketio.on(BROKER.SNAPSHOT, self._on_broker_snapshot)
+        self._socketio.on(BROKER.DEVICE, self._on_broker_device)
+        self._socketio.on(BROKER.REMOVED, self._remove_device)
+        self._socketio.on(CONST.TIMELINE_EVENT, self._notify_timeline)
+        self._socketio.on(CONST.AUTOMATION_EVENT,
+                          self._on_automation_update)
 
     def start(self):
         """Start a thread to handle Abode SocketIO notifications."""
@@ -48,18 +103,22 @@ class AbodeEventController():
     def stop(self):
         """Tell the subscription thread to terminate - will block."""
         self._socketio.stop()
+        self._applier.cancel()
 
-    def add_connection_status_callback(self, unique_id, callback):
-        """Register callback for Abode server connection status."""
+    def add_connection_status_callback(self, unique_id, callback,
+                                       weak=False):
+        """Register callback for Abode server connection status.
+
+        Returns a Subscription handle, see add_device_callback().
+        """
         if not unique_id:
             return False
 
         _LOGGER.debug(
             "Subscribing to Abode connection updates for: %s", unique_id)
 
-        self._connection_status_callbacks[unique_id].append((callback))
-
-        return True
+        return self._connection_status_callbacks.add(
+            [unique_id], callback, weak)
 
     def remove_connection_status_callback(self, unique_id):
         """Unregister connection status callbacks."""
@@ -69,65 +128,97 @@ class AbodeEventController():
         _LOGGER.debug(
             "Unsubscribing from Abode connection updates for : %s", unique_id)
 
-        self._connection_status_callbacks[unique_id].clear()
+        self._connection_status_callbacks.remove(unique_id)
 
         return True
 
-    def add_device_callback(self, devices, callback):
-        """Register a device callback."""
+    def add_device_callback(self, devices, callback, weak=False):
+        """Register a device callback.
+
+        Devices are devices, device ids or CONST.ALL_DEVICES for every
+        device. Returns a Subscription handle whose cancel() unregisters
+        the callback. With weak=True bound methods are held weakly, so
+        they unregister themselves when their object is collected.
+        """
         if not devices:
             return False
 
         if not isinstance(devices, (tuple, list)):
             devices = [devices]
 
-        for device in devices:
-            # Device may be a device_id
-            device_id = device
-
-            # If they gave us an actual device, get that devices ID
-            if isinstance(device, AbodeDevice):
-                device_id = device.device_id
-
-            # Validate the device is valid
-            if not self._abode.get_device(device_id):
-                raise AbodeException((ERROR.EVENT_DEVICE_INVALID))
-
-            _LOGGER.debug(
-                "Subscribing to updates for device_id: %s", device_id)
+        device_ids = [self._cached_device_id(device) for device in devices]
 
-            self._device_callbacks[device_id].append((callback))
+        _LOGGER.debug("Subscribing to updates for device_ids: %s", device_ids)
 
-        return True
+        return self._device_callbacks.add(device_ids, callback, weak)
 
     def remove_all_device_callbacks(self, devices):
-        """Unregister all callbacks for a device."""
+        """Unregister all device and field callbacks of devices.
+
+        Returns False if a device had no callbacks to remove.
+        """
         if not devices:
             return False
 
         if not isinstance(devices, (tuple, list)):
             devices = [devices]
 
+        removed = True
+
         for device in devices:
-            device_id = device
+            device_id = self._cached_device_id(device)
 
-            if isinstance(device, AbodeDevice):
-                device_id = device.device_id
+            _LOGGER.debug(
+                "Unsubscribing from all updates for device_id: %s", device_id)
 
-            if not self._abode.get_device(device_id):
-                raise AbodeException((ERROR.EVENT_DEVICE_INVALID))
+            # Field callbacks go too, even without plain device callbacks
+            field_removed = self._field_callbacks.remove(device_id)
 
-            if device_id not in self._device_callbacks:
-                return False
+            if (not self._device_callbacks.remove(device_id) and
+                    not field_removed):
+                removed = False
 
-            _LOGGER.debug(
-                "Unsubscribing from all updates for device_id: %s", device_id)
+        return removed
 
-            self._device_callbacks[device_id].clear()
+    def add_device_field_callback(self, devices, fields, callback,
+                                  predicate=None, weak=False):
+        """Register a callback for changes to some fields of devices.
 
-        return True
+        Fields are json keys such as status, or dotted keys of nested
+        objects such as statuses.temperature; faults matches every
+        faults.* field. The callback gets (device, changes), where changes
+        maps each changed field to a DeviceChange(old, new). An optional
+        predicate(device, changes) must also return True. Returns a
+        Subscription handle, see add_device_callback().
+        """
+        if not devices or not fields:
+            return False
+
+        if not isinstance(devices, (tuple, list)):
+            devices = [devices]
+
+        if not isinstance(fields, (tuple, list)):
+            fields = [fields]
+
+        device_ids = [self._cached_device_id(device) for device in devices]
+
+        _LOGGER.debug("Subscribing to %s changes for device_ids: %s",
+                      fields, device_ids)
 
-    def add_event_callback(self, event_groups, callback):
+        return self._field_callbacks.add(
+            device_ids, callback, weak, (tuple(fields), predicate))
+
+    def add_device_added_callback(self, callback, weak=False):
+        """Register a callback for devices discovered from push events."""
+        return self._device_change_callbacks.add(
+            [_DEVICE_ADDED], callback, weak)
+
+    def add_device_removed_callback(self, callback, weak=False):
+        """Register a callback for devices Abode no longer returns."""
+        return self._device_change_callbacks.add(
+            [_DEVICE_REMOVED], callback, weak)
+
+    def add_event_callback(self, event_groups, callback, weak=False):
         """Register callback for a group of timeline events."""
         if not event_groups:
             return False
@@ -142,11 +233,9 @@ class AbodeEventController():
 
             _LOGGER.debug("Subscribing to event group: %s", event_group)
 
-            self._event_callbacks[event_group].append((callback))
-
-        return True
+        return self._event_callbacks.add(event_groups, callback, weak)
 
-    def add_timeline_callback(self, timeline_events, callback):
+    def add_timeline_callback(self, timeline_events, callback, weak=False):
         """Register a callback for a specific timeline event."""
         if not timeline_events:
             return False
@@ -154,6 +243,8 @@ class AbodeEventController():
         if not isinstance(timeline_events, (tuple, list)):
             timeline_events = [timeline_events]
 
+        event_codes = []
+
         for timeline_event in timeline_events:
             if not isinstance(timeline_event, dict):
                 raise AbodeException((ERROR.EVENT_CODE_MISSING))
@@ -165,10 +256,46 @@ class AbodeEventController():
 
             _LOGGER.debug("Subscribing to timeline event: %s", timeline_event)
 
-            self._timeline_callbacks[event_code].append((callback))
+            event_codes.append(event_code)
+
+        return self._timeline_callbacks.add(event_codes, callback, weak)
+
+    def dispatch(self, event_name, event_data=None):
+        """Handle an Abode push event as if it came from the server.
+
+        Used for SocketIO events and to replay journaled events.
+        """
+        handler = self._event_handlers.get(event_name)
+
+        if not handler:
+            _LOGGER.debug("Ignoring dispatch of unknown event: %s",
+                          event_name)
+            return False
+
+        with self._tracer.span(TRACING.SOCKETIO_EVENT,
+                               {'abodepy.event': event_name}):
+            handler(event_data)
 
         return True
 
+    def notify_device(self, device):
+        """Run the callbacks of a changed device."""
+        changes = device.pop_changes()
+
+        for callback in self._device_callbacks.callbacks(
+                device.device_id, CONST.ALL_DEVICES):
+            self._execute_callback('device', callback, device)
+
+        if not changes:
+            return
+
+        for callback, (fields, predicate) in self._field_callbacks.entries(
+                device.device_id, CONST.ALL_DEVICES):
+            matched = _match_changes(changes, fields)
+
+            if matched and _execute_predicate(predicate, device, matched):
+                self._execute_callback('device', callback, device, matched)
+
     @property
     def connected(self):
         """Get the Abode connection status."""
@@ -201,21 +328,68 @@ class AbodeEventController():
             # Callbacks should still execute even if refresh fails (Abode
             # server issues) so that the entity availability in Home Assistant
             # is updated since we are in fact connected to the web socket.
-            for callbacks in self._connection_status_callbacks.items():
-                for callback in callbacks[1]:
-                    _execute_callback(callback)
+            for callback in self._connection_status_callbacks.callbacks():
+                self._execute_callback('connection', callback)
 
     def _on_socket_disconnected(self):
         """Socket IO disconnected callback."""
         self._connected = False
 
-        for callbacks in self._connection_status_callbacks.items():
-            # Check if list is not empty.
-            # Applicable when remove_all_device_callbacks
-            # is called before _on_socket_disconnected.
-            if callbacks[1]:
-                for callback in callbacks[1]:
-                    _execute_callback(callback)
+        for callback in self._connection_status_callbacks.callbacks():
+            self._execute_callback('connection', callback)
+
+    def _on_broker_connected(self):
+        """Broker connected callback, its devices are already current."""
+        self._connected = True
+
+        for callback in self._connection_status_callbacks.callbacks():
+            self._execute_callback('connection', callback)
+
+    def _on_broker_snapshot(self, snapshot):
+        """Bring the cached devices in line with the broker's."""
+        # pylint: disable=W0212
+        if self._abode._panel is None:
+            self._abode._panel = snapshot.get('panel')
+
+        # A first snapshot is a fetch of all devices, not additions
+        fetched = self._abode._devices is None
+
+        if fetched:
+            self._abode._devices = AbodeDeviceStore()
+
+        device_ids = set()
+
+        for state in snapshot.get('devices') or []:
+            device_ids.add(state.get('id'))
+            self._apply_broker_state(state, not fetched)
+
+        for device in self._abode._devices.values():
+            if device.device_id not in device_ids:
+                self._remove_device(device.device_id)
+
+    def _on_broker_device(self, state):
+        """Device state published by the broker."""
+        # pylint: disable=W0212
+        if self._abode._devices is None:
+            return
+
+        self._apply_broker_state(state, True)
+
+    def _apply_broker_state(self, state, announce):
+        # pylint: disable=W0212
+        devices = self._abode._devices
+        device = devices.get(state.get('id'))
+
+        if device:
+            device.update(state)
+            self.notify_device(device)
+            return
+
+        device = BROKER.create_device(state, self._abode)
+
+        if (device and devices.setdefault(device.device_id, device) is device
+                and announce):
+            self._device_added(device)
 
     def _on_device_update(self, devid):
         """Device callback from Abode SocketIO server."""
@@ -228,19 +402,56 @@ class AbodeEventController():
 
         _LOGGER.debug("Device update event for device ID: %s", devid)
 
-        device = self._abode.get_device(devid, True)
+        # The timeline or mode event for this change was already applied
+        if self._applier.explains_update(devid):
+            _LOGGER.debug("Device update already applied: %s", devid)
+            return
 
-        if not device:
-            _LOGGER.debug("Got device update for unknown device: %s", devid)
+        # Another change close behind an applied event, refresh once the
+        # event's window ends to pick up both
+        if self._applier.recently_applied(devid):
+            _LOGGER.debug("Deferring refresh of updated device: %s", devid)
+            self._applier.refresh_after_window(devid)
             return
 
-        for callback in self._device_callbacks.get(device.device_id, ()):
-            _execute_callback(callback, device)
+        with self._tracer.span(TRACING.DEVICE_UPDATE, {'device_id': devid}):
+            # A first fetch of all devices is as fresh as a refresh
+            # pylint: disable=W0212
+            fetched = self._abode._devices is None
+            device = self._abode.get_device(devid)
+
+            if not device:
+                device = self._discover_device(devid)
+
+                if not device:
+                    _LOGGER.debug("Got device update for unknown device: %s",
+                                  devid)
+                    return
+            elif not fetched and not device.refresh():
+                self._remove_device(devid)
+                return
+
+            self._applier.refreshed(device.device_id)
+
+            self.notify_device(device)
 
     def _on_mode_change(self, mode):
-        """Mode change broadcast from Abode SocketIO server."""
+        """Mode change broadcast from Abode SocketIO server.
+
+        The mode applies to area 1 unless the event names an area, either
+        as a {'area': ..., 'mode': ...} dict or as [mode, area].
+        """
+        area = '1'
+
         if isinstance(mode, (tuple, list)):
-            mode = mode[0]
+            if len(mode) > 1 and mode[1] is not None:
+                area = str(mode[1])
+
+            mode = mode[0] if mode else None
+
+        if isinstance(mode, dict):
+            area = str(mode.get('area', area))
+            mode = mode.get('mode')
 
         if mode is None:
             _LOGGER.warning("Mode change event with no mode.")
@@ -250,19 +461,17 @@ class AbodeEventController():
             _LOGGER.warning("Mode change event with unknown mode: %s", mode)
             return
 
-        _LOGGER.debug("Alarm mode change event to: %s", mode)
+        _LOGGER.debug("Alarm mode change event for area %s to: %s",
+                      area, mode)
 
-        # We're just going to convert it to an Alarm device
-        alarm_device = self._abode.get_alarm(refresh=True)
+        # Refreshing after a mode change notification doesn't get the
+        # latest mode immediately, so the event itself is the best state.
+        alarm_device = self._applier.apply_mode(mode, area)
 
-        # At the time of development, refreshing after mode change notification
-        # didn't seem to get the latest update immediately. As such, we will
-        # force the mode status now to match the notification.
-        # pylint: disable=W0212
-        alarm_device._json_state['mode']['area_1'] = mode
+        if not alarm_device:
+            return
 
-        for callback in self._device_callbacks.get(alarm_device.device_id, ()):
-            _execute_callback(callback, alarm_device)
+        self.notify_device(alarm_device)
 
     def _on_timeline_update(self, event):
         """Timeline update broadcast from Abode SocketIO server."""
@@ -279,21 +488,49 @@ class AbodeEventController():
         _LOGGER.debug("Timeline event received: %s - %s (%s)",
                       event.get('event_name'), event_type, event_code)
 
+        with self._tracer.span(TRACING.TIMELINE_UPDATE, {
+                'device_id': event.get('device_id'),
+                'event_code': event_code,
+                'event_type': event_type}):
+            # Pick up devices added since the devices were fetched
+            # pylint: disable=W0212
+            device_id = event.get('device_id')
+
+            if (device_id and self._abode._devices is not None and
+                    device_id not in self._abode._devices):
+                self._discover_device(device_id)
+
+            # Update the cached device before anyone looks at it
+            device = self._applier.apply_timeline(event)
+
+            if device:
+                self.notify_device(device)
+
+            self._notify_timeline(event)
+
+    def _notify_timeline(self, event):
+        """Run the callbacks of a timeline event."""
+        event_code = event.get('event_code')
+
         # Compress our callbacks into those that match this event_code
         # or ones registered to get callbacks for all events
-        codes = (event_code, TIMELINE.ALL['event_code'])
-        all_callbacks = [self._timeline_callbacks[code] for code in codes]
-
-        for callbacks in all_callbacks:
-            for callback in callbacks:
-                _execute_callback(callback, event)
+        for callback in self._timeline_callbacks.callbacks(
+                event_code, TIMELINE.ALL['event_code']):
+            self._execute_callback('timeline', callback, event)
 
         # Attempt to map the event code to a group and callback
         event_group = TIMELINE.map_event_code(event_code)
 
         if event_group:
-            for callback in self._event_callbacks.get(event_group, ()):
-                _execute_callback(callback, event)
+            for callback in self._event_callbacks.callbacks(event_group):
+                self._execute_callback('event', callback, event)
+
+        # Panel faults and restores may come with settings changes
+        # pylint: disable=W0212
+        if (event_group in (TIMELINE.PANEL_FAULT_GROUP,
+                            TIMELINE.PANEL_RESTORE_GROUP) and
+                self._abode._settings):
+            self._abode._settings.invalidate()
 
     def _on_automation_update(self, event):
         """Automation update broadcast from Abode SocketIO server."""
@@ -302,8 +539,113 @@ class AbodeEventController():
         if isinstance(event, (tuple, list)):
             event = event[0]
 
-        for callback in self._event_callbacks.get(event_group, ()):
-            _execute_callback(callback, event)
+        # Apply the edit to the cached automation rather than refetching
+        # pylint: disable=W0212
+        automations = self._abode._automations
+
+        if (isinstance(event, dict) and automations is not None and
+                event.get('id') is not None and
+                (str(event['id']) in automations or 'name' in event)):
+            self._abode._update_automation(event)
+
+        for callback in self._event_callbacks.callbacks(event_group):
+            self._execute_callback('event', callback, event)
+
+    def _cached_device_id(self, device):
+        # Validate against the cache only, registering never fetches
+        device_id = device
+
+        if isinstance(device, AbodeDevice):
+            device_id = device.device_id
+
+        # pylint: disable=W0212
+        devices = self._abode._devices
+
+        if (device_id != CONST.ALL_DEVICES and devices is not None and
+                device_id not in devices):
+            raise AbodeException((ERROR.EVENT_DEVICE_INVALID))
+
+        return device_id
+
+    def _discover_device(self, device_id):
+        # Device added callbacks are fired by the discovery that added it
+        return self._discovery.discover(device_id)
+
+    def _device_added(self, device):
+        for callback in self._device_change_callbacks.callbacks(
+                _DEVICE_ADDED):
+            self._execute_callback('device_added', callback, device)
+
+    def _remove_device(self, device_id):
+        device = self._discovery.evict(device_id)
+
+        if not device:
+            return
+
+        for callback in self._device_change_callbacks.callbacks(
+                _DEVICE_REMOVED):
+            self._execute_callback('device_removed', callback, device)
+
+        self._device_callbacks.remove(device_id)
+        self._field_callbacks.remove(device_id)
+
+    def _execute_callback(self, event_type, callback, *args):
+        if not self._metrics.enabled and not self._tracer.enabled:
+            _execute_callback(callback, *args)
+            return
+
+        with self._tracer.span(TRACING.CALLBACK,
+                               _callback_attributes(event_type, callback,
+                                                    args)), \
+                self._metrics.timer(METRICS.CALLBACK_SECONDS,
+                                    {'event': event_type}):
+            _execute_callback(callback, *args)
+
+    def _update_callback_gauges(self):
+        if not self._metrics.enabled:
+            return
+
+        for event_type, callbacks in (
+                ('connection', self._connection_status_callbacks),
+                ('device', self._device_callbacks),
+                ('field', self._field_callbacks),
+                ('event', self._event_callbacks),
+                ('timeline', self._timeline_callbacks)):
+            self._metrics.set(METRICS.CALLBACKS_REGISTERED,
+                              callbacks.count(), {'event': event_type})
+
+
+def _callback_attributes(event_type, callback, args):
+    attributes = {
+        'abodepy.event': event_type,
+        'abodepy.callback': getattr(callback, '__qualname__', repr(callback))
+    }
+
+    if args and isinstance(args[0], AbodeDevice):
+        attributes['device_id'] = args[0].device_id
+    elif args and isinstance(args[0], dict):
+        attributes['device_id'] = args[0].get('device_id')
+        attributes['event_code'] = args[0].get('event_code')
+
+    return attributes
+
+
+def _match_changes(changes, fields):
+    return {field: change for field, change in changes.items()
+            if any(field == name or field.startswith(name + '.')
+                   for name in fields)}
+
+
+def _execute_predicate(predicate, device, changes):
+    if predicate is None:
+        return True
+
+    try:
+        return predicate(device, changes)
+    # pylint: disable=W0703
+    except Exception as exc:
+        _LOGGER.warning("Captured exception during predicate: %s", exc)
+        return False
 
 
 def _execute_callback(callback, *args, **kwargs):
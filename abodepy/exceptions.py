@@ -18,5 +18,9 @@ class AbodeAuthenticationException(AbodeException):
     """Class to throw authentication exception."""
 
 
+class AbodeNotFoundException(AbodeException):
+    """Class to throw not found exception."""
+
+
 class SocketIOException(AbodeException):
     """Class to throw SocketIO Error exception."""
@@ -0,0 +1,244 @@
+"""Local HTTP gateway serving the cached state of one Abode instance."""
+import hashlib
+import http.server
+import json
+import logging
+import queue
+import socketserver
+
+from abodepy.local_server import AbodeLocalServer
+import abodepy.helpers.constants as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+DEVICES_PATH = '/devices'
+AUTOMATIONS_PATH = '/automations'
+PANEL_PATH = '/panel'
+EVENTS_PATH = '/events'
+
+DEVICE = 'device'
+REMOVED = 'removed'
+TIMELINE_EVENT = 'timeline'
+AUTOMATION = 'automation'
+CONNECTION = 'connection'
+
+_GATEWAY_ID = 'abodepy.gateway'
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class AbodeGateway(AbodeLocalServer):
+    """Serve device, automation and panel state as JSON over HTTP.
+
+    Response bodies are serialized once and reused until the state they
+    show changes: device and panel bodies follow the device store
+    version, automation bodies are dropped on automation events. Every
+    body has an ETag, so If-None-Match requests get a 304. /events is a
+    Server-Sent-Events stream of device, timeline, automation and
+    connection changes.
+    """
+
+    _ID = _GATEWAY_ID
+
+    def __init__(self, abode, host=CONST.GATEWAY_HOST,
+                 port=CONST.GATEWAY_PORT,
+                 queue_size=CONST.GATEWAY_QUEUE_SIZE, listen=True):
+        """Init the gateway for an Abode instance."""
+        AbodeLocalServer.__init__(self, abode, queue_size, listen)
+        self._address = (host, port)
+        self._bodies = {}
+        self._event_id = 0
+
+    def start(self):
+        """Bind the HTTP server and start listening to Abode."""
+        self._abode.get_devices()
+        self._abode.get_automations()
+
+        AbodeLocalServer.start(self)
+
+        _LOGGER.info("Serving Abode state on: http://%s:%s",
+                     *self.server_address)
+
+    def invalidate(self):
+        """Drop every cached body, e.g. after changing automations."""
+        with self._lock:
+            self._bodies.clear()
+
+    @property
+    def server_address(self):
+        """Get the (host, port) the gateway is bound to."""
+        if self._server:
+            return self._server.server_address[:2]
+
+        return self._address
+
+    def body(self, path):
+        """Get the (etag, body) of a path, or None if there is none."""
+        version = self._abode.device_snapshot.version
+
+        with self._lock:
+            cached = self._bodies.get(path)
+
+            # Bodies of device state are stale once the store moved on
+            if cached and (cached[0] is None or cached[0] == version):
+                return cached[1:]
+
+            state = self._state(path)
+
+            if state is None:
+                return None
+
+            body = json.dumps(state).encode()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+            if path.startswith(AUTOMATIONS_PATH):
+                version = None
+
+            self._bodies[path] = (version, etag, body)
+
+            return etag, body
+
+    def _create_server(self):
+        gateway = self
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Serve a state body or the event stream."""
+                path = self.path.split('?', 1)[0].rstrip('/')
+
+                if path == EVENTS_PATH:
+                    gateway._stream(self)
+                else:
+                    gateway._respond(self, path)
+
+            def log_message(self, format, *args):
+                # pylint: disable=redefined-builtin
+                _LOGGER.debug("Gateway request: " + format, *args)
+
+        return _HTTPServer(self._address, _Handler)
+
+    def _encode(self, event, data):
+        # Called under the lock, so event ids follow publish order
+        self._event_id += 1
+
+        return 'id: {}\nevent: {}\ndata: {}\n\n'.format(
+            self._event_id, event, json.dumps(data)).encode()
+
+    def _state(self, path):
+        # pylint: disable=protected-access
+        if path == DEVICES_PATH:
+            return [device._json_state
+                    for device in self._abode.device_snapshot.devices.values()]
+
+        if path == PANEL_PATH:
+            return self._abode._panel
+
+        if path == AUTOMATIONS_PATH:
+            return [automation._automation
+                    for automation in self._abode.get_automations()]
+
+        if path.startswith(DEVICES_PATH + '/'):
+            device = self._abode.device_snapshot.devices.get(
+                path[len(DEVICES_PATH) + 1:])
+            return device._json_state if device else None
+
+        if path.startswith(AUTOMATIONS_PATH + '/'):
+            automation = self._abode.get_automation(
+                path[len(AUTOMATIONS_PATH) + 1:])
+            return automation._automation if automation else None
+
+        return None
+
+    def _respond(self, handler, path):
+        response = self.body(path)
+
+        if response is None:
+            handler.send_error(404)
+            return
+
+        etag, body = response
+
+        if _etag_matches(handler.headers.get('If-None-Match'), etag):
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.end_headers()
+            return
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.send_header('ETag', etag)
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _stream(self, handler):
+        messages = self._subscribe()
+
+        handler.close_connection = True
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+
+        try:
+            handler.wfile.write(b': connected\n\n')
+            handler.wfile.flush()
+
+            while True:
+                try:
+                    message = messages.get(
+                        timeout=CONST.GATEWAY_KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    # Comments keep proxies from timing the stream out
+                    message = b': keepalive\n\n'
+
+                if message is None:
+                    break
+
+                handler.wfile.write(message)
+                handler.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            self._unsubscribe(messages)
+
+    def _on_connection(self):
+        # Everything was refreshed on connect, automations included
+        if self._abode.events.connected:
+            self.invalidate()
+
+        self.publish(CONNECTION, self._abode.events.connected)
+
+    def _on_device(self, device):
+        # pylint: disable=protected-access
+        self.publish(DEVICE, device._json_state)
+
+    def _on_device_removed(self, device):
+        self.publish(REMOVED, device.device_id)
+
+    def _on_timeline(self, event):
+        self.publish(TIMELINE_EVENT, event)
+
+    def _on_automation(self, event):
+        with self._lock:
+            for path in [path for path in self._bodies
+                         if path.startswith(AUTOMATIONS_PATH)]:
+                del self._bodies[path]
+
+        self.publish(AUTOMATION, event)
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+
+    tags = [tag.strip() for tag in header.split(',')]
+
+    # Weak comparison, as If-None-Match asks for
+    return '*' in tags or any(
+        (tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
@@ -40,6 +40,20 @@ PROJECT_GITHUB_REPOSITORY = 'abodepy'
 PYPI_URL = 'https://pypi.python.org/pypi/{}'.format(PROJECT_PACKAGE_NAME)
 
 CACHE_PATH = './abode.pickle'
+DAEMON_SOCKET_PATH = './abode.sock'
+BROKER_SOCKET_PATH = './abode-events.sock'
+BROKER_QUEUE_SIZE = 1000
+BROKER_RETRY_INTERVAL = 5
+GATEWAY_HOST = '127.0.0.1'
+GATEWAY_PORT = 8350
+GATEWAY_QUEUE_SIZE = 1000
+GATEWAY_KEEPALIVE_INTERVAL = 15
+BATCH_MAX_WORKERS = 8
+OPTIMISTIC_CONFIRM_TIMEOUT = 10
+EVENT_STATE_WINDOW = 5
+EVENT_REFRESH_DELAY = 2
+DISCOVERY_INTERVAL = 60
+AUTH_REFRESH_MARGIN = 60
 COOKIES = "cookies"
 
 ID = 'id'
@@ -80,6 +94,19 @@ AUTOMATION_URL = BASE_URL + 'integrations/v1/automations/'
 AUTOMATION_ID_URL = AUTOMATION_URL + '$AUTOMATIONID$/'
 AUTOMATION_APPLY_URL = AUTOMATION_ID_URL + 'apply'
 
+TIMELINE_URL = BASE_URL + 'api/v1/timeline'
+
+
+def get_timeline_url(size, event_id=None):
+    """Create timeline page URL, paging backwards from event_id."""
+    url = TIMELINE_URL + '?dir=next&size=' + str(size)
+
+    if event_id is not None:
+        url += '&event_id=' + str(event_id)
+
+    return url
+
+
 TIMELINE_IMAGES_ID_URL = BASE_URL + \
     'api/v1/timeline?device_id=$DEVID$&dir=next' + \
     '&event_label=Image+Capture&size=1'
@@ -96,6 +123,9 @@ GATEWAY_MODE_EVENT = 'com.goabode.gateway.mode'
 TIMELINE_EVENT = 'com.goabode.gateway.timeline'
 AUTOMATION_EVENT = 'com.goabode.automation'
 
+# Device id that subscribes a callback to every device
+ALL_DEVICES = '*'
+
 # DICTIONARIES
 MODE_STANDBY = 'standby'
 MODE_HOME = 'home'
@@ -207,6 +237,8 @@ LUX_STATUS_KEY = 'lux'
 HUMI_STATUS_KEY = 'humidity'
 SENSOR_KEYS = [TEMP_STATUS_KEY, LUX_STATUS_KEY, HUMI_STATUS_KEY]
 
+SENSOR_HISTORY_SIZE = 1024
+
 UNIT_CELSIUS = '°C'
 UNIT_FAHRENHEIT = '°F'
 UNIT_PERCENT = '%'
@@ -216,60 +248,64 @@ LUX = 'lux'
 BRIGHTNESS_KEY = 'statusEx'
 
 
+# Map of type tag to generic type, extended by register_device_type()
+GENERIC_TYPES = {
+    # Alarm
+    DEVICE_ALARM: TYPE_ALARM,
+
+    # Binary Sensors - Connectivity
+    DEVICE_GLASS_BREAK: TYPE_CONNECTIVITY,
+    DEVICE_KEYPAD: TYPE_CONNECTIVITY,
+    DEVICE_REMOTE_CONTROLLER: TYPE_CONNECTIVITY,
+    DEVICE_SIREN: TYPE_CONNECTIVITY,
+    DEVICE_STATUS_DISPLAY: TYPE_CONNECTIVITY,
+
+    # Binary Sensors - Opening
+    DEVICE_DOOR_CONTACT: TYPE_OPENING,
+
+    # Cameras
+    DEVICE_MOTION_CAMERA: TYPE_CAMERA,
+    DEVICE_MOTION_VIDEO_CAMERA: TYPE_CAMERA,
+    DEVICE_IP_CAM: TYPE_CAMERA,
+    DEVICE_OUTDOOR_MOTION_CAMERA: TYPE_CAMERA,
+    DEVICE_OUTDOOR_SMART_CAMERA: TYPE_CAMERA,
+
+    # Covers
+    DEVICE_SECURE_BARRIER: TYPE_COVER,
+
+    # Lights (Dimmers)
+    DEVICE_DIMMER: TYPE_LIGHT,
+    DEVICE_DIMMER_METER: TYPE_LIGHT,
+    DEVICE_HUE: TYPE_LIGHT,
+
+    # Locks
+    DEVICE_DOOR_LOCK: TYPE_LOCK,
+
+    # Moisture
+    DEVICE_WATER_SENSOR: TYPE_CONNECTIVITY,
+
+    # Switches
+    DEVICE_SWITCH: TYPE_SWITCH,
+    DEVICE_NIGHT_SWITCH: TYPE_SWITCH,
+    DEVICE_POWER_SWITCH_SENSOR: TYPE_SWITCH,
+    DEVICE_POWER_SWITCH_METER: TYPE_SWITCH,
+
+    # Water Valve
+    DEVICE_VALVE: TYPE_VALVE,
+
+    # Unknown Sensors
+    # More data needed to determine type
+    DEVICE_ROOM_SENSOR: TYPE_UNKNOWN_SENSOR,
+    DEVICE_TEMPERATURE_SENSOR: TYPE_UNKNOWN_SENSOR,
+    DEVICE_MULTI_SENSOR: TYPE_UNKNOWN_SENSOR,
+    DEVICE_PIR: TYPE_UNKNOWN_SENSOR,
+    DEVICE_POVS: TYPE_UNKNOWN_SENSOR,
+}
+
+
 def get_generic_type(type_tag):
     """Map type tag to generic type."""
-    return {
-        # Alarm
-        DEVICE_ALARM: TYPE_ALARM,
-
-        # Binary Sensors - Connectivity
-        DEVICE_GLASS_BREAK: TYPE_CONNECTIVITY,
-        DEVICE_KEYPAD: TYPE_CONNECTIVITY,
-        DEVICE_REMOTE_CONTROLLER: TYPE_CONNECTIVITY,
-        DEVICE_SIREN: TYPE_CONNECTIVITY,
-        DEVICE_STATUS_DISPLAY: TYPE_CONNECTIVITY,
-
-        # Binary Sensors - Opening
-        DEVICE_DOOR_CONTACT: TYPE_OPENING,
-
-        # Cameras
-        DEVICE_MOTION_CAMERA: TYPE_CAMERA,
-        DEVICE_MOTION_VIDEO_CAMERA: TYPE_CAMERA,
-        DEVICE_IP_CAM: TYPE_CAMERA,
-        DEVICE_OUTDOOR_MOTION_CAMERA: TYPE_CAMERA,
-        DEVICE_OUTDOOR_SMART_CAMERA: TYPE_CAMERA,
-
-        # Covers
-        DEVICE_SECURE_BARRIER: TYPE_COVER,
-
-        # Lights (Dimmers)
-        DEVICE_DIMMER: TYPE_LIGHT,
-        DEVICE_DIMMER_METER: TYPE_LIGHT,
-        DEVICE_HUE: TYPE_LIGHT,
-
-        # Locks
-        DEVICE_DOOR_LOCK: TYPE_LOCK,
-
-        # Moisture
-        DEVICE_WATER_SENSOR: TYPE_CONNECTIVITY,
-
-        # Switches
-        DEVICE_SWITCH: TYPE_SWITCH,
-        DEVICE_NIGHT_SWITCH: TYPE_SWITCH,
-        DEVICE_POWER_SWITCH_SENSOR: TYPE_SWITCH,
-        DEVICE_POWER_SWITCH_METER: TYPE_SWITCH,
-
-        # Water Valve
-        DEVICE_VALVE: TYPE_VALVE,
-
-        # Unknown Sensors
-        # More data needed to determine type
-        DEVICE_ROOM_SENSOR: TYPE_UNKNOWN_SENSOR,
-        DEVICE_TEMPERATURE_SENSOR: TYPE_UNKNOWN_SENSOR,
-        DEVICE_MULTI_SENSOR: TYPE_UNKNOWN_SENSOR,
-        DEVICE_PIR: TYPE_UNKNOWN_SENSOR,
-        DEVICE_POVS: TYPE_UNKNOWN_SENSOR,
-    }.get(type_tag.lower(), None)
+    return GENERIC_TYPES.get(type_tag.lower(), None)
 
 
 # Constants to be used to fill our imaginary alarm device
@@ -91,3 +91,21 @@ MFA_CODE_REQUIRED = (
 
 UNKNOWN_MFA_TYPE = (
     33, "Unknown multifactor authentication type.")
+
+INVALID_AUTOMATION_ID = (
+    34, "The given value is not a valid automation ID")
+
+DAEMON_NO_RESPONSE = (
+    35, "No response received from the abodepy daemon.")
+
+DAEMON_COMMAND_FAILED = (
+    36, "The abodepy daemon failed to execute the command.")
+
+INVALID_BATCH_COMMAND = (
+    37, "The given value is not a valid batch device command.")
+
+INVALID_DEVICE_TYPE = (
+    38, "A device type needs a device class or a factory.")
+
+NOT_FOUND = (
+    39, "The requested resource was not found.")
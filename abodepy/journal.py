@@ -0,0 +1,231 @@
+"""Append-only journal of Abode cloud push events."""
+import collections
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+import abodepy.helpers.constants as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.log'
+
+# Record layout: payload length, timestamp, event name length, followed by
+# the utf-8 event name and the utf-8 JSON payload.
+RECORD_HEADER = struct.Struct('<IdH')
+
+DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024
+
+JOURNAL_EVENTS = [CONST.DEVICE_UPDATE_EVENT, CONST.GATEWAY_MODE_EVENT,
+                  CONST.TIMELINE_EVENT, CONST.AUTOMATION_EVENT]
+
+
+class AbodeEventJournal():
+    """Segmented, append-only log of SocketIO events with replay."""
+
+    def __init__(self, path, segment_size=DEFAULT_SEGMENT_SIZE,
+                 max_bytes=None, max_age=None):
+        """Init the event journal.
+
+        Segments roll over once they reach segment_size bytes. Closed
+        segments are removed once the journal exceeds max_bytes or once
+        their newest record is older than max_age seconds.
+        """
+        self._path = path
+        self._segment_size = segment_size
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._handle = None
+        self._segment = None
+        self._segment_end_times = {}
+
+        # Sizes of the closed segments, oldest first, so retention does not
+        # list the directory on every append
+        self._closed = collections.OrderedDict()
+
+        os.makedirs(self._path, exist_ok=True)
+
+        segments = self.segments()
+
+        if segments:
+            self._open_segment(segments[-1])
+
+        self._scan()
+
+    def append(self, event_name, event_data, timestamp=None):
+        """Append an event to the journal."""
+        if timestamp is None:
+            timestamp = time.time()
+
+        name = event_name.encode()
+        payload = json.dumps(event_data, separators=(',', ':')).encode()
+        record = (RECORD_HEADER.pack(len(payload), timestamp, len(name)) +
+                  name + payload)
+
+        with self._lock:
+            if (self._handle is None or
+                    (self._handle.tell() + len(record) > self._segment_size
+                     and self._handle.tell() > 0)):
+                self._roll_segment(timestamp)
+
+            self._handle.write(record)
+            self._handle.flush()
+            self._segment_end_times[self._segment] = timestamp
+
+            self._apply_retention(timestamp)
+
+    def attach(self, event_controller):
+        """Record every push event received by an event controller."""
+        for event_name in JOURNAL_EVENTS:
+            event_controller.socketio.on(
+                event_name, _Recorder(self, event_name))
+
+    def read(self, start=None, end=None):
+        """Iterate (timestamp, event_name, event_data) between two times."""
+        for segment in self.segments():
+            for record in _read_segment(segment):
+                if start is not None and record[0] < start:
+                    continue
+
+                if end is not None and record[0] > end:
+                    return
+
+                yield record
+
+    def replay(self, event_controller, speed=None, start=None, end=None):
+        """Re-feed journaled events into an event controller.
+
+        A speed of 1.0 replays in real time, 2.0 twice as fast and so on.
+        Without a speed the events are dispatched as fast as possible.
+        """
+        previous = None
+        count = 0
+
+        for timestamp, event_name, event_data in self.read(start, end):
+            if speed and previous is not None and timestamp > previous:
+                time.sleep((timestamp - previous) / speed)
+
+            previous = timestamp
+
+            event_controller.dispatch(event_name, event_data)
+            count += 1
+
+        _LOGGER.debug("Replayed %d journal events", count)
+
+        return count
+
+    def segments(self):
+        """Get the segment file paths, oldest first."""
+        return sorted(
+            os.path.join(self._path, name)
+            for name in os.listdir(self._path)
+            if name.endswith(SEGMENT_SUFFIX))
+
+    def close(self):
+        """Close the active segment."""
+        with self._lock:
+            if self._handle:
+                self._handle.close()
+                self._handle = None
+
+    @property
+    def size(self):
+        """Get the total size of all segments in bytes."""
+        return sum(os.path.getsize(segment) for segment in self.segments())
+
+    def _roll_segment(self, timestamp):
+        if self._handle:
+            self._handle.close()
+
+        segment = os.path.join(
+            self._path, '{:020d}{}'.format(int(timestamp * 1000000),
+                                           SEGMENT_SUFFIX))
+
+        # Two segments in the same microsecond share the existing file
+        self._open_segment(segment)
+        self._scan()
+
+    def _open_segment(self, segment):
+        self._segment = segment
+        self._handle = open(segment, 'ab')
+
+    def _scan(self):
+        self._closed = collections.OrderedDict(
+            (segment, os.path.getsize(segment))
+            for segment in self.segments() if segment != self._segment)
+
+    def _apply_retention(self, now):
+        if self._max_age is not None:
+            for segment in list(self._closed):
+                if self._segment_end_time(segment) < now - self._max_age:
+                    self._remove_segment(segment)
+
+        if self._max_bytes is not None:
+            total = sum(self._closed.values()) + self._handle.tell()
+
+            while self._closed and total > self._max_bytes:
+                segment, size = next(iter(self._closed.items()))
+                total -= size
+                self._remove_segment(segment)
+
+    def _segment_end_time(self, segment):
+        if segment not in self._segment_end_times:
+            end_time = 0
+
+            for record in _read_segment(segment):
+                end_time = record[0]
+
+            self._segment_end_times[segment] = end_time
+
+        return self._segment_end_times[segment]
+
+    def _remove_segment(self, segment):
+        _LOGGER.debug("Removing journal segment: %s", segment)
+
+        self._segment_end_times.pop(segment, None)
+        self._closed.pop(segment, None)
+        os.remove(segment)
+
+
+class _Recorder():
+    """SocketIO callback that writes a named event to the journal."""
+
+    def __init__(self, journal, event_name):
+        self._journal = journal
+        self._event_name = event_name
+
+    def __call__(self, event_data=None):
+        self._journal.append(self._event_name, event_data)
+
+
+def _read_segment(segment):
+    """Iterate the records of a segment through a memory map."""
+    with open(segment, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+
+            while offset + RECORD_HEADER.size <= len(data):
+                length, timestamp, name_length = RECORD_HEADER.unpack_from(
+                    data, offset)
+                offset += RECORD_HEADER.size
+
+                if offset + name_length + length > len(data):
+                    _LOGGER.warning("Truncated journal record in: %s",
+                                    segment)
+                    return
+
+                name = data[offset:offset + name_length].decode()
+                offset += name_length
+
+                payload = json.loads(data[offset:offset + length].decode())
+                offset += length
+
+                yield timestamp, name, payload
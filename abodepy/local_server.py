@@ -0,0 +1,159 @@
+"""Base of the local servers that publish one Abode instance's events."""
+import logging
+import queue
+import threading
+
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AbodeLocalServer():
+    """Serve an Abode instance locally, publishing its events to queues.
+
+    Subclasses bind the server in _create_server and turn events into
+    messages in the _on_* callbacks. Every subscriber reads one bounded
+    queue, ended by None; subscribers that fall more than queue_size
+    messages behind are disconnected.
+    """
+
+    _ID = None
+
+    def __init__(self, abode, queue_size, listen=True):
+        """Init the local server for an Abode instance."""
+        self._abode = abode
+        self._queue_size = queue_size
+        self._listen = listen
+        self._server = None
+        self._serving = False
+        self._subscribers = set()
+        self._subscriptions = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Bind the server and start listening to Abode."""
+        events = self._abode.events
+
+        self._subscriptions = [
+            events.add_connection_status_callback(
+                self._ID, self._on_connection, weak=False),
+            events.add_device_callback(
+                CONST.ALL_DEVICES, self._on_device, weak=False),
+            events.add_device_added_callback(self._on_device, weak=False),
+            events.add_device_removed_callback(
+                self._on_device_removed, weak=False),
+            events.add_timeline_callback(
+                TIMELINE.ALL, self._on_timeline, weak=False),
+            events.add_event_callback(
+                TIMELINE.AUTOMATION_EDIT_GROUP, self._on_automation,
+                weak=False)
+        ]
+
+        self._server = self._create_server()
+
+        if self._listen:
+            events.start()
+
+    def serve_forever(self):
+        """Start (if required) and serve until stopped."""
+        if not self._server:
+            self.start()
+
+        self._serving = True
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving, disconnecting every subscriber."""
+        for subscription in self._subscriptions:
+            subscription.cancel()
+
+        self._subscriptions = []
+
+        with self._lock:
+            for messages in self._subscribers:
+                _close(messages)
+
+            self._subscribers.clear()
+
+        if self._server:
+            # shutdown() waits for serve_forever(), which may never run
+            if self._serving:
+                self._server.shutdown()
+                self._serving = False
+
+            self._server.server_close()
+            self._server = None
+
+        if self._listen:
+            self._abode.events.stop()
+
+    def publish(self, event, data):
+        """Send a message to every subscriber."""
+        with self._lock:
+            message = self._encode(event, data)
+
+            for messages in list(self._subscribers):
+                try:
+                    messages.put_nowait(message)
+                except queue.Full:
+                    _LOGGER.warning("Disconnecting slow subscriber of: %s",
+                                    self._ID)
+                    self._subscribers.discard(messages)
+                    _close(messages)
+
+    @property
+    def subscribers(self):
+        """Get the number of connected subscribers."""
+        return len(self._subscribers)
+
+    def _subscribe(self):
+        messages = queue.Queue(self._queue_size)
+
+        # Queued under the lock so no message is published in between
+        with self._lock:
+            for message in self._initial_messages():
+                messages.put_nowait(message)
+
+            self._subscribers.add(messages)
+
+        return messages
+
+    def _unsubscribe(self, messages):
+        with self._lock:
+            self._subscribers.discard(messages)
+
+    def _create_server(self):
+        raise NotImplementedError
+
+    def _encode(self, event, data):
+        raise NotImplementedError
+
+    def _initial_messages(self):
+        return []
+
+    def _on_connection(self):
+        raise NotImplementedError
+
+    def _on_device(self, device):
+        raise NotImplementedError
+
+    def _on_device_removed(self, device):
+        raise NotImplementedError
+
+    def _on_timeline(self, event):
+        raise NotImplementedError
+
+    def _on_automation(self, event):
+        raise NotImplementedError
+
+
+def _close(messages):
+    # Make room for the sentinel that ends the subscriber's handler
+    try:
+        while True:
+            messages.get_nowait()
+    except queue.Empty:
+        pass
+
+    messages.put_nowait(None)
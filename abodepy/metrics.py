@@ -0,0 +1,247 @@
+"""Lightweight counters and latency histograms for abodepy internals."""
+import bisect
+import re
+import threading
+import time
+
+# Latency histogram bucket upper bounds in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+# Metric names
+REQUESTS = 'abodepy_requests_total'
+REQUEST_SECONDS = 'abodepy_request_seconds'
+REQUEST_RETRIES = 'abodepy_request_retries_total'
+LOGINS = 'abodepy_logins_total'
+SOCKETIO_FRAMES = 'abodepy_socketio_frames_total'
+SOCKETIO_BYTES = 'abodepy_socketio_bytes_total'
+SOCKETIO_CONNECTS = 'abodepy_socketio_connects_total'
+SOCKETIO_RECONNECTS = 'abodepy_socketio_reconnects_total'
+CALLBACK_SECONDS = 'abodepy_callback_seconds'
+CALLBACKS_REGISTERED = 'abodepy_callbacks_registered'
+
+HELP = {
+    REQUESTS: 'Abode API requests by method, endpoint and status.',
+    REQUEST_SECONDS: 'Abode API request latency by method and endpoint.',
+    REQUEST_RETRIES: 'Abode API requests retried after a failure.',
+    LOGINS: 'Abode logins.',
+    SOCKETIO_FRAMES: 'SocketIO frames by direction and type.',
+    SOCKETIO_BYTES: 'SocketIO payload bytes by direction and type.',
+    SOCKETIO_CONNECTS: 'SocketIO websocket connections.',
+    SOCKETIO_RECONNECTS: 'SocketIO websocket reconnection attempts.',
+    CALLBACK_SECONDS: 'Event callback execution time by event type.',
+    CALLBACKS_REGISTERED: 'Registered event callbacks by event type.'
+}
+
+ID_SEGMENT = re.compile(r'^(?=.*\d)[\w:.-]{6,}$')
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+
+class MetricsRegistry():
+    """Registry of counters, gauges and histograms.
+
+    Disabled registries record nothing. Call sites check the enabled flag
+    before doing any work so instrumentation costs nothing until enabled.
+    """
+
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS):
+        """Init the metrics registry."""
+        self.enabled = enabled
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def enable(self):
+        """Start recording metrics."""
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording metrics."""
+        self.enabled = False
+
+    def reset(self):
+        """Remove all recorded values."""
+        with self._lock:
+            self._metrics = {}
+
+    def inc(self, name, labels=None, value=1):
+        """Increment a counter."""
+        if not self.enabled:
+            return
+
+        key = _label_key(labels)
+
+        with self._lock:
+            values = self._get(name, COUNTER)
+            values[key] = values.get(key, 0) + value
+
+    def set(self, name, value, labels=None):
+        """Set a gauge."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._get(name, GAUGE)[_label_key(labels)] = value
+
+    def observe(self, name, seconds, labels=None):
+        """Record a latency observation in a histogram."""
+        if not self.enabled:
+            return
+
+        key = _label_key(labels)
+        index = bisect.bisect_left(self._buckets, seconds)
+
+        with self._lock:
+            values = self._get(name, HISTOGRAM)
+            histogram = values.get(key)
+
+            if histogram is None:
+                histogram = values[key] = {
+                    'buckets': [0] * (len(self._buckets) + 1),
+                    'sum': 0.0,
+                    'count': 0
+                }
+
+            histogram['buckets'][index] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def timer(self, name, labels=None):
+        """Get a context manager that observes its duration."""
+        return _Timer(self, name, labels)
+
+    def get(self, name, labels=None):
+        """Get the current value of a metric for a set of labels."""
+        with self._lock:
+            metric = self._metrics.get(name)
+
+            if metric is None:
+                return None
+
+            value = metric[1].get(_label_key(labels))
+
+            if isinstance(value, dict):
+                return _copy_histogram(value)
+
+            return value
+
+    def collect(self):
+        """Get a snapshot of every metric.
+
+        Returns a dict of metric name to a dict with the metric type and a
+        list of (labels, value) samples.
+        """
+        with self._lock:
+            return {
+                name: {
+                    'type': metric_type,
+                    'buckets': self._buckets,
+                    'samples': [
+                        (dict(key), _copy_histogram(value)
+                         if isinstance(value, dict) else value)
+                        for key, value in values.items()]
+                }
+                for name, (metric_type, values) in self._metrics.items()}
+
+    def render_prometheus(self):
+        """Render every metric in the Prometheus/OpenMetrics text format."""
+        lines = []
+
+        for name, metric in sorted(self.collect().items()):
+            metric_type = metric['type']
+
+            if name in HELP:
+                lines.append('# HELP {} {}'.format(name, HELP[name]))
+
+            lines.append('# TYPE {} {}'.format(name, metric_type))
+
+            for labels, value in metric['samples']:
+                if metric_type != HISTOGRAM:
+                    lines.append('{}{} {}'.format(
+                        name, _render_labels(labels), value))
+                    continue
+
+                cumulative = 0
+                bounds = [str(bound) for bound in metric['buckets']]
+
+                for bound, count in zip(bounds + ['+Inf'], value['buckets']):
+                    cumulative += count
+                    lines.append('{}_bucket{} {}'.format(
+                        name, _render_labels(labels, le=bound), cumulative))
+
+                lines.append('{}_sum{} {}'.format(
+                    name, _render_labels(labels), value['sum']))
+                lines.append('{}_count{} {}'.format(
+                    name, _render_labels(labels), value['count']))
+
+        return '\n'.join(lines) + '\n'
+
+    def _get(self, name, metric_type):
+        metric = self._metrics.get(name)
+
+        if metric is None:
+            metric = self._metrics[name] = (metric_type, {})
+
+        return metric[1]
+
+
+class _Timer():
+    """Context manager recording its duration into a histogram."""
+
+    def __init__(self, registry, name, labels):
+        self._registry = registry
+        self._name = name
+        self._labels = labels
+        self._start = None
+
+    def __enter__(self):
+        if self._registry.enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._start is not None:
+            self._registry.observe(self._name,
+                                   time.perf_counter() - self._start,
+                                   self._labels)
+
+
+def endpoint(url, base_url):
+    """Reduce a request URL to a low cardinality endpoint label."""
+    path = url.split('?', 1)[0]
+
+    if path.startswith(base_url):
+        path = path[len(base_url):]
+
+    return '/'.join('{id}' if ID_SEGMENT.match(segment) else segment
+                    for segment in path.strip('/').split('/'))
+
+
+def _label_key(labels):
+    if not labels:
+        return ()
+
+    return tuple(sorted(labels.items()))
+
+
+def _copy_histogram(histogram):
+    return {
+        'buckets': list(histogram['buckets']),
+        'sum': histogram['sum'],
+        'count': histogram['count']
+    }
+
+
+def _render_labels(labels, **extra):
+    labels = dict(labels, **extra)
+
+    if not labels:
+        return ''
+
+    return '{' + ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in sorted(labels.items())) + '}'
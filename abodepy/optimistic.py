@@ -0,0 +1,203 @@
+"""Optimistic local device state with confirmation tracking."""
+import collections
+import logging
+import threading
+import time
+
+from abodepy.exceptions import AbodeException
+import abodepy.helpers.constants as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+PendingCommand = collections.namedtuple(
+    'PendingCommand', ['expected', 'deadline', 'timer'])
+
+
+class AbodeOptimisticState():
+    """Apply expected device state before Abode confirms it.
+
+    When enabled, a device command writes the state it expects into the
+    device at once and runs the device callbacks. The command stays
+    pending until a refresh (usually triggered by the device_update push
+    event) reports the expected state. Refreshes that still report the old
+    state before the deadline are assumed to be stale and keep the
+    expected state. A mismatch after the deadline rolls the device back to
+    the reported state and runs the rollback callbacks.
+    """
+
+    def __init__(self, abode, enabled=False,
+                 timeout=CONST.OPTIMISTIC_CONFIRM_TIMEOUT):
+        """Init the optimistic state tracker."""
+        self._abode = abode
+        self._enabled = enabled
+        self._timeout = timeout
+        self._pending = {}
+        self._rollback_callbacks = []
+        self._lock = threading.Lock()
+
+    def enable(self, timeout=None):
+        """Enable optimistic updates."""
+        if timeout is not None:
+            self._timeout = timeout
+
+        self._enabled = True
+
+    def disable(self):
+        """Disable optimistic updates and forget pending commands."""
+        self._enabled = False
+
+        with self._lock:
+            for pending in self._pending.values():
+                pending.timer.cancel()
+
+            self._pending.clear()
+
+    def add_rollback_callback(self, callback):
+        """Register callback(device, expected, actual) for rollbacks."""
+        self._rollback_callbacks.append(callback)
+
+    def pending(self, device_id):
+        """Get the state a device is expected to reach, if any."""
+        pending = self._pending.get(device_id)
+
+        return pending.expected if pending else None
+
+    def execute(self, device, expected, command, *args):
+        """Apply expected state, then run the command confirming it."""
+        # pylint: disable=protected-access
+        previous = {key: device._json_state.get(key) for key in expected}
+
+        timer = threading.Timer(self._timeout, self._expire,
+                                (device.device_id,))
+        timer.daemon = True
+        pending = PendingCommand(expected, time.monotonic() + self._timeout,
+                                 timer)
+
+        # Expected before the command is sent, so a refresh racing it
+        # keeps the new state instead of reverting it
+        with self._lock:
+            replaced = self._pending.get(device.device_id)
+
+            if replaced:
+                replaced.timer.cancel()
+
+            self._pending[device.device_id] = pending
+
+        device._apply_state(expected)
+        self._notify_device(device)
+
+        try:
+            success = command(*args)
+        except Exception:
+            self._discard(device.device_id, pending)
+            self._rollback(device, previous)
+            raise
+
+        if not success:
+            self._discard(device.device_id, pending)
+            self._rollback(device, previous)
+            return False
+
+        timer.start()
+
+        return True
+
+    def reconcile(self, device, json_state):
+        """Reconcile a device refresh with a pending command.
+
+        Returns the state the device should be updated with, and the
+        (expected, actual) state to pass to notify_rollback() once it has
+        been applied, or None if the command was not rolled back.
+        """
+        with self._lock:
+            pending = self._pending.get(device.device_id)
+
+            if not pending:
+                return json_state, None
+
+            actual = {key: json_state[key]
+                      for key in pending.expected if key in json_state}
+
+            if not actual:
+                return json_state, None
+
+            if all(actual[key] == pending.expected[key] for key in actual):
+                _LOGGER.debug("Confirmed state of device %s: %s",
+                              device.device_id, actual)
+                del self._pending[device.device_id]
+                pending.timer.cancel()
+
+                return json_state, None
+
+            if time.monotonic() < pending.deadline:
+                # Probably a refresh racing the command, keep expecting
+                return dict(json_state, **pending.expected), None
+
+            del self._pending[device.device_id]
+            pending.timer.cancel()
+
+        _LOGGER.warning("Device %s did not reach state %s, rolling back to %s",
+                        device.device_id, pending.expected, actual)
+
+        return json_state, (pending.expected, actual)
+
+    def notify_rollback(self, device, expected, actual):
+        """Run the rollback callbacks of a device that was rolled back."""
+        for callback in self._rollback_callbacks:
+            _execute_callback(callback, device, expected, actual)
+
+    @property
+    def enabled(self):
+        """Return True if optimistic updates are enabled."""
+        return self._enabled
+
+    def _expire(self, device_id):
+        """Refresh a device that was not confirmed before the deadline."""
+        if device_id not in self._pending:
+            return
+
+        device = self._abode.get_device(device_id)
+
+        # Removed in the meantime, there is nothing left to confirm
+        if not device:
+            self._discard(device_id)
+            return
+
+        try:
+            device.refresh()
+        except AbodeException as exc:
+            _LOGGER.warning("Unable to confirm state of device %s: %s",
+                            device_id, exc)
+            return
+
+        # Nothing in the refresh to confirm against, stop waiting
+        self._discard(device_id)
+
+        self._notify_device(device)
+
+    def _discard(self, device_id, pending=None):
+        with self._lock:
+            current = self._pending.get(device_id)
+
+            if current and (pending is None or current is pending):
+                del self._pending[device_id]
+                current.timer.cancel()
+
+    def _rollback(self, device, previous):
+        # pylint: disable=protected-access
+        device._apply_state(previous)
+        self._notify_device(device)
+
+    def _notify_device(self, device):
+        # pylint: disable=protected-access
+        if self._abode._event_controller:
+            self._abode._event_controller.notify_device(device)
+
+
+def _execute_callback(callback, *args):
+    # Callback with some data, capturing any exceptions to prevent chaos
+    try:
+        callback(*args)
+    # pylint: disable=W0703
+    except Exception as exc:
+        _LOGGER.warning("Captured exception during callback: %s", exc)
@@ -0,0 +1,179 @@
+"""Cached read model of the Abode panel settings."""
+import collections
+import json
+import logging
+import threading
+
+import abodepy.helpers.constants as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+SettingDrift = collections.namedtuple(
+    'SettingDrift', ['setting', 'area', 'desired', 'actual'])
+
+# Settings that apply to the whole panel rather than an area
+_PANEL_WIDE = CONST.PANEL_SETTINGS + CONST.SIREN_SETTINGS
+
+
+class AbodePanelSettings():
+    """Panel settings loaded once and kept current locally.
+
+    Values are loaded from the panel and settings endpoints on first read,
+    updated in place by set_setting() and set_settings(), and reloaded on
+    the next read after a panel fault or restore timeline event. Reads and
+    diffs never send a request while the cache is current.
+    """
+
+    def __init__(self, abode):
+        """Init the panel settings for an Abode instance."""
+        self._abode = abode
+        self._values = {}
+        self._modes = {}
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Load the settings from Abode."""
+        values = {}
+
+        # pylint: disable=protected-access
+        if self._abode._panel is None:
+            self._abode.login()
+
+        self._parse_area(values, self._abode._panel, None)
+
+        for url in (CONST.SETTINGS_URL, CONST.AREAS_URL, CONST.SOUNDS_URL):
+            response = self._abode.send_request("get", url)
+            response_object = json.loads(response.text)
+
+            _LOGGER.debug("Get Settings Response: %s", response.text)
+
+            if not isinstance(response_object, (tuple, list)):
+                response_object = [response_object]
+
+            for area_json in response_object:
+                self._parse_area(values, area_json,
+                                 area_json.get('area', '1'))
+
+        with self._lock:
+            self._values = values
+            self._modes = {
+                area.replace(CONST.ALARM_DEVICE_ID, ''): mode
+                for area, mode in
+                (self._abode._panel.get('mode') or {}).items()}
+            self._stale = False
+
+    def invalidate(self):
+        """Reload the settings on the next read."""
+        self._stale = True
+
+    def get(self, setting, area='1'):
+        """Get the current value of a setting."""
+        self._ensure()
+
+        setting = setting.lower()
+
+        return self._values.get(_key(setting, area))
+
+    def values(self, area='1'):
+        """Get all known settings of an area, including panel settings."""
+        self._ensure()
+
+        return {setting: value
+                for (setting, setting_area), value in self._values.items()
+                if setting_area in (None, str(area))}
+
+    def mode(self, area='1'):
+        """Get the alarm mode of an area."""
+        self._ensure()
+
+        return self._modes.get(str(area))
+
+    def diff(self, desired, area='1'):
+        """Compare desired settings with the cache, returning drifts.
+
+        Desired settings take the same forms as Abode.set_settings().
+        """
+        self._ensure()
+
+        if isinstance(desired, dict):
+            desired = desired.items()
+
+        drifts = []
+
+        for setting, value, *setting_area in desired:
+            setting = setting.lower()
+            setting_area = setting_area[0] if setting_area else area
+            actual = self._values.get(_key(setting, setting_area))
+
+            if actual is None or str(actual) != str(value):
+                drifts.append(SettingDrift(
+                    setting,
+                    None if setting in _PANEL_WIDE else str(setting_area),
+                    value, actual))
+
+        return drifts
+
+    def apply(self, setting, value, area='1'):
+        """Record a setting written to Abode."""
+        with self._lock:
+            self._values[_key(setting.lower(), area)] = value
+
+    def set_mode(self, mode, area='1'):
+        """Record an alarm mode change."""
+        with self._lock:
+            self._modes[str(area)] = mode
+
+    @property
+    def camera_resolution(self):
+        """Get the IR camera resolution setting."""
+        return self.get(CONST.SETTING_CAMERA_RESOLUTION)
+
+    @property
+    def camera_grayscale(self):
+        """Return True if IR camera images are grayscale."""
+        return self.get(CONST.SETTING_CAMERA_GRAYSCALE) == CONST.SETTING_ENABLE
+
+    @property
+    def sounds_silenced(self):
+        """Return True if the panel sounds are silenced."""
+        return self.get(CONST.SETTING_SILENCE_SOUNDS) == CONST.SETTING_ENABLE
+
+    def entry_delay(self, mode=CONST.MODE_AWAY, area='1'):
+        """Get the entry delay of a mode in seconds."""
+        return _seconds(self.get(
+            CONST.SETTING_ENTRY_DELAY_HOME if mode == CONST.MODE_HOME
+            else CONST.SETTING_ENTRY_DELAY_AWAY, area))
+
+    def exit_delay(self, mode=CONST.MODE_AWAY, area='1'):
+        """Get the exit delay of a mode in seconds."""
+        return _seconds(self.get(
+            CONST.SETTING_EXIT_DELAY_HOME if mode == CONST.MODE_HOME
+            else CONST.SETTING_EXIT_DELAY_AWAY, area))
+
+    def _ensure(self):
+        if self._stale:
+            self.refresh()
+
+    @staticmethod
+    def _parse_area(values, area_json, area):
+        if not isinstance(area_json, dict):
+            return
+
+        for setting in CONST.ALL_SETTINGS:
+            if setting in area_json:
+                values[_key(setting, area)] = area_json[setting]
+
+
+def _key(setting, area):
+    if setting in _PANEL_WIDE:
+        return (setting, None)
+
+    return (setting, str(area) if area is not None else '1')
+
+
+def _seconds(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,206 @@
+"""Fixed-size time series of numeric sensor readings."""
+import functools
+import time
+from array import array
+
+import abodepy.helpers.constants as CONST
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    # Imported on first use, importing abodepy must not load NumPy
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    return numpy
+
+
+class SensorHistory():
+    """Ring buffer of timestamped numeric readings."""
+
+    def __init__(self, capacity=CONST.SENSOR_HISTORY_SIZE):
+        """Init the ring buffer with a fixed capacity."""
+        self._capacity = capacity
+        self._timestamps = array('d', [0.0] * capacity)
+        self._values = array('d', [0.0] * capacity)
+        self._start = 0
+        self._count = 0
+
+    def record(self, value, timestamp=None):
+        """Record a reading, overwriting the oldest when full."""
+        if value is None:
+            return
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        index = (self._start + self._count) % self._capacity
+
+        self._timestamps[index] = timestamp
+        self._values[index] = value
+
+        if self._count < self._capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self._capacity
+
+    def clear(self):
+        """Remove all readings."""
+        self._start = 0
+        self._count = 0
+
+    def timestamps(self, since=None):
+        """Get the reading timestamps, oldest first."""
+        return self._window(self._timestamps, since)
+
+    def values(self, since=None):
+        """Get the reading values, oldest first."""
+        return self._window(self._values, since)
+
+    def latest(self):
+        """Get the newest (timestamp, value) pair."""
+        if not self._count:
+            return None
+
+        index = (self._start + self._count - 1) % self._capacity
+
+        return self._timestamps[index], self._values[index]
+
+    def min(self, since=None):
+        """Get the lowest reading."""
+        values = self.values(since)
+        return min(values) if values else None
+
+    def max(self, since=None):
+        """Get the highest reading."""
+        values = self.values(since)
+        return max(values) if values else None
+
+    def mean(self, since=None):
+        """Get the mean reading."""
+        values = self.values(since)
+
+        if not values:
+            return None
+
+        numpy = _numpy()
+
+        if numpy is not None:
+            return float(numpy.frombuffer(values, dtype=float).mean())
+
+        return sum(values) / len(values)
+
+    def rolling_mean(self, window):
+        """Get the mean of every window readings, oldest first."""
+        values = self.values()
+
+        if window <= 0 or len(values) < window:
+            return array('d')
+
+        numpy = _numpy()
+
+        if numpy is not None:
+            sums = numpy.cumsum(numpy.insert(
+                numpy.frombuffer(values, dtype=float), 0, 0.0))
+            return array('d', (sums[window:] - sums[:-window]) / window)
+
+        means = array('d')
+        total = sum(values[:window])
+        means.append(total / window)
+
+        for index in range(window, len(values)):
+            total += values[index] - values[index - window]
+            means.append(total / window)
+
+        return means
+
+    def rate_of_change(self, since=None):
+        """Get the change per second between readings, oldest first."""
+        timestamps = self.timestamps(since)
+        values = self.values(since)
+        numpy = _numpy()
+
+        if numpy is not None:
+            deltas = numpy.diff(numpy.frombuffer(values, dtype=float))
+            seconds = numpy.diff(numpy.frombuffer(timestamps, dtype=float))
+            seconds[seconds == 0] = numpy.nan
+            return array('d', deltas / seconds)
+
+        rates = array('d')
+
+        for index in range(1, len(values)):
+            seconds = timestamps[index] - timestamps[index - 1]
+            rates.append((values[index] - values[index - 1]) / seconds
+                         if seconds else float('nan'))
+
+        return rates
+
+    def _window(self, buffer, since):
+        end = self._start + self._count
+
+        if end <= self._capacity:
+            data = buffer[self._start:end]
+        else:
+            data = (buffer[self._start:] +
+                    buffer[:end - self._capacity])
+
+        if since is None:
+            return data
+
+        timestamps = self._window(self._timestamps, None)
+
+        for index, timestamp in enumerate(timestamps):
+            if timestamp >= since:
+                return data[index:]
+
+        return array('d')
+
+    @property
+    def capacity(self):
+        """Get the maximum number of readings."""
+        return self._capacity
+
+    def __len__(self):
+        """Get the number of readings."""
+        return self._count
+
+
+def export_columns(sensors, key, since=None):
+    """Export one reading type for a fleet of sensors as columns.
+
+    Returns a dict of equal length device_id, timestamp and value columns.
+    The timestamp and value columns are NumPy arrays when NumPy is
+    installed and array.array otherwise.
+    """
+    device_ids = []
+    timestamps = array('d')
+    values = array('d')
+
+    for sensor in sensors:
+        if not hasattr(sensor, 'history'):
+            continue
+
+        history = sensor.history(key)
+
+        if history is None:
+            continue
+
+        sensor_timestamps = history.timestamps(since)
+
+        device_ids.extend([sensor.device_id] * len(sensor_timestamps))
+        timestamps.extend(sensor_timestamps)
+        values.extend(history.values(since))
+
+    numpy = _numpy()
+
+    if numpy is not None:
+        timestamps = numpy.frombuffer(timestamps, dtype=float)
+        values = numpy.frombuffer(values, dtype=float)
+
+    return {
+        'device_id': device_ids,
+        'timestamp': timestamps,
+        'value': values
+    }
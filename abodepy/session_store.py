@@ -0,0 +1,87 @@
+"""Login session shared between processes through a locked file."""
+import contextlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AbodeSessionStore():
+    """Store one authenticated session for every process of an account.
+
+    The session is written to a temporary file and renamed into place,
+    so readers see the old or the new session and never a partial one.
+    An exclusive lock on a side file serializes logins across processes,
+    so a process holding it can check whether another one already logged
+    in before logging in itself. Locking needs fcntl; without it the
+    session is still shared but logins are only serialized per process.
+    """
+
+    def __init__(self, path):
+        """Init the session store at a path."""
+        self._path = path
+        self._lock_path = path + '.lock'
+        self._thread_lock = threading.Lock()
+
+        if fcntl is None:
+            _LOGGER.warning("File locking is not available, processes "
+                            "sharing %s may log in concurrently", path)
+
+    @contextlib.contextmanager
+    def lock(self):
+        """Hold the login lock of every process sharing the store."""
+        with self._thread_lock, open(self._lock_path, 'a') as handle:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def load(self):
+        """Load the shared session, or None if there is none."""
+        try:
+            with open(self._path, 'rb') as handle:
+                return pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except (EOFError, pickle.UnpicklingError, ValueError) as exc:
+            _LOGGER.warning("Invalid session file %s: %s", self._path, exc)
+            return None
+
+    def save(self, session):
+        """Atomically replace the shared session."""
+        directory = os.path.dirname(os.path.abspath(self._path))
+        handle, temp_path = tempfile.mkstemp(dir=directory,
+                                             prefix='.abode-session-')
+
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                pickle.dump(session, temp_file)
+
+            os.replace(temp_path, self._path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def clear(self):
+        """Remove the shared session."""
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
+
+    @property
+    def path(self):
+        """Get the path of the session file."""
+        return self._path
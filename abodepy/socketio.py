@@ -13,7 +13,9 @@ from lomond.persist import persist
 from lomond.errors import WebSocketError
 
 from abodepy.exceptions import SocketIOException
+from abodepy.metrics import MetricsRegistry
 import abodepy.helpers.errors as ERRORS
+import abodepy.metrics as METRICS
 
 STARTED = "started"
 STOPPED = "stopped"
@@ -35,6 +37,7 @@ MESSAGE_CONNECT = "0"
 MESSAGE_DISCONNECT = "1"
 MESSAGE_EVENT = "2"
 MESSAGE_ERROR = "4"
+MESSAGE_BINARY_EVENT = "5"
 
 PING_INTERVAL = "pingInterval"
 PING_TIMEOUT = "pingTimeout"
@@ -44,15 +47,29 @@ ORIGIN_HEADER = str.encode("Origin")
 
 URL_PARAMS = "?EIO=3&transport=websocket"
 
+PLACEHOLDER = "_placeholder"
+PLACEHOLDER_NUM = "num"
+
+FRAMES_SENT = "frames_sent"
+FRAMES_RECEIVED = "frames_received"
+TEXT_FRAMES_RECEIVED = "text_frames_received"
+BINARY_FRAMES_RECEIVED = "binary_frames_received"
+BYTES_SENT = "bytes_sent"
+BYTES_RECEIVED = "bytes_received"
+COMPRESSED = "compressed"
+
 _LOGGER = logging.getLogger(__name__)
 
 
 class SocketIO():
     """Class for using websockets to talk to a SocketIO server."""
 
-    def __init__(self, url, cookie=None, origin=None):
+    def __init__(self, url, cookie=None, origin=None, compress=False,
+                 metrics=None):
         """Init SocketIO class."""
         self._url = url + URL_PARAMS
+        self._compress = compress
+        self._metrics = metrics or MetricsRegistry()
 
         if origin:
             self._origin = origin.encode()
@@ -79,6 +96,12 @@ class SocketIO():
         self._last_ping_time = datetime.min
         self._last_packet_time = datetime.min
 
+        self._binary_event = None
+        self._binary_attachments = []
+        self._binary_attachments_expected = 0
+
+        self._stats = _new_stats()
+
         self._callbacks = collections.defaultdict(list)
 
     def set_origin(self, origin=None):
@@ -95,6 +118,18 @@ class SocketIO():
         else:
             self._cookie = None
 
+    def set_compress(self, compress=False):
+        """Enable or disable permessage-deflate negotiation.
+
+        Takes effect on the next (re)connection.
+        """
+        self._compress = compress
+
+    @property
+    def stats(self):
+        """Get the byte and frame counters for the current connection."""
+        return dict(self._stats)
+
     # pylint: disable=C0103
     def on(self, event_name, callback):
         """Register callback for a SocketIO event."""
@@ -146,11 +181,15 @@ class SocketIO():
                 "Attempting to connect to SocketIO server...")
 
             try:
+                if retries:
+                    self._metrics.inc(METRICS.SOCKETIO_RECONNECTS)
+
                 retries += 1
 
                 self._handle_event(STARTED, None)
 
-                self._websocket = WebSocket(self._url)
+                self._websocket = WebSocket(self._url,
+                                            compress=self._compress)
                 self._exit_event = threading.Event()
 
                 if self._cookie:
@@ -164,10 +203,14 @@ class SocketIO():
                     if isinstance(event, events.Connected):
                         retries = 0
                         self._on_websocket_connected(event)
+                    elif isinstance(event, events.Ready):
+                        self._on_websocket_ready(event)
                     elif isinstance(event, events.Disconnected):
                         self._on_websocket_disconnected(event)
                     elif isinstance(event, events.Text):
                         self._on_websocket_text(event)
+                    elif isinstance(event, events.Binary):
+                        self._on_websocket_binary(event)
                     elif isinstance(event, events.Poll):
                         self._on_websocket_poll(event)
                     elif isinstance(event, events.BackOff):
@@ -195,11 +238,21 @@ class SocketIO():
 
     def _on_websocket_connected(self, _event):
         self._websocket_connected = True
+        self._stats = _new_stats()
+        self._reset_binary_event()
+
+        self._metrics.inc(METRICS.SOCKETIO_CONNECTS)
 
         _LOGGER.info("Websocket Connected")
 
         self._handle_event(CONNECTED, None)
 
+    def _on_websocket_ready(self, _event):
+        self._stats[COMPRESSED] = 'permessage-deflate' in _event.extensions
+
+        _LOGGER.debug("Websocket Ready (compressed: %s)",
+                      self._stats[COMPRESSED])
+
     def _on_websocket_disconnected(self, _event):
         self._websocket_connected = False
         self._engineio_connected = False
@@ -222,18 +275,43 @@ class SocketIO():
         last_ping_ms = int(last_ping_delta.total_seconds() * 1000)
 
         if self._engineio_connected and last_ping_ms >= self._ping_interval_ms:
-            self._websocket.send_text(PACKET_PING)
+            self._send_text(PACKET_PING)
             self._last_ping_time = datetime.now()
             _LOGGER.debug("Client Ping")
             self._handle_event(PING, None)
 
         self._handle_event(POLL, None)
 
+    def _send_text(self, text):
+        self._websocket.send_text(text)
+
+        self._stats[FRAMES_SENT] += 1
+        self._stats[BYTES_SENT] += len(text.encode())
+
+        if self._metrics.enabled:
+            self._count_frame('sent', 'text', len(text.encode()))
+
     def _on_websocket_text(self, _event):
         self._last_packet_time = datetime.now()
 
-        packet_type = _event.text[:1]
-        packet_data = _event.text[1:]
+        self._stats[FRAMES_RECEIVED] += 1
+        self._stats[TEXT_FRAMES_RECEIVED] += 1
+        self._stats[BYTES_RECEIVED] += len(_event.text.encode())
+
+        if self._metrics.enabled:
+            self._count_frame('received', 'text', len(_event.text.encode()))
+
+        self._on_engineio_packet(_event.text)
+
+    def _count_frame(self, direction, frame_type, size):
+        labels = {'direction': direction, 'type': frame_type}
+
+        self._metrics.inc(METRICS.SOCKETIO_FRAMES, labels)
+        self._metrics.inc(METRICS.SOCKETIO_BYTES, labels, size)
+
+    def _on_engineio_packet(self, packet):
+        packet_type = packet[:1]
+        packet_data = packet[1:]
 
         if packet_type == PACKET_OPEN:
             self._on_engineio_opened(packet_data)
@@ -244,7 +322,38 @@ class SocketIO():
         elif packet_type == PACKET_MESSAGE:
             self._on_engineio_message(packet_data)
         else:
-            _LOGGER.debug("Ignoring EngineIO packet: %s", _event.text)
+            _LOGGER.debug("Ignoring EngineIO packet: %s", packet)
+
+    def _on_websocket_binary(self, _event):
+        self._last_packet_time = datetime.now()
+
+        self._stats[FRAMES_RECEIVED] += 1
+        self._stats[BINARY_FRAMES_RECEIVED] += 1
+        self._stats[BYTES_RECEIVED] += len(_event.data)
+
+        if self._metrics.enabled:
+            self._count_frame('received', 'binary', len(_event.data))
+
+        if not _event.data:
+            return
+
+        # Binary EngineIO packets carry the packet type as a raw byte
+        # instead of an ASCII digit.
+        packet_type = str(_event.data[0])
+        packet_data = _event.data[1:]
+
+        if packet_type == PACKET_MESSAGE and self._binary_event is not None:
+            self._on_binary_attachment(packet_data)
+            return
+
+        try:
+            packet_data = packet_data.decode()
+        except UnicodeDecodeError:
+            _LOGGER.warning("Dropping undecodable binary packet of type: %s",
+                            packet_type)
+            return
+
+        self._on_engineio_packet(packet_type + packet_data)
 
     # pylint: disable=R0201
     def _on_websocket_backoff(self, _event):
@@ -288,6 +397,8 @@ class SocketIO():
             self._on_socketio_error(message_data)
         elif message_type == MESSAGE_EVENT:
             self._on_socketio_event(message_data)
+        elif message_type == MESSAGE_BINARY_EVENT:
+            self._on_socketio_binary_event(message_data)
         else:
             _LOGGER.debug("Ignoring SocketIO message: %s", _packet_data)
 
@@ -322,6 +433,54 @@ class SocketIO():
         self._handle_event(EVENT, _message_data)
         self._handle_event(json_data[0], json_data[1:])
 
+    def _on_socketio_binary_event(self, _message_data):
+        # Binary events are formatted as <attachments>-[data] and are
+        # followed by <attachments> binary frames.
+        dash = _message_data.find("-")
+
+        if dash == -1 or not _message_data[:dash].isdigit():
+            _LOGGER.warning("Unable to find binary event attachment count: %s",
+                            _message_data)
+            return
+
+        self._binary_event = _message_data[dash + 1:]
+        self._binary_attachments = []
+        self._binary_attachments_expected = int(_message_data[:dash])
+
+        if self._binary_attachments_expected == 0:
+            self._on_binary_event_complete()
+
+    def _on_binary_attachment(self, attachment):
+        self._binary_attachments.append(attachment)
+
+        if len(self._binary_attachments) >= self._binary_attachments_expected:
+            self._on_binary_event_complete()
+
+    def _on_binary_event_complete(self):
+        message_data = self._binary_event
+        attachments = self._binary_attachments
+
+        self._reset_binary_event()
+
+        l_bracket = message_data.find("[")
+        r_bracket = message_data.rfind("]")
+
+        if l_bracket == -1 or r_bracket == -1:
+            _LOGGER.warning("Unable to find binary event [data]: %s",
+                            message_data)
+            return
+
+        json_data = _replace_placeholders(
+            json.loads(message_data[l_bracket:r_bracket + 1]), attachments)
+
+        self._handle_event(EVENT, message_data)
+        self._handle_event(json_data[0], json_data[1:])
+
+    def _reset_binary_event(self):
+        self._binary_event = None
+        self._binary_attachments = []
+        self._binary_attachments_expected = 0
+
     def _handle_event(self, event_name, event_data):
         for callback in self._callbacks.get(event_name, ()):
             try:
@@ -334,3 +493,35 @@ class SocketIO():
                 _LOGGER.exception(
                     "Captured exception during SocketIO event callback: %s",
                     exc)
+
+
+def _new_stats():
+    return {
+        FRAMES_SENT: 0,
+        FRAMES_RECEIVED: 0,
+        TEXT_FRAMES_RECEIVED: 0,
+        BINARY_FRAMES_RECEIVED: 0,
+        BYTES_SENT: 0,
+        BYTES_RECEIVED: 0,
+        COMPRESSED: False
+    }
+
+
+def _replace_placeholders(data, attachments):
+    """Swap SocketIO binary placeholders for their attachments."""
+    if isinstance(data, list):
+        return [_replace_placeholders(item, attachments) for item in data]
+
+    if isinstance(data, dict):
+        if data.get(PLACEHOLDER) is True and PLACEHOLDER_NUM in data:
+            num = data[PLACEHOLDER_NUM]
+
+            if 0 <= num < len(attachments):
+                return attachments[num]
+
+            return None
+
+        return {key: _replace_placeholders(value, attachments)
+                for key, value in data.items()}
+
+    return data
@@ -0,0 +1,229 @@
+"""Apply push event payloads to the cached devices."""
+import logging
+import threading
+import time
+
+from abodepy.exceptions import AbodeException
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+
+_LOGGER = logging.getLogger(__name__)
+
+_OPENINGS = (CONST.TYPE_OPENING, CONST.TYPE_COVER, CONST.TYPE_VALVE)
+
+# Timeline event codes with the status they leave a device in, and the
+# generic types of device that status applies to
+TIMELINE_STATUS = {
+    TIMELINE.OPENED['event_code']: (CONST.STATUS_OPEN, _OPENINGS),
+    TIMELINE.CLOSED['event_code']: (CONST.STATUS_CLOSED, _OPENINGS),
+    TIMELINE.UNLOCKED['event_code']: (CONST.STATUS_LOCKOPEN,
+                                      (CONST.TYPE_LOCK,)),
+    TIMELINE.LOCKED['event_code']: (CONST.STATUS_LOCKCLOSED,
+                                    (CONST.TYPE_LOCK,)),
+}
+
+# Timeline event codes with the alarm mode they leave an area in. The
+# codes are spelled out as several TIMELINE names share each event type.
+TIMELINE_MODE = {
+    '1400': CONST.MODE_STANDBY,
+    '1401': CONST.MODE_STANDBY,
+    '1407': CONST.MODE_STANDBY,
+    '3400': CONST.MODE_AWAY,
+    '3401': CONST.MODE_AWAY,
+    '3407': CONST.MODE_AWAY,
+    '3456': CONST.MODE_HOME,
+    '3758': CONST.MODE_HOME,
+    '6071': CONST.MODE_AWAY,
+    '6077': CONST.MODE_HOME,
+}
+
+
+class AbodeStateApplier():
+    """Update cached devices from push events without a refresh.
+
+    Mode events and timeline events with a known event code are applied
+    to the cached devices in place. Abode follows each change with a
+    device_update event, which needs no refresh when an event applied
+    within the window explains it. Further device_update events within
+    the window share a single refresh once the window has passed.
+    Timeline events for a cached device that can't be mapped schedule a
+    single refresh of that device, dropped if a refresh happens first.
+    """
+
+    def __init__(self, abode, window=CONST.EVENT_STATE_WINDOW,
+                 refresh_delay=CONST.EVENT_REFRESH_DELAY):
+        """Init the state applier for an Abode instance."""
+        self._abode = abode
+        self._window = window
+        self._refresh_delay = refresh_delay
+        self._updated = {}
+        self._applied = {}
+        self._unexplained = {}
+        self._scheduled = {}
+        self._lock = threading.Lock()
+
+    def apply_mode(self, mode, area='1'):
+        """Apply an alarm mode, returning the alarm device if known."""
+        alarm_device = self._abode.get_alarm(area)
+
+        if not alarm_device:
+            _LOGGER.warning("Mode change event for unknown area: %s", area)
+            return None
+
+        alarm_device.apply_mode(mode)
+
+        # pylint: disable=protected-access
+        if self._abode._settings:
+            self._abode._settings.set_mode(mode, area)
+
+        self._mark(alarm_device.device_id, applied=True)
+
+        return alarm_device
+
+    def apply_timeline(self, event):
+        """Apply a timeline event, returning the device it changed.
+
+        Returns None if the event changed nothing it could be mapped to.
+        """
+        # Nothing is cached to apply the event to yet
+        # pylint: disable=protected-access
+        if self._abode._devices is None:
+            return None
+
+        event_code = str(event.get('event_code'))
+
+        if event_code in TIMELINE_MODE:
+            return self.apply_mode(TIMELINE_MODE[event_code],
+                                   str(event.get('area') or '1'))
+
+        device_id = event.get('device_id')
+
+        if not device_id:
+            return None
+
+        device = self._abode._devices.get(device_id)
+
+        if not device:
+            return None
+
+        status, generic_types = TIMELINE_STATUS.get(event_code, (None, ()))
+
+        if device.generic_type not in generic_types:
+            self.schedule_refresh(device_id)
+            return None
+
+        _LOGGER.debug("Applying timeline event %s to device %s: %s",
+                      event_code, device_id, status)
+
+        device.update({'status': status})
+        self._mark(device_id, applied=True)
+
+        return device
+
+    def recently_applied(self, device_id):
+        """Return True if an event updated a device within the window."""
+        applied = self._applied.get(device_id)
+
+        return (applied is not None and
+                time.monotonic() - applied < self._window)
+
+    def explains_update(self, device_id):
+        """Return True if an applied event explains a device update.
+
+        Each applied event explains one device update within the window.
+        """
+        with self._lock:
+            if (not self.recently_applied(device_id) or
+                    not self._unexplained.get(device_id)):
+                return False
+
+            self._unexplained[device_id] -= 1
+
+            return True
+
+    def refreshed(self, device_id):
+        """Record a device refresh, dropping any scheduled refresh."""
+        self._mark(device_id)
+
+    def schedule_refresh(self, device_id):
+        """Refresh a device shortly unless it is refreshed first."""
+        updated = self._updated.get(device_id)
+
+        if (updated is not None and
+                time.monotonic() - updated < self._window):
+            return
+
+        self._schedule(device_id, self._refresh_delay)
+
+    def refresh_after_window(self, device_id):
+        """Refresh a device once the window of its applied event ends.
+
+        All device updates within the window share the one refresh.
+        """
+        applied = self._applied.get(device_id)
+        delay = 0
+
+        if applied is not None:
+            delay = max(self._window - (time.monotonic() - applied), 0)
+
+        self._schedule(device_id, delay)
+
+    def cancel(self):
+        """Drop all scheduled refreshes."""
+        with self._lock:
+            for timer in self._scheduled.values():
+                timer.cancel()
+
+            self._scheduled.clear()
+
+    def _schedule(self, device_id, delay):
+        with self._lock:
+            if device_id in self._scheduled:
+                return
+
+            timer = threading.Timer(delay, self._refresh, (device_id,))
+            timer.daemon = True
+            self._scheduled[device_id] = timer
+
+        _LOGGER.debug("Scheduling refresh of device %s in %.1fs",
+                      device_id, delay)
+
+        timer.start()
+
+    def _mark(self, device_id, applied=False):
+        now = time.monotonic()
+        timer = None
+
+        with self._lock:
+            self._updated[device_id] = now
+
+            # Only a refresh makes a scheduled refresh unnecessary
+            if applied:
+                # Updates explained by events outside the window are stale
+                if not self.recently_applied(device_id):
+                    self._unexplained[device_id] = 0
+
+                self._applied[device_id] = now
+                self._unexplained[device_id] += 1
+            else:
+                timer = self._scheduled.pop(device_id, None)
+
+        if timer:
+            timer.cancel()
+
+    def _refresh(self, device_id):
+        with self._lock:
+            if self._scheduled.pop(device_id, None) is None:
+                return
+
+        try:
+            device = self._abode.get_device(device_id, True)
+        except AbodeException as exc:
+            _LOGGER.warning("Unable to refresh device %s: %s", device_id, exc)
+            return
+
+        self._mark(device_id)
+
+        # pylint: disable=protected-access
+        if device and self._abode._event_controller:
+            self._abode._event_controller.notify_device(device)
@@ -0,0 +1,182 @@
+"""Callback subscriptions with cancellable handles."""
+import collections
+import inspect
+import itertools
+import logging
+import threading
+import weakref
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Subscription():
+    """Handle for a callback registered under one or more keys.
+
+    A handle is truthy while the callback is registered, and cancel()
+    removes it from every key in constant time per key.
+    """
+
+    def __init__(self, registry, subscription_id, keys, callback, weak,
+                 context=None):
+        """Init the subscription handle."""
+        self._registry = registry
+        self._subscription_id = subscription_id
+        self._keys = tuple(keys)
+        self._context = context
+        self._active = True
+
+        if weak and inspect.ismethod(callback):
+            # Dead bound methods unsubscribe themselves
+            self._callback = weakref.WeakMethod(callback, self._on_dead)
+        else:
+            self._callback = lambda: callback
+
+    def cancel(self):
+        """Unregister the callback, returning False if already cancelled."""
+        if not self._active:
+            return False
+
+        self._active = False
+        self._registry.discard(self)
+
+        return True
+
+    @property
+    def callback(self):
+        """Get the callback, or None if it was garbage collected."""
+        return self._callback()
+
+    @property
+    def subscription_id(self):
+        """Get the id of this subscription within its registry."""
+        return self._subscription_id
+
+    @property
+    def context(self):
+        """Get the data the callback was registered with."""
+        return self._context
+
+    @property
+    def keys(self):
+        """Get the keys the callback is registered under."""
+        return self._keys
+
+    @property
+    def active(self):
+        """Return True if the callback is still registered."""
+        return self._active
+
+    def __bool__(self):
+        """Return True if the callback is still registered."""
+        return self._active
+
+    def _on_dead(self, _ref):
+        _LOGGER.debug("Dropping garbage collected callback for: %s",
+                      self._keys)
+        self.cancel()
+
+
+class SubscriptionRegistry():
+    """Callbacks by key, safe to change while callbacks run."""
+
+    def __init__(self, on_change=None):
+        """Init the registry, calling on_change() after each change."""
+        self._on_change = on_change
+        self._subscriptions = {}
+        # Reentrant, dead weak callbacks may be dropped during collection
+        self._lock = threading.RLock()
+        self._ids = itertools.count()
+
+    def add(self, keys, callback, weak=False, context=None):
+        """Register a callback under keys, returning its Subscription.
+
+        Bound methods are held weakly only if weak is True. The context
+        is returned with the callback by entries().
+        """
+        subscription = Subscription(self, next(self._ids), keys,
+                                    callback, weak, context)
+
+        with self._lock:
+            for key in subscription.keys:
+                subscriptions = self._subscriptions.setdefault(
+                    key, collections.OrderedDict())
+                subscriptions[subscription.subscription_id] = subscription
+
+        self._changed()
+
+        return subscription
+
+    def discard(self, subscription):
+        """Remove a subscription from all of its keys."""
+        with self._lock:
+            for key in subscription.keys:
+                subscriptions = self._subscriptions.get(key)
+
+                if subscriptions is None:
+                    continue
+
+                subscriptions.pop(subscription.subscription_id, None)
+
+                if not subscriptions:
+                    del self._subscriptions[key]
+
+        self._changed()
+
+    def remove(self, key):
+        """Remove every callback registered under a key.
+
+        Subscriptions that also have other keys stay registered there.
+        """
+        with self._lock:
+            removed = self._subscriptions.pop(key, None)
+
+        if not removed:
+            return False
+
+        self._changed()
+
+        return True
+
+    def callbacks(self, *keys):
+        """Get the live callbacks registered under any of the keys.
+
+        Returns every callback once when no keys are given.
+        """
+        return [callback for callback, _ in self.entries(*keys)]
+
+    def entries(self, *keys):
+        """Get (callback, context) of the live callbacks under the keys."""
+        with self._lock:
+            if keys:
+                subscriptions = [
+                    subscription for key in keys for subscription in
+                    self._subscriptions.get(key, {}).values()]
+            else:
+                subscriptions = list({
+                    subscription.subscription_id: subscription
+                    for values in self._subscriptions.values()
+                    for subscription in values.values()}.values())
+
+        entries = []
+
+        for subscription in subscriptions:
+            callback = subscription.callback
+
+            if callback is not None:
+                entries.append((callback, subscription.context))
+
+        return entries
+
+    def __contains__(self, key):
+        """Return True if any callback is registered under the key."""
+        return key in self._subscriptions
+
+    def count(self):
+        """Get the number of callbacks registered, per key."""
+        with self._lock:
+            return sum(len(subscriptions)
+                       for subscriptions in self._subscriptions.values())
+
+    def _changed(self):
+        if self._on_change:
+            self._on_change()
@@ -0,0 +1,322 @@
+"""Paged Abode timeline history backed by a local indexed store."""
+import json
+import logging
+import sqlite3
+import threading
+
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+
+META_EXHAUSTED = 'exhausted'
+META_GAPS = 'gaps'
+
+
+class AbodeTimelineHistory():
+    """Lazily page through the Abode timeline, caching every page locally."""
+
+    def __init__(self, abode, path=':memory:'):
+        """Init the timeline history with a store at path."""
+        self._abode = abode
+        self._store = TimelineStore(path)
+
+    def history(self, device_id=None, event_groups=None, event_codes=None,
+                since=None, page_size=DEFAULT_PAGE_SIZE):
+        """Iterate timeline events, newest first.
+
+        Pages are only downloaded when they are not already in the local
+        store. Events can be filtered by device_id, by TIMELINE event
+        group, by event code and by a minimum event_utc (since).
+        """
+        if event_groups is not None and not isinstance(event_groups,
+                                                       (tuple, list)):
+            event_groups = [event_groups]
+
+        if event_codes is not None and not isinstance(event_codes,
+                                                      (tuple, list)):
+            event_codes = [event_codes]
+
+        event_codes = ([str(code) for code in event_codes]
+                       if event_codes is not None else None)
+
+        def _matches(event):
+            if device_id is not None and event.get('device_id') != device_id:
+                return False
+
+            if (event_groups is not None and
+                    _event_group(event) not in event_groups):
+                return False
+
+            if (event_codes is not None and
+                    str(event.get('event_code')) not in event_codes):
+                return False
+
+            return since is None or _event_utc(event) >= since
+
+        # Catch up with events newer than anything already stored
+        fetched = set()
+
+        for event in self._sync_head(since, page_size):
+            fetched.add(str(event['id']))
+
+            if _matches(event):
+                yield event
+
+        self._sync_gaps(since, page_size)
+
+        # Serve the stored history
+        for event in self._store.query(device_id=device_id,
+                                       event_groups=event_groups,
+                                       event_codes=event_codes, since=since):
+            if str(event['id']) not in fetched:
+                yield event
+
+        # Extend the store further into the past if required
+        for event in self._sync_tail(since, page_size):
+            if _matches(event):
+                yield event
+
+    def clear(self):
+        """Remove all locally stored timeline events."""
+        self._store.clear()
+
+    @property
+    def store(self):
+        """Get the local timeline store."""
+        return self._store
+
+    def _sync_head(self, since, page_size):
+        return self._sync_from(None, since, page_size)
+
+    def _sync_gaps(self, since, page_size):
+        # Finish head syncs the caller stopped consuming early
+        for event_id in self._store.get_meta(META_GAPS) or []:
+            for _ in self._sync_from(event_id, since, page_size):
+                pass
+
+    def _sync_from(self, event_id, since, page_size):
+        stored = self._store.count() > 0
+
+        while True:
+            page = self._fetch_page(page_size, event_id)
+            new_events = [event for event in page
+                          if not self._store.contains(event['id'])]
+
+            self._store.insert(new_events)
+
+            closed = (len(new_events) < len(page) or
+                      len(page) < page_size)
+
+            if stored:
+                # Remember where the gap to the stored events continues,
+                # the caller may stop consuming before it is closed
+                self._move_gap(event_id, None if closed else page[-1]['id'])
+            elif len(page) < page_size:
+                self._store.set_meta(META_EXHAUSTED, True)
+
+            for event in new_events:
+                yield event
+
+            if closed:
+                return
+
+            if since is not None and _event_utc(page[-1]) < since:
+                return
+
+            event_id = page[-1]['id']
+
+    def _move_gap(self, event_id, next_event_id):
+        gaps = self._store.get_meta(META_GAPS) or []
+
+        if event_id in gaps:
+            gaps.remove(event_id)
+
+        if next_event_id is not None:
+            gaps.append(next_event_id)
+
+        self._store.set_meta(META_GAPS, gaps)
+
+    def _sync_tail(self, since, page_size):
+        if self._store.get_meta(META_EXHAUSTED):
+            return
+
+        while True:
+            oldest = self._store.oldest()
+
+            if oldest is None:
+                return
+
+            if since is not None and _event_utc(oldest) < since:
+                return
+
+            page = [event for event in self._fetch_page(page_size,
+                                                        oldest['id'])
+                    if not self._store.contains(event['id'])]
+
+            self._store.insert(page)
+
+            for event in page:
+                yield event
+
+            if len(page) < page_size:
+                self._store.set_meta(META_EXHAUSTED, True)
+                return
+
+    def _fetch_page(self, page_size, event_id=None):
+        url = CONST.get_timeline_url(page_size, event_id)
+
+        response = self._abode.send_request("get", url)
+        response_object = json.loads(response.text)
+
+        _LOGGER.debug("Timeline page response: %s", response.text)
+
+        if not response_object:
+            return []
+
+        if not isinstance(response_object, (tuple, list)):
+            response_object = [response_object]
+
+        return response_object
+
+
+class TimelineStore():
+    """SQLite store of timeline events indexed by time, device and code."""
+
+    def __init__(self, path=':memory:'):
+        """Init the store and its indexes."""
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS events (
+                    id TEXT PRIMARY KEY,
+                    event_utc INTEGER,
+                    device_id TEXT,
+                    event_code TEXT,
+                    event_group TEXT,
+                    json TEXT
+                );
+                CREATE INDEX IF NOT EXISTS events_utc
+                    ON events (event_utc);
+                CREATE INDEX IF NOT EXISTS events_device
+                    ON events (device_id, event_utc);
+                CREATE INDEX IF NOT EXISTS events_code
+                    ON events (event_code, event_utc);
+                CREATE INDEX IF NOT EXISTS events_group
+                    ON events (event_group, event_utc);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            ''')
+
+    def insert(self, events):
+        """Store timeline events, ignoring ones already stored."""
+        rows = [(str(event['id']), _event_utc(event), event.get('device_id'),
+                 str(event.get('event_code')), _event_group(event),
+                 json.dumps(event))
+                for event in events]
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?)',
+                rows)
+
+    def contains(self, event_id):
+        """Return True if the event is stored."""
+        with self._lock:
+            return self._connection.execute(
+                'SELECT 1 FROM events WHERE id = ?',
+                (str(event_id),)).fetchone() is not None
+
+    def count(self):
+        """Get the number of stored events."""
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM events').fetchone()[0]
+
+    def oldest(self):
+        """Get the oldest stored event."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT json FROM events '
+                'ORDER BY event_utc ASC, CAST(id AS INTEGER) ASC '
+                'LIMIT 1').fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def query(self, device_id=None, event_groups=None, event_codes=None,
+              since=None):
+        """Iterate stored events matching the filters, newest first."""
+        clauses = []
+        params = []
+
+        if device_id is not None:
+            clauses.append('device_id = ?')
+            params.append(device_id)
+
+        if event_groups is not None:
+            clauses.append('event_group IN ({})'.format(
+                ', '.join('?' * len(event_groups))))
+            params.extend(event_groups)
+
+        if event_codes is not None:
+            clauses.append('event_code IN ({})'.format(
+                ', '.join('?' * len(event_codes))))
+            params.extend(str(code) for code in event_codes)
+
+        if since is not None:
+            clauses.append('event_utc >= ?')
+            params.append(since)
+
+        sql = 'SELECT json FROM events'
+
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+
+        sql += ' ORDER BY event_utc DESC, CAST(id AS INTEGER) DESC'
+
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+
+        for row in rows:
+            yield json.loads(row[0])
+
+    def get_meta(self, key):
+        """Get a stored metadata value."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def set_meta(self, key, value):
+        """Set a stored metadata value."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                (key, json.dumps(value)))
+
+    def clear(self):
+        """Remove all stored events and metadata."""
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM events')
+            self._connection.execute('DELETE FROM meta')
+
+
+def _event_utc(event):
+    try:
+        return int(event.get('event_utc') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _event_group(event):
+    try:
+        return TIMELINE.map_event_code(event.get('event_code'))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,80 @@
+"""Optional tracing spans around Abode API calls and event dispatch."""
+import functools
+
+# Span names
+SEND_REQUEST = 'abodepy.send_request'
+LOGIN = 'abodepy.login'
+GET_DEVICES = 'abodepy.get_devices'
+SOCKETIO_EVENT = 'abodepy.socketio_event'
+DEVICE_UPDATE = 'abodepy.device_update'
+TIMELINE_UPDATE = 'abodepy.timeline_update'
+CALLBACK = 'abodepy.callback'
+
+
+class AbodeTracer():
+    """Adapter for an OpenTelemetry compatible tracer.
+
+    Any object with a start_as_current_span(name, attributes=...) context
+    manager works, e.g. opentelemetry.trace.get_tracer('abodepy'). The
+    tracer's own context handling nests the spans, so a span started for
+    a SocketIO event is the parent of the refresh request and callbacks
+    it triggers. Without a tracer every span is a shared no-op.
+    """
+
+    def __init__(self, tracer=None):
+        """Init the tracer adapter."""
+        self._tracer = tracer
+
+    def set_tracer(self, tracer=None):
+        """Set (or remove) the wrapped tracer."""
+        self._tracer = tracer
+
+    def span(self, name, attributes=None):
+        """Get a context manager for a span, yielding the span."""
+        if self._tracer is None:
+            return NULL_SPAN
+
+        if attributes:
+            attributes = {key: value for key, value in attributes.items()
+                          if value is not None}
+
+        return self._tracer.start_as_current_span(name,
+                                                  attributes=attributes)
+
+    @property
+    def enabled(self):
+        """Return True if spans are being recorded."""
+        return self._tracer is not None
+
+
+def traced(name):
+    """Decorate a method of an object with a tracer property in a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class _NullSpan():
+    """No-op span and context manager."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set_attribute(self, key, value):
+        """Ignore the attribute."""
+
+    def is_recording(self):
+        """Never recording."""
+        return False
+
+
+NULL_SPAN = _NullSpan()
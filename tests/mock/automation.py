@@ -5,7 +5,7 @@ def get_response_ok(name, enabled, aid):
     """Return automation json."""
     return '''{
         "name": "''' + name + '''",
-        "enabled": "''' + str(enabled) + '''",
+        "enabled": ''' + str(enabled).lower() + ''',
         "version": 2,
         "id": "''' + aid + '''",
         "subType": "",
@@ -21,4 +21,8 @@ def device(area='1', panel=PANEL.get_response_ok(mode=CONST.MODE_STANDBY)):
     alarm['generic_type'] = CONST.TYPE_ALARM
     alarm['uuid'] = alarm.get('mac').replace(':', '').lower()
 
+    if area != '1':
+        alarm['name'] += ' Area ' + area
+        alarm['uuid'] += '_' + area
+
     return alarm
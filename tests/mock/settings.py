@@ -0,0 +1,49 @@
+"""Mock Abode Settings Responses."""
+
+import abodepy.helpers.constants as CONST
+
+
+def get_settings_response_ok(resolution=CONST.SETTING_CAMERA_RES_640_480,
+                             grayscale=CONST.SETTING_DISABLE,
+                             beeper_mute=CONST.SETTING_DISABLE):
+    """Return panel settings response json."""
+    return '''{
+       "ircamera_resolution_t":"''' + resolution + '''",
+       "ircamera_gray_t":"''' + grayscale + '''",
+       "beeper_mute":"''' + beeper_mute + '''"
+    }'''
+
+
+def get_areas_response_ok(
+        away_entry_delay=CONST.SETTING_ENTRY_EXIT_DELAY_30SEC,
+        away_exit_delay=CONST.SETTING_ENTRY_EXIT_DELAY_1MIN):
+    """Return areas response json."""
+    return '''[{
+       "area":"1",
+       "away_entry_delay":"''' + away_entry_delay + '''",
+       "away_exit_delay":"''' + away_exit_delay + '''",
+       "home_entry_delay":"30",
+       "home_exit_delay":"0"
+    }, {
+       "area":"2",
+       "away_entry_delay":"10",
+       "away_exit_delay":"30",
+       "home_entry_delay":"10",
+       "home_exit_delay":"0"
+    }]'''
+
+
+def get_sounds_response_ok(door_chime=CONST.SETTING_SOUND_LOW):
+    """Return sounds response json."""
+    return '''[{
+       "area":"1",
+       "door_chime":"''' + door_chime + '''",
+       "warning_beep":"normal",
+       "entry_beep_away":"loud",
+       "exit_beep_away":"loud",
+       "entry_beep_home":"normal",
+       "exit_beep_home":"none",
+       "confirm_snd":"normal",
+       "alarm_len":"180",
+       "final_beep":"3"
+    }]'''
@@ -147,8 +147,10 @@ class TestAbode(unittest.TestCase):
         self.assertEqual(abode._user, json.loads(user_json))
         self.assertIsNotNone(abode._panel)
 
-        # Contains one device, our alarm
-        self.assertEqual(abode._devices, {'area_1': abode.get_alarm()})
+        # Contains two devices, our alarms for both panel areas
+        self.assertEqual(dict(abode.device_snapshot.devices),
+                         {'area_1': abode.get_alarm(),
+                          'area_2': abode.get_alarm('2')})
 
         # Contains no automations
         self.assertEqual(abode._automations, {})
@@ -536,6 +538,76 @@ class TestAbode(unittest.TestCase):
             self.abode.set_setting(CONST.SETTING_SIREN_TAMPER_SOUNDS,
                                    "foobar")
 
+    @requests_mock.mock()
+    def tests_batch_settings(self, m):
+        """Check that settings are merged into one request per endpoint."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+        m.put(CONST.SETTINGS_URL, text=MOCK.generic_response_ok())
+        m.put(CONST.AREAS_URL, text=MOCK.generic_response_ok())
+        m.put(CONST.SOUNDS_URL, status_code=400, text='{}')
+        m.put(CONST.SIREN_URL, text=MOCK.generic_response_ok())
+
+        self.abode.login()
+        count = m.call_count
+
+        # Invalid values fail before anything is sent
+        with self.assertRaises(abodepy.AbodeException):
+            self.abode.set_settings({
+                CONST.SETTING_CAMERA_GRAYSCALE: CONST.SETTING_ENABLE,
+                CONST.SETTING_EXIT_DELAY_AWAY: "foobar"})
+
+        self.assertEqual(m.call_count, count)
+
+        results = self.abode.set_settings([
+            (CONST.SETTING_CAMERA_GRAYSCALE, CONST.SETTING_ENABLE),
+            (CONST.SETTING_SILENCE_SOUNDS, CONST.SETTING_ENABLE),
+            (CONST.SETTING_ENTRY_DELAY_AWAY,
+             CONST.SETTING_ENTRY_EXIT_DELAY_10SEC),
+            (CONST.SETTING_EXIT_DELAY_AWAY,
+             CONST.SETTING_ENTRY_EXIT_DELAY_30SEC),
+            (CONST.SETTING_ENTRY_DELAY_HOME,
+             CONST.SETTING_ENTRY_EXIT_DELAY_20SEC, '2'),
+            (CONST.SETTING_DOOR_CHIME, CONST.SETTING_SOUND_LOW),
+            (CONST.SETTING_SIREN_TAMPER_SOUNDS, CONST.SETTING_ENABLE),
+            (CONST.SETTING_SIREN_CONFIRM_SOUNDS, CONST.SETTING_DISABLE)])
+
+        self.assertEqual([result.success for result in results],
+                         [True, True, True, True, True, False, True, True])
+        self.assertEqual(results[4].area, '2')
+        self.assertIsInstance(results[5].error, abodepy.AbodeException)
+
+        puts = [request for request in m.request_history
+                if request.method == 'PUT']
+        payloads = sorted((request.url, json.dumps(request.json(),
+                                                   sort_keys=True))
+                          for request in puts
+                          if request.url != CONST.SOUNDS_URL)
+
+        self.assertEqual(payloads, sorted([
+            (CONST.SETTINGS_URL, json.dumps({
+                CONST.SETTING_CAMERA_GRAYSCALE: CONST.SETTING_ENABLE,
+                CONST.SETTING_SILENCE_SOUNDS: CONST.SETTING_ENABLE},
+                sort_keys=True)),
+            (CONST.AREAS_URL, json.dumps({
+                'area': '1',
+                CONST.SETTING_ENTRY_DELAY_AWAY:
+                    CONST.SETTING_ENTRY_EXIT_DELAY_10SEC,
+                CONST.SETTING_EXIT_DELAY_AWAY:
+                    CONST.SETTING_ENTRY_EXIT_DELAY_30SEC}, sort_keys=True)),
+            (CONST.AREAS_URL, json.dumps({
+                'area': '2',
+                CONST.SETTING_ENTRY_DELAY_HOME:
+                    CONST.SETTING_ENTRY_EXIT_DELAY_20SEC}, sort_keys=True)),
+            (CONST.SIREN_URL, json.dumps({
+                'action': CONST.SETTING_SIREN_TAMPER_SOUNDS,
+                'option': CONST.SETTING_ENABLE}, sort_keys=True)),
+            (CONST.SIREN_URL, json.dumps({
+                'action': CONST.SETTING_SIREN_CONFIRM_SOUNDS,
+                'option': CONST.SETTING_DISABLE}, sort_keys=True))]))
+
     @requests_mock.mock()
     def tests_cookies(self, m):
         """Check that cookies are saved and loaded successfully."""
@@ -635,6 +707,9 @@ class TestAbode(unittest.TestCase):
         self.assertIsNotNone(empty_abode._cache['password'])
         self.assertIsNotNone(empty_abode._cache['uuid'])
 
+        # Cleanup cookies
+        os.remove(empty_cache_path)
+
     @requests_mock.mock()
     def test_invalid_cookies(self, m):
         """Check that empty cookies file is loaded successfully."""
@@ -671,3 +746,6 @@ class TestAbode(unittest.TestCase):
         self.assertIsNotNone(empty_abode._cache['id'])
         self.assertIsNotNone(empty_abode._cache['password'])
         self.assertIsNotNone(empty_abode._cache['uuid'])
+
+        # Cleanup cookies
+        os.remove(invalid_cache_path)
@@ -1,5 +1,7 @@
 """Test the Abode device classes."""
+import json
 import unittest
+from unittest.mock import Mock
 
 import requests_mock
 
@@ -211,3 +213,96 @@ class TestAlarm(unittest.TestCase):
 
         with self.assertRaises(abodepy.AbodeException):
             alarm.set_mode(CONST.MODE_HOME)
+
+    @requests_mock.mock()
+    def tests_multiple_areas(self, m):
+        """Check that every panel area gets its own alarm device."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.DEVICES_URL, text=DEVICES.EMPTY_DEVICE_RESPONSE)
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_AWAY))
+
+        alarm_1 = self.abode.get_alarm()
+        alarm_2 = self.abode.get_alarm('2')
+
+        self.assertEqual(self.abode.get_alarms(), [alarm_1, alarm_2])
+        self.assertEqual(alarm_2.area, '2')
+        # pylint: disable=W0212
+        self.assertEqual(alarm_2._json_state, ALARM.device(
+            area='2', panel=PANEL.get_response_ok(mode=CONST.MODE_AWAY)))
+        self.assertEqual(alarm_1.device_uuid, '001122334455')
+        self.assertEqual(alarm_2.device_uuid, '001122334455_2')
+        self.assertEqual(alarm_1.mode, CONST.MODE_AWAY)
+        self.assertEqual(alarm_2.mode, CONST.MODE_STANDBY)
+
+        # Mode events are routed by area without fetching the panel
+        count = m.call_count
+        callback = Mock()
+        events = self.abode.events
+        events.add_device_callback([alarm_1, alarm_2], callback)
+
+        events.dispatch(CONST.GATEWAY_MODE_EVENT,
+                        [{'area': '2', 'mode': CONST.MODE_HOME}])
+        callback.assert_called_once_with(alarm_2)
+        self.assertEqual(alarm_2.mode, CONST.MODE_HOME)
+        self.assertEqual(alarm_1.mode, CONST.MODE_AWAY)
+
+        events.dispatch(CONST.GATEWAY_MODE_EVENT, [CONST.MODE_STANDBY])
+        callback.assert_called_with(alarm_1)
+        self.assertEqual(alarm_1.mode, CONST.MODE_STANDBY)
+
+        # Unknown areas are ignored
+        events.dispatch(CONST.GATEWAY_MODE_EVENT, [CONST.MODE_AWAY, '7'])
+        self.assertEqual(callback.call_count, 2)
+
+        self.assertEqual(m.call_count, count)
+
+        # Refreshing keeps the areas apart
+        self.abode.get_devices(refresh=True)
+        self.assertEqual(alarm_1.mode, CONST.MODE_AWAY)
+        self.assertEqual(alarm_2.mode, CONST.MODE_STANDBY)
+        self.assertEqual(alarm_2.device_id, 'area_2')
+
+        # Panel responses naming the panel don't rename the area alarms
+        panel = json.loads(PANEL.get_response_ok(mode=CONST.MODE_AWAY))
+        panel.update(id='panel', name='Panel', uuid='panel')
+        m.get(CONST.PANEL_URL, text=json.dumps(panel))
+
+        self.abode.get_devices(refresh=True)
+        alarm_2.refresh()
+        self.assertEqual(alarm_2.device_id, 'area_2')
+        self.assertEqual(alarm_2.name, CONST.ALARM_NAME + ' Area 2')
+        self.assertEqual(alarm_2.device_uuid, '001122334455_2')
+
+    @requests_mock.mock()
+    def tests_set_modes(self, m):
+        """Check setting the mode of many areas at once."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.DEVICES_URL, text=DEVICES.EMPTY_DEVICE_RESPONSE)
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+
+        for area in ('1', '2'):
+            for mode in (CONST.MODE_AWAY, CONST.MODE_HOME):
+                m.put(CONST.get_panel_mode_url(area, mode),
+                      text=PANEL.put_response_ok(area=area, mode=mode))
+
+        results = self.abode.set_modes(CONST.MODE_AWAY)
+
+        self.assertEqual([(result.device_id, result.success)
+                          for result in results],
+                         [('area_1', True), ('area_2', True)])
+        self.assertTrue(self.abode.get_alarm().is_away)
+        self.assertTrue(self.abode.get_alarm('2').is_away)
+
+        results = self.abode.set_modes({'2': CONST.MODE_HOME})
+
+        self.assertEqual(len(results), 1)
+        self.assertTrue(self.abode.get_alarm('2').is_home)
+        self.assertTrue(self.abode.get_alarm().is_away)
+
+        with self.assertRaises(abodepy.AbodeException):
+            self.abode.set_modes({'3': CONST.MODE_HOME})
@@ -0,0 +1,149 @@
+"""Test single-flight Abode authentication."""
+import threading
+import time
+import unittest
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+OLD_TOKEN = 'web-old'
+NEW_TOKEN = 'web-new'
+
+
+def login_response(auth_token, expired_at=None):
+    """Return a login response, optionally with its token expiry."""
+    response = LOGIN.post_response_ok(auth_token)
+
+    if expired_at:
+        response = response.replace('2017-06-05 00:14:12', expired_at)
+
+    return response
+
+
+class TestAuth(unittest.TestCase):
+    """Test the AbodePy auth manager."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    @staticmethod
+    def _logins(m):
+        return [request.url for request in m.request_history].count(
+            CONST.LOGIN_URL)
+
+    @requests_mock.mock()
+    def tests_single_flight_login(self, m):
+        """Tests that requests failing together share one login."""
+        m.post(CONST.LOGIN_URL, [{'text': login_response(OLD_TOKEN)},
+                                 {'text': login_response(NEW_TOKEN)}])
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+
+        self.abode.login()
+
+        workers = 5
+
+        def panel(request, context):
+            if request.headers['ABODE-API-KEY'] == OLD_TOKEN:
+                # Every worker fails with the old token
+                time.sleep(0.1)
+                context.status_code = 403
+                return '{}'
+
+            return PANEL.get_response_ok()
+
+        m.get(CONST.PANEL_URL, text=panel)
+
+        responses = []
+
+        def request():
+            responses.append(self.abode.send_request('get', CONST.PANEL_URL))
+
+        threads = [threading.Thread(target=request) for _ in range(workers)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(responses), workers)
+        self.assertTrue(all(response.ok for response in responses))
+        self.assertEqual(self._logins(m), 2)
+        # pylint: disable=protected-access
+        self.assertEqual(self.abode._token, NEW_TOKEN)
+
+    @requests_mock.mock()
+    def tests_refresh_before_expiry(self, m):
+        """Tests that an expiring token is replaced before it is used."""
+        expired_at = time.strftime('%Y-%m-%d %H:%M:%S',
+                                   time.gmtime(time.time() + 600))
+
+        m.post(CONST.LOGIN_URL, [
+            {'text': login_response(OLD_TOKEN, expired_at)},
+            {'text': login_response(NEW_TOKEN, expired_at)}])
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+
+        self.abode.login()
+
+        # The login expiry is earlier than the oauth expires_in
+        # pylint: disable=protected-access
+        auth = self.abode._auth
+        self.assertAlmostEqual(auth.expires_at, time.time() + 600, delta=5)
+        generation = auth.generation
+
+        self.abode.send_request('get', CONST.PANEL_URL)
+        self.assertEqual(self._logins(m), 1)
+
+        # Inside the refresh margin the token is replaced up front
+        auth._expires_at = time.time() + CONST.AUTH_REFRESH_MARGIN / 2
+
+        self.abode.send_request('get', CONST.PANEL_URL)
+        self.assertEqual(self._logins(m), 2)
+        self.assertEqual(auth.generation, generation + 1)
+
+        panel_requests = [request for request in m.request_history
+                          if request.url == CONST.PANEL_URL]
+        self.assertEqual(len(panel_requests), 2)
+        self.assertEqual(panel_requests[-1].headers['ABODE-API-KEY'],
+                         NEW_TOKEN)
+
+    @requests_mock.mock()
+    def tests_stale_invalidate(self, m):
+        """Tests that a failure with an old token keeps the new one."""
+        m.post(CONST.LOGIN_URL, [{'text': login_response(OLD_TOKEN)},
+                                 {'text': login_response(NEW_TOKEN)}])
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+
+        # pylint: disable=protected-access
+        auth = self.abode._auth
+        old_generation = auth.ensure()
+        self.abode.login()
+        new_generation = auth.generation
+
+        auth.invalidate(old_generation)
+        self.assertEqual(self.abode._token, NEW_TOKEN)
+
+        auth.invalidate(new_generation)
+        self.assertIsNone(self.abode._token)
@@ -387,3 +387,89 @@ class TestDevice(unittest.TestCase):
 
         # Test triggering
         self.assertTrue(automation.trigger())
+
+    def tests_bulk_automations(self, m):
+        """Check that automations can be enabled and triggered in bulk."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+
+        m.get(CONST.AUTOMATION_URL, text='[' +
+              AUTOMATION.get_response_ok(
+                  name='Test Automation One', enabled=True, aid=AID_1) +
+              ',' +
+              AUTOMATION.get_response_ok(
+                  name='Test Automation Two', enabled=True, aid=AID_2) +
+              ']')
+
+        for aid in (AID_1, AID_2):
+            m.patch(str.replace(CONST.AUTOMATION_ID_URL,
+                                '$AUTOMATIONID$', aid),
+                    text=AUTOMATION.get_response_ok(
+                        name='Test Automation', enabled=False, aid=aid))
+            m.post(str.replace(CONST.AUTOMATION_APPLY_URL,
+                               '$AUTOMATIONID$', aid),
+                   text=MOCK.generic_response_ok())
+
+        results = self.abode.enable_automations([AID_1, AID_2], False)
+
+        self.assertEqual([result.automation_id for result in results],
+                         [AID_1, AID_2])
+        self.assertTrue(all(result.success for result in results))
+        self.assertFalse(self.abode.get_automation(AID_1).is_enabled)
+        self.assertFalse(self.abode.get_automation(AID_2).is_enabled)
+
+        results = self.abode.trigger_automations(
+            [self.abode.get_automation(AID_2)])
+
+        self.assertEqual(results[0].action, 'trigger')
+        self.assertTrue(results[0].success)
+
+        with self.assertRaises(abodepy.AbodeException):
+            self.abode.trigger_automations([AID_1, AID_3])
+
+    def tests_automation_event_update(self, m):
+        """Check that automation events update the cached automations."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+
+        m.get(CONST.AUTOMATION_URL, text='[' +
+              AUTOMATION.get_response_ok(
+                  name='Test Automation One', enabled=True, aid=AID_1) +
+              ']')
+
+        automation = self.abode.get_automation(AID_1)
+        count = m.call_count
+
+        events = self.abode.events
+
+        events.dispatch(CONST.AUTOMATION_EVENT, [json.loads(
+            AUTOMATION.get_response_ok(
+                name='Renamed Automation', enabled=False, aid=AID_1))])
+
+        self.assertIs(self.abode.get_automation(AID_1), automation)
+        self.assertEqual(automation.name, 'Renamed Automation')
+        self.assertFalse(automation.is_enabled)
+
+        # Falsy cached fields are updated as well
+        events.dispatch(CONST.AUTOMATION_EVENT, [json.loads(
+            AUTOMATION.get_response_ok(
+                name='Renamed Automation', enabled=True, aid=AID_1))])
+
+        self.assertTrue(automation.is_enabled)
+
+        events.dispatch(CONST.AUTOMATION_EVENT, [json.loads(
+            AUTOMATION.get_response_ok(
+                name='Test Automation Two', enabled=True, aid=AID_2))])
+
+        self.assertEqual(self.abode.get_automation(AID_2).name,
+                         'Test Automation Two')
+
+        # Partial events for unknown automations are not cached
+        events.dispatch(CONST.AUTOMATION_EVENT, [{'id': AID_3}])
+        self.assertIsNone(self.abode.get_automation(AID_3))
+
+        self.assertEqual(m.call_count, count)
@@ -0,0 +1,182 @@
+"""Test batches of device commands."""
+import unittest
+from unittest.mock import Mock
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices as DEVICES
+import tests.mock.devices.dimmer as DIMMER
+import tests.mock.devices.door_lock as DOOR_LOCK
+import tests.mock.devices.power_switch_sensor as POWERSENSOR
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+
+class TestBatch(unittest.TestCase):
+    """Test the AbodePy batch commands."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    def _mock_devices(self, m):
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+        m.get(CONST.DEVICES_URL,
+              text='[' +
+              DOOR_LOCK.device(status=CONST.STATUS_LOCKOPEN) + ',' +
+              POWERSENSOR.device(status=CONST.STATUS_OFF) + ',' +
+              DIMMER.device(status=CONST.STATUS_OFF, level=0) + ']')
+
+    @requests_mock.mock()
+    def tests_execute_batch(self, m):
+        """Tests that a batch runs every command and fires callbacks."""
+        self._mock_devices(m)
+        m.put(CONST.BASE_URL + DOOR_LOCK.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=DOOR_LOCK.DEVICE_ID,
+                  status=CONST.STATUS_LOCKCLOSED_INT))
+        m.put(CONST.BASE_URL + POWERSENSOR.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=POWERSENSOR.DEVICE_ID,
+                  status=CONST.STATUS_ON_INT))
+        m.put(CONST.BASE_URL + DIMMER.CONTROL_URL,
+              text=DEVICES.level_put_response_ok(
+                  devid=DIMMER.DEVICE_ID, level='50'))
+
+        lock = self.abode.get_device(DOOR_LOCK.DEVICE_ID)
+        callback = Mock()
+        self.abode.events.add_device_callback(
+            [DOOR_LOCK.DEVICE_ID, POWERSENSOR.DEVICE_ID], callback)
+
+        results = self.abode.execute_batch([
+            (lock, 'lock'),
+            (POWERSENSOR.DEVICE_ID, 'switch_on'),
+            {'device_id': DIMMER.DEVICE_ID, 'action': 'set_level',
+             'value': 50}
+        ], max_workers=2)
+
+        self.assertEqual([result.device_id for result in results],
+                         [DOOR_LOCK.DEVICE_ID, POWERSENSOR.DEVICE_ID,
+                          DIMMER.DEVICE_ID])
+        self.assertTrue(all(result.success for result in results))
+
+        self.assertTrue(lock.is_locked)
+        self.assertTrue(self.abode.get_device(POWERSENSOR.DEVICE_ID).is_on)
+
+        self.assertEqual(callback.call_count, 2)
+
+    @requests_mock.mock()
+    def tests_batch_failures(self, m):
+        """Tests that failed commands are reported per device."""
+        self._mock_devices(m)
+        m.put(CONST.BASE_URL + DOOR_LOCK.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=DOOR_LOCK.DEVICE_ID,
+                  status=CONST.STATUS_LOCKOPEN_INT))
+        m.put(CONST.BASE_URL + POWERSENSOR.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=POWERSENSOR.DEVICE_ID,
+                  status=CONST.STATUS_OFF_INT))
+
+        results = self.abode.execute_batch([
+            (DOOR_LOCK.DEVICE_ID, 'lock'),
+            (POWERSENSOR.DEVICE_ID, 'switch_off')
+        ])
+
+        self.assertFalse(results[0].success)
+        self.assertIsInstance(results[0].error, abodepy.AbodeException)
+        self.assertFalse(self.abode.get_device(DOOR_LOCK.DEVICE_ID).is_locked)
+
+        self.assertTrue(results[1].success)
+        self.assertIsNone(results[1].error)
+
+    @requests_mock.mock()
+    def tests_batch_unexpected_errors(self, m):
+        """Tests that unexpected errors do not abort the other commands."""
+        self._mock_devices(m)
+        m.put(CONST.BASE_URL + DOOR_LOCK.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=DOOR_LOCK.DEVICE_ID,
+                  status=CONST.STATUS_LOCKCLOSED_INT))
+        m.put(CONST.BASE_URL + POWERSENSOR.CONTROL_URL, text='not json')
+
+        results = self.abode.execute_batch([
+            (POWERSENSOR.DEVICE_ID, 'switch_on'),
+            (DOOR_LOCK.DEVICE_ID, 'lock')
+        ])
+
+        self.assertFalse(results[0].success)
+        self.assertIsInstance(results[0].error, ValueError)
+
+        self.assertTrue(results[1].success)
+        self.assertTrue(self.abode.get_device(DOOR_LOCK.DEVICE_ID).is_locked)
+
+    @requests_mock.mock()
+    def tests_optimistic_batch(self, m):
+        """Tests that optimistic commands notify device callbacks once."""
+        self._mock_devices(m)
+        m.put(CONST.BASE_URL + POWERSENSOR.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=POWERSENSOR.DEVICE_ID,
+                  status=CONST.STATUS_ON_INT))
+
+        self.abode.optimistic.enable()
+        callback = Mock()
+        self.abode.events.add_device_callback(POWERSENSOR.DEVICE_ID,
+                                              callback)
+
+        try:
+            results = self.abode.execute_batch(
+                [(POWERSENSOR.DEVICE_ID, 'switch_on')])
+        finally:
+            self.abode.optimistic.disable()
+
+        self.assertTrue(results[0].success)
+        self.assertEqual(callback.call_count, 1)
+
+    @requests_mock.mock()
+    def tests_batch_validation(self, m):
+        """Tests that invalid commands fail before anything is sent."""
+        self._mock_devices(m)
+
+        self.abode.get_devices()
+        count = m.call_count
+
+        with self.assertRaises(abodepy.AbodeException):
+            self.abode.execute_batch([(DOOR_LOCK.DEVICE_ID, 'lock'),
+                                      ('ZW:unknown', 'lock')])
+
+        with self.assertRaises(abodepy.AbodeException):
+            self.abode.execute_batch([(DOOR_LOCK.DEVICE_ID, 'switch_on')])
+
+        with self.assertRaises(abodepy.AbodeException):
+            self.abode.execute_batch([(DIMMER.DEVICE_ID, 'set_level')])
+
+        with self.assertRaises(abodepy.AbodeException):
+            self.abode.execute_batch([(DIMMER.DEVICE_ID, 'refresh')])
+
+        for command in [(DIMMER.DEVICE_ID,), DIMMER.DEVICE_ID, None,
+                        ([DIMMER.DEVICE_ID], 'switch_on')]:
+            with self.assertRaises(abodepy.AbodeException):
+                self.abode.execute_batch([command])
+
+        self.assertEqual(m.call_count, count)
+        self.assertEqual(self.abode.execute_batch([]), [])
@@ -0,0 +1,147 @@
+"""Test the abodepy daemon and client."""
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+from abodepy.daemon import AbodeDaemon, AbodeDaemonClient
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices as DEVICES
+import tests.mock.devices.door_lock as DOOR_LOCK
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+
+class TestDaemon(unittest.TestCase):
+    """Test the AbodePy daemon."""
+
+    def setUp(self):
+        """Set up Abode module and a socket path."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+        self.path = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.path, 'abode.sock')
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+        shutil.rmtree(self.path)
+
+    @requests_mock.mock()
+    def tests_daemon_commands(self, m):
+        """Tests that commands sent by the client run in the daemon."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_STANDBY))
+        m.get(CONST.DEVICES_URL,
+              text=DOOR_LOCK.device(devid=DOOR_LOCK.DEVICE_ID,
+                                    status=CONST.STATUS_LOCKCLOSED))
+        m.put(CONST.BASE_URL + DOOR_LOCK.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=DOOR_LOCK.DEVICE_ID,
+                  status=CONST.STATUS_LOCKOPEN_INT))
+
+        daemon = AbodeDaemon(self.abode, self.socket_path, listen=False)
+        daemon.start()
+
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+
+        try:
+            client = AbodeDaemonClient(self.socket_path)
+
+            self.assertEqual(client.execute('mode'), CONST.MODE_STANDBY)
+            self.assertTrue(client.execute('unlock',
+                                           device_id=DOOR_LOCK.DEVICE_ID))
+            self.assertEqual(
+                client.execute('json', device_id=DOOR_LOCK.DEVICE_ID)['id'],
+                DOOR_LOCK.DEVICE_ID)
+
+            # Devices were only fetched once, when the daemon started
+            devices_calls = [request for request in m.request_history
+                             if request.url == CONST.DEVICES_URL]
+            self.assertEqual(len(devices_calls), 1)
+
+            with self.assertRaises(abodepy.AbodeException):
+                client.execute('lock', device_id='ZW:unknown')
+
+            with self.assertRaises(abodepy.AbodeException):
+                client.execute('unknown')
+
+            with self.assertRaises(abodepy.AbodeException):
+                client.execute('lock', wrong_argument=True)
+        finally:
+            daemon.stop()
+            thread.join()
+
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    @requests_mock.mock()
+    def tests_invalid_requests(self, m):
+        """Tests that malformed requests and failures become errors."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+        m.get(CONST.DEVICES_URL,
+              text=DOOR_LOCK.device(devid=DOOR_LOCK.DEVICE_ID,
+                                    status=CONST.STATUS_LOCKCLOSED))
+        m.put(CONST.BASE_URL + DOOR_LOCK.CONTROL_URL, text='not json')
+
+        daemon = AbodeDaemon(self.abode, self.socket_path, listen=False)
+
+        for line in [b'not json', b'[]', b'"mode"', b'{"command": ["mode"]}',
+                     b'{"command": "mode", "args": []}']:
+            response = daemon.execute_line(line)
+            self.assertFalse(response['ok'], line)
+            self.assertIn('error', response)
+
+        # Unexpected failures are reported instead of dropping the client
+        response = daemon.execute_line(
+            b'{"command": "unlock", "args": {"device_id": "' +
+            DOOR_LOCK.DEVICE_ID.encode() + b'"}}')
+        self.assertFalse(response['ok'])
+        self.assertIn('error', response)
+
+    def tests_client_errors(self):
+        """Tests that a missing or broken daemon raises AbodeException."""
+        client = AbodeDaemonClient(self.socket_path, timeout=5)
+
+        with self.assertRaises(abodepy.AbodeException):
+            client.execute('mode')
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen(1)
+
+        def respond():
+            connection, _ = server.accept()
+
+            with connection:
+                connection.recv(1024)
+                connection.sendall(b'garbage\n')
+
+        thread = threading.Thread(target=respond)
+        thread.start()
+
+        try:
+            with self.assertRaises(abodepy.AbodeException):
+                client.execute('mode')
+        finally:
+            thread.join()
+            server.close()
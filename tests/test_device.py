@@ -196,9 +196,9 @@ class TestDevice(unittest.TestCase):
         # Get our devices
         devices = self.abode.get_devices()
 
-        # Assert four devices - three from above + 1 alarm
+        # Assert five devices - three from above + 2 area alarms
         self.assertIsNotNone(devices)
-        self.assertEqual(len(devices), 4)
+        self.assertEqual(len(devices), 5)
 
         # Get each individual device by device ID
         psd = self.abode.get_device(POWERSENSOR.DEVICE_ID)
@@ -233,9 +233,9 @@ class TestDevice(unittest.TestCase):
         # Get our devices
         devices = self.abode.get_devices()
 
-        # Assert 1 device - skipped device above + 1 alarm
+        # Assert 2 devices - skipped device above + 2 area alarms
         self.assertIsNotNone(devices)
-        self.assertEqual(len(devices), 1)
+        self.assertEqual(len(devices), 2)
 
     @requests_mock.mock()
     def tests_device_category_filter(self, m):
@@ -0,0 +1,156 @@
+"""Test field level device change notifications."""
+import unittest
+from unittest.mock import Mock
+
+import requests_mock
+
+import abodepy
+from abodepy.devices import DeviceChange
+import abodepy.helpers.constants as CONST
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices.door_contact as DOORCONTACT
+import tests.mock.devices.lm as LM
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+DOORCONTACT_URL = str.replace(CONST.DEVICE_URL,
+                              '$DEVID$', DOORCONTACT.DEVICE_ID)
+
+
+class TestDeviceChanges(unittest.TestCase):
+    """Test the AbodePy device change notifications."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    def _mock_devices(self, m):
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_STANDBY))
+        m.get(CONST.DEVICES_URL,
+              text='[' + DOORCONTACT.device() + ',' + LM.device() + ']')
+
+    @requests_mock.mock()
+    def tests_field_callbacks(self, m):
+        """Tests that field callbacks get only the fields they watch."""
+        self._mock_devices(m)
+        m.get(DOORCONTACT_URL, [
+            {'text': DOORCONTACT.device(status=CONST.STATUS_OPEN)},
+            {'text': DOORCONTACT.device(status=CONST.STATUS_OPEN)},
+            {'text': DOORCONTACT.device(status=CONST.STATUS_OPEN,
+                                        low_battery=True)}])
+
+        door = self.abode.get_device(DOORCONTACT.DEVICE_ID)
+        events = self.abode.events
+        device_callback = Mock()
+        status_callback = Mock()
+        faults_callback = Mock()
+        events.add_device_callback(door, device_callback)
+        events.add_device_field_callback(door, 'status', status_callback)
+        events.add_device_field_callback(CONST.ALL_DEVICES, ['faults'],
+                                         faults_callback)
+
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [door.device_id])
+        status_callback.assert_called_once_with(door, {
+            'status': DeviceChange(CONST.STATUS_CLOSED, CONST.STATUS_OPEN)})
+        faults_callback.assert_not_called()
+
+        # Nothing changed, so only the device callback runs
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [door.device_id])
+        self.assertEqual(device_callback.call_count, 2)
+        self.assertEqual(status_callback.call_count, 1)
+        faults_callback.assert_not_called()
+
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [door.device_id])
+        faults_callback.assert_called_once_with(door, {
+            'faults.low_battery': DeviceChange(0, 1)})
+        self.assertEqual(status_callback.call_count, 1)
+
+    @requests_mock.mock()
+    def tests_predicate(self, m):
+        """Tests that a predicate filters the change records."""
+        self._mock_devices(m)
+
+        door = self.abode.get_device(DOORCONTACT.DEVICE_ID)
+        callback = Mock()
+
+        self.abode.events.add_device_field_callback(
+            door, 'status', callback,
+            predicate=lambda device, changes: device.is_on)
+
+        door.update({'status': CONST.STATUS_OPEN})
+        self.abode.events.notify_device(door)
+        door.update({'status': CONST.STATUS_CLOSED})
+        self.abode.events.notify_device(door)
+
+        callback.assert_called_once_with(door, {
+            'status': DeviceChange(CONST.STATUS_CLOSED, CONST.STATUS_OPEN)})
+
+    @requests_mock.mock()
+    def tests_nested_fields(self, m):
+        """Tests dotted fields and changes made before a notification."""
+        self._mock_devices(m)
+
+        sensor = self.abode.get_device(LM.DEVICE_ID)
+        alarm = self.abode.get_alarm()
+        callback = Mock()
+        mode_callback = Mock()
+        events = self.abode.events
+        events.add_device_field_callback(
+            sensor, 'statuses.temperature', callback)
+        events.add_device_field_callback(alarm, 'mode', mode_callback)
+
+        # pylint: disable=protected-access
+        sensor.update(dict(sensor._json_state, statuses=dict(
+            sensor.get_value('statuses'), temperature='73 °F')))
+        sensor.update(dict(sensor._json_state, statuses=dict(
+            sensor.get_value('statuses'), temperature='74 °F', lux='1 lx')))
+        events.notify_device(sensor)
+
+        # Changes since the last notification are folded together
+        callback.assert_called_once_with(sensor, {
+            'statuses.temperature': DeviceChange(LM.TEMP_F, '74 °F')})
+        self.assertEqual(sensor.pop_changes(), {})
+
+        events.dispatch(CONST.GATEWAY_MODE_EVENT, CONST.MODE_AWAY)
+        mode_callback.assert_called_once_with(alarm, {
+            'mode.' + alarm.device_id: DeviceChange(CONST.MODE_STANDBY,
+                                                    CONST.MODE_AWAY)})
+
+    @requests_mock.mock()
+    def tests_remove_all_callbacks(self, m):
+        """Tests that removing callbacks drops field callbacks of each."""
+        self._mock_devices(m)
+
+        door = self.abode.get_device(DOORCONTACT.DEVICE_ID)
+        sensor = self.abode.get_device(LM.DEVICE_ID)
+        events = self.abode.events
+
+        events.add_device_callback(door, Mock())
+        events.add_device_field_callback(door, 'status', Mock())
+
+        # A device with only field callbacks
+        events.add_device_field_callback(sensor, 'statuses', Mock())
+
+        self.assertTrue(events.remove_all_device_callbacks([door, sensor]))
+
+        # pylint: disable=protected-access
+        self.assertEqual(events._device_callbacks.count(), 0)
+        self.assertEqual(events._field_callbacks.count(), 0)
+
+        self.assertFalse(events.remove_all_device_callbacks(sensor))
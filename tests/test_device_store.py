@@ -0,0 +1,131 @@
+"""Test the versioned device store."""
+import threading
+import unittest
+from unittest.mock import Mock
+
+import requests_mock
+
+import abodepy
+from abodepy.device_store import AbodeDeviceStore
+import abodepy.helpers.constants as CONST
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices.door_contact as DOORCONTACT
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+
+def mock_device(device_id):
+    """Create a stand in device."""
+    return Mock(device_id=device_id)
+
+
+class TestDeviceStore(unittest.TestCase):
+    """Test the AbodePy device store."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    def tests_snapshots(self):
+        """Tests that snapshots are immutable and versioned."""
+        store = AbodeDeviceStore()
+        first = mock_device('a')
+        second = mock_device('b')
+
+        store.update([first, second])
+        snapshot = store.snapshot
+
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(store.values(), [first, second])
+
+        with self.assertRaises(TypeError):
+            snapshot.devices['c'] = mock_device('c')
+
+        self.assertIs(store.setdefault('a', mock_device('a')), first)
+        self.assertEqual(store.version, 1)
+
+        self.assertIs(store.pop('a'), first)
+        self.assertIsNone(store.pop('a'))
+        self.assertNotIn('a', store)
+        self.assertEqual(store.version, 2)
+
+        # Older snapshots keep their view
+        self.assertIs(snapshot.devices['a'], first)
+        self.assertEqual(len(snapshot.devices), 2)
+
+        store.touch()
+        self.assertEqual(store.version, 3)
+        self.assertEqual(len(store), 1)
+
+    def tests_concurrent_readers(self):
+        """Tests that readers iterate safely while writers publish."""
+        store = AbodeDeviceStore()
+        done = threading.Event()
+        errors = []
+
+        def write():
+            for index in range(2000):
+                store[str(index)] = mock_device(str(index))
+                store.pop(str(index - 10))
+
+            done.set()
+
+        def read():
+            try:
+                while not done.is_set():
+                    devices = store.snapshot.devices
+
+                    for device_id, device in devices.items():
+                        self.assertEqual(device.device_id, device_id)
+            # pylint: disable=W0703
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=write)] + [
+            threading.Thread(target=read) for _ in range(3)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(store), 10)
+
+    @requests_mock.mock()
+    def tests_version_tracks_changes(self, m):
+        """Tests that the version only moves when something changed."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_STANDBY))
+        m.get(CONST.DEVICES_URL, [
+            {'text': DOORCONTACT.device(status=CONST.STATUS_CLOSED)},
+            {'text': DOORCONTACT.device(status=CONST.STATUS_CLOSED)},
+            {'text': DOORCONTACT.device(status=CONST.STATUS_OPEN)}])
+
+        snapshot = self.abode.device_snapshot
+        door = snapshot.devices[DOORCONTACT.DEVICE_ID]
+
+        # An identical refresh publishes nothing
+        self.abode.get_devices(refresh=True)
+        self.assertIs(self.abode.device_snapshot, snapshot)
+
+        self.abode.get_devices(refresh=True)
+        self.assertGreater(self.abode.device_snapshot.version,
+                           snapshot.version)
+        self.assertTrue(door.is_on)
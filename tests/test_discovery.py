@@ -0,0 +1,211 @@
+"""Test discovery of devices added or removed after startup."""
+import threading
+import unittest
+from unittest.mock import Mock
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices.door_contact as DOORCONTACT
+import tests.mock.devices.door_lock as DOORLOCK
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+DOORCONTACT_URL = str.replace(CONST.DEVICE_URL,
+                              '$DEVID$', DOORCONTACT.DEVICE_ID)
+DOORLOCK_URL = str.replace(CONST.DEVICE_URL, '$DEVID$', DOORLOCK.DEVICE_ID)
+
+
+class TestDiscovery(unittest.TestCase):
+    """Test the AbodePy device discovery."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    def _mock_devices(self, m):
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_STANDBY))
+        m.get(CONST.DEVICES_URL, text=DOORCONTACT.device())
+
+        self.abode.get_devices()
+
+    @staticmethod
+    def _count(m, url):
+        return [request.url for request in m.request_history].count(url)
+
+    @requests_mock.mock()
+    def tests_device_added(self, m):
+        """Tests that a device update for a new device adds it."""
+        self._mock_devices(m)
+        m.get(DOORLOCK_URL, text=DOORLOCK.device())
+
+        added = Mock()
+        events = self.abode.events
+        events.add_device_added_callback(added)
+
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [DOORLOCK.DEVICE_ID])
+
+        lock = self.abode.get_device(DOORLOCK.DEVICE_ID)
+        self.assertIsNotNone(lock)
+        self.assertTrue(lock.is_locked)
+        added.assert_called_once_with(lock)
+        self.assertEqual(self._count(m, DOORLOCK_URL), 1)
+        self.assertEqual(self._count(m, CONST.DEVICES_URL), 1)
+
+        # Known now, so the next update refreshes it
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [DOORLOCK.DEVICE_ID])
+        added.assert_called_once_with(lock)
+        self.assertEqual(self._count(m, DOORLOCK_URL), 2)
+
+    @requests_mock.mock()
+    def tests_timeline_device_added(self, m):
+        """Tests that a timeline event for a new device adds it."""
+        self._mock_devices(m)
+        m.get(DOORLOCK_URL, text=DOORLOCK.device())
+
+        added = Mock()
+        self.abode.events.add_device_added_callback(added)
+
+        self.abode.events.dispatch(
+            CONST.TIMELINE_EVENT,
+            dict(TIMELINE.UNLOCKED, device_id=DOORLOCK.DEVICE_ID))
+
+        lock = self.abode.get_device(DOORLOCK.DEVICE_ID)
+        added.assert_called_once_with(lock)
+
+        # The event itself was applied to the new device
+        self.assertFalse(lock.is_locked)
+
+    @requests_mock.mock()
+    def tests_unknown_device_rate_limited(self, m):
+        """Tests that a missing device is looked up once per interval."""
+        self._mock_devices(m)
+        m.get(DOORLOCK_URL, text='[]')
+
+        added = Mock()
+        events = self.abode.events
+        events.add_device_added_callback(added)
+
+        for _ in range(3):
+            events.dispatch(CONST.DEVICE_UPDATE_EVENT, [DOORLOCK.DEVICE_ID])
+            events.dispatch(
+                CONST.TIMELINE_EVENT,
+                dict(TIMELINE.LOCKED, device_id=DOORLOCK.DEVICE_ID))
+
+        added.assert_not_called()
+        self.assertIsNone(self.abode.get_device(DOORLOCK.DEVICE_ID))
+        self.assertEqual(self._count(m, DOORLOCK_URL), 1)
+
+    @requests_mock.mock()
+    def tests_device_removed(self, m):
+        """Tests that a device Abode no longer returns is evicted."""
+        self._mock_devices(m)
+        m.get(DOORCONTACT_URL, text='[]')
+
+        door = self.abode.get_device(DOORCONTACT.DEVICE_ID)
+        removed = Mock()
+        callback = Mock()
+        events = self.abode.events
+        events.add_device_removed_callback(removed)
+        events.add_device_callback(door, callback)
+
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [door.device_id])
+
+        removed.assert_called_once_with(door)
+        callback.assert_not_called()
+        self.assertIsNone(self.abode.get_device(door.device_id))
+        self.assertNotIn(door, self.abode.get_devices())
+        self.assertEqual(self._count(m, CONST.DEVICES_URL), 1)
+
+    @requests_mock.mock()
+    def tests_device_not_found(self, m):
+        """Tests that a device Abode answers 404 for is evicted."""
+        self._mock_devices(m)
+        m.get(DOORCONTACT_URL, status_code=404, text='{}')
+
+        door = self.abode.get_device(DOORCONTACT.DEVICE_ID)
+        removed = Mock()
+        events = self.abode.events
+        events.add_device_removed_callback(removed)
+
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [door.device_id])
+
+        removed.assert_called_once_with(door)
+        self.assertIsNone(self.abode.get_device(door.device_id))
+        self.assertEqual(self._count(m, DOORCONTACT_URL), 1)
+        self.assertEqual(self._count(m, CONST.LOGIN_URL), 1)
+
+    @requests_mock.mock()
+    def tests_discover_cached_device(self, m):
+        """Tests that discovering a cached device returns it from the store."""
+        self._mock_devices(m)
+
+        door = self.abode.get_device(DOORCONTACT.DEVICE_ID)
+        requests = len(m.request_history)
+
+        # pylint: disable=protected-access
+        discovery = self.abode.events._discovery
+        self.assertIs(discovery.discover(DOORCONTACT.DEVICE_ID), door)
+        self.assertEqual(len(m.request_history), requests)
+
+    @requests_mock.mock()
+    def tests_concurrent_discovery(self, m):
+        """Tests that concurrent lookups share one request and its device."""
+        self._mock_devices(m)
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def device(request, context):
+            started.set()
+            release.wait(5)
+            return DOORLOCK.device()
+
+        m.get(DOORLOCK_URL, text=device)
+
+        added = Mock()
+        self.abode.events.add_device_added_callback(added)
+
+        # pylint: disable=protected-access
+        discovery = self.abode.events._discovery
+        results = []
+
+        def discover():
+            results.append(discovery.discover(DOORLOCK.DEVICE_ID))
+
+        threads = [threading.Thread(target=discover) for _ in range(3)]
+        threads[0].start()
+        self.assertTrue(started.wait(5))
+
+        for thread in threads[1:]:
+            thread.start()
+
+        release.set()
+
+        for thread in threads:
+            thread.join()
+
+        lock = self.abode.get_device(DOORLOCK.DEVICE_ID)
+        self.assertIsNotNone(lock)
+        self.assertEqual(results, [lock] * 3)
+        added.assert_called_once_with(lock)
+        self.assertEqual(self._count(m, DOORLOCK_URL), 1)
@@ -0,0 +1,174 @@
+"""Test the local event broker and its subscribers."""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import requests_mock
+
+import abodepy
+from abodepy.event_broker import AbodeEventBroker
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices.door_contact as DOORCONTACT
+import tests.mock.devices.ir_camera as IRCAMERA
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+TIMEOUT = 5
+
+
+class Recorder():
+    """Record callback arguments and signal each call."""
+
+    def __init__(self):
+        """Init the recorder."""
+        self.calls = []
+        self.called = threading.Event()
+
+    def __call__(self, *args):
+        """Record a call."""
+        self.calls.append(args)
+        self.called.set()
+
+    def wait(self):
+        """Wait for the next call."""
+        called = self.called.wait(TIMEOUT)
+        self.called.clear()
+        return called
+
+
+class TestEventBroker(unittest.TestCase):
+    """Test the AbodePy event broker."""
+
+    def setUp(self):
+        """Set up the owner and a subscriber."""
+        self.path = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.path, 'abode-events.sock')
+
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+        self.subscriber = abodepy.Abode(disable_cache=True,
+                                        broker_path=self.socket_path)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+        self.subscriber = None
+        shutil.rmtree(self.path)
+
+    @staticmethod
+    def _mock(m):
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_STANDBY))
+        m.get(CONST.DEVICES_URL,
+              text='[' + DOORCONTACT.device(status=CONST.STATUS_CLOSED) +
+              ',' + IRCAMERA.device() + ']')
+
+    @requests_mock.mock()
+    def tests_fan_out(self, m):
+        """Tests that subscribers follow the owner without calling Abode."""
+        self._mock(m)
+
+        broker = AbodeEventBroker(self.abode, self.socket_path, listen=False)
+        broker.start()
+
+        thread = threading.Thread(target=broker.serve_forever)
+        thread.start()
+
+        events = self.subscriber.events
+        connection = Recorder()
+        events.add_connection_status_callback('test', connection)
+
+        try:
+            requests = len(m.request_history)
+            events.start()
+
+            # Wait for the snapshot to be applied
+            alarm_callback = Recorder()
+
+            while self.subscriber._devices is None:
+                threading.Event().wait(0.01)
+
+            alarm = self.subscriber.get_alarm()
+            self.assertEqual(alarm.mode, CONST.MODE_STANDBY)
+            self.assertEqual(
+                self.subscriber.get_device(DOORCONTACT.DEVICE_ID).status,
+                CONST.STATUS_CLOSED)
+            self.assertEqual(len(self.subscriber.get_devices()),
+                             len(self.abode.get_devices()))
+
+            events.add_device_field_callback(alarm, 'mode', alarm_callback)
+
+            # The owner applies a mode change, the subscriber follows
+            self.abode.events.dispatch(CONST.GATEWAY_MODE_EVENT,
+                                       CONST.MODE_AWAY)
+            self.assertTrue(alarm_callback.wait())
+            self.assertEqual(alarm.mode, CONST.MODE_AWAY)
+
+            device, changes = alarm_callback.calls[-1]
+            self.assertIs(device, alarm)
+            self.assertEqual(changes['mode.area_1'].new, CONST.MODE_AWAY)
+
+            # Timeline events reach the subscriber's callbacks
+            timeline_callback = Recorder()
+            events.add_timeline_callback(TIMELINE.ALL, timeline_callback)
+
+            event_json = json.loads(IRCAMERA.timeline_event())
+            self.abode.events.dispatch(CONST.TIMELINE_EVENT, event_json)
+            self.assertTrue(timeline_callback.wait())
+            self.assertEqual(timeline_callback.calls[-1], (event_json,))
+
+            # The subscriber never called Abode itself
+            self.assertEqual(len(m.request_history), requests)
+            self.assertIsNone(self.subscriber._token)
+
+            # The owner's connection status is shared
+            # pylint: disable=protected-access
+            self.abode.events._on_socket_connected()
+            self.assertTrue(connection.wait())
+            self.assertTrue(events.connected)
+        finally:
+            events.stop()
+            broker.stop()
+            thread.join()
+
+            # Drops the refresh the camera timeline event scheduled
+            self.abode.events.stop()
+
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    @requests_mock.mock()
+    def tests_slow_subscriber(self, m):
+        """Tests that a subscriber falling behind is disconnected."""
+        self._mock(m)
+
+        broker = AbodeEventBroker(self.abode, self.socket_path,
+                                  queue_size=5, listen=False)
+        broker.start()
+
+        try:
+            # pylint: disable=protected-access
+            messages = broker._subscribe()
+            self.assertEqual(broker.subscribers, 1)
+
+            for _ in range(5):
+                broker.publish(CONST.TIMELINE_EVENT, {})
+
+            self.assertEqual(broker.subscribers, 0)
+            self.assertIsNone(messages.get_nowait())
+        finally:
+            broker.stop()
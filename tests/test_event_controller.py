@@ -308,6 +308,8 @@ class TestEventController(unittest.TestCase):
         events._on_device_update(None)
 
         # Test that an unknown device cleanly returns
+        m.get(str.replace(CONST.DEVICE_URL, '$DEVID$', DOORCONTACT.DEVICE_ID),
+              text='[]')
         events._on_device_update(DOORCONTACT.DEVICE_ID)
 
     def tests_events_callback(self):
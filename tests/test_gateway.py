@@ -0,0 +1,165 @@
+"""Test the local HTTP gateway."""
+import http.client
+import json
+import threading
+import unittest
+
+import requests_mock
+
+import abodepy
+from abodepy.gateway import AbodeGateway
+import abodepy.helpers.constants as CONST
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.automation as AUTOMATION
+import tests.mock.devices.door_contact as DOORCONTACT
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+AUTOMATION_ID = '47'
+
+
+class TestGateway(unittest.TestCase):
+    """Test the AbodePy gateway."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+        self.gateway = None
+        self.thread = None
+
+    def tearDown(self):
+        """Clean up after test."""
+        if self.gateway:
+            self.gateway.stop()
+
+        if self.thread:
+            self.thread.join()
+
+        self.abode = None
+
+    def start(self, m):
+        """Mock Abode and serve the gateway on a free port."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_STANDBY))
+        m.get(CONST.DEVICES_URL,
+              text=DOORCONTACT.device(status=CONST.STATUS_CLOSED))
+        m.get(CONST.AUTOMATION_URL,
+              text='[' + AUTOMATION.get_response_ok(
+                  name='Auto', enabled=True, aid=AUTOMATION_ID) + ']')
+
+        self.gateway = AbodeGateway(self.abode, port=0, listen=False)
+        self.gateway.start()
+
+        self.thread = threading.Thread(target=self.gateway.serve_forever)
+        self.thread.start()
+
+    def connect(self):
+        """Open a connection to the gateway."""
+        host, port = self.gateway.server_address
+        return http.client.HTTPConnection(host, port, timeout=5)
+
+    def get(self, path, etag=None):
+        """Get a path, returning the response and its body."""
+        connection = self.connect()
+        headers = {'If-None-Match': etag} if etag else {}
+
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+
+        return response, body
+
+    @requests_mock.mock()
+    def tests_cached_bodies(self, m):
+        """Tests that bodies are cached, tagged and invalidated."""
+        self.start(m)
+
+        response, body = self.get('/devices')
+        self.assertEqual(response.status, 200)
+        etag = response.getheader('ETag')
+
+        states = json.loads(body.decode())
+        self.assertEqual(len(states), len(self.abode.get_devices()))
+
+        # The same body object is served until something changes
+        cached = self.gateway.body('/devices')
+        self.assertIs(self.gateway.body('/devices')[1], cached[1])
+
+        response, body = self.get('/devices', etag)
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b'')
+
+        response, _ = self.get('/devices', 'W/' + etag)
+        self.assertEqual(response.status, 304)
+
+        response, body = self.get('/devices/' + DOORCONTACT.DEVICE_ID)
+        self.assertEqual(json.loads(body.decode())['id'],
+                         DOORCONTACT.DEVICE_ID)
+
+        # A mode change moves the device store on
+        self.abode.events.dispatch(CONST.GATEWAY_MODE_EVENT,
+                                   CONST.MODE_AWAY)
+
+        response, body = self.get('/devices', etag)
+        self.assertEqual(response.status, 200)
+        self.assertNotEqual(response.getheader('ETag'), etag)
+
+        response, body = self.get('/panel')
+        self.assertEqual(json.loads(body.decode())['mode']['area_1'],
+                         CONST.MODE_AWAY)
+
+        response, body = self.get('/automations/' + AUTOMATION_ID)
+        self.assertEqual(json.loads(body.decode())['name'], 'Auto')
+
+        response, _ = self.get('/devices/unknown')
+        self.assertEqual(response.status, 404)
+
+        # Automation edits drop the automation bodies
+        etag = self.get('/automations')[0].getheader('ETag')
+
+        self.abode.events.dispatch(CONST.AUTOMATION_EVENT, {
+            'id': AUTOMATION_ID, 'name': 'Renamed'})
+
+        response, body = self.get('/automations', etag)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(body.decode())[0]['name'], 'Renamed')
+
+    @requests_mock.mock()
+    def tests_event_stream(self, m):
+        """Tests that changes are streamed as Server-Sent-Events."""
+        self.start(m)
+
+        connection = self.connect()
+        connection.request('GET', '/events')
+        response = connection.getresponse()
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Type'),
+                         'text/event-stream')
+        self.assertEqual(response.readline(), b': connected\n')
+        self.assertEqual(response.readline(), b'\n')
+
+        self.abode.events.dispatch(CONST.GATEWAY_MODE_EVENT,
+                                   CONST.MODE_HOME)
+
+        self.assertEqual(response.readline(), b'id: 1\n')
+        self.assertEqual(response.readline(), b'event: device\n')
+
+        data = response.readline()
+        self.assertTrue(data.startswith(b'data: '))
+        self.assertEqual(json.loads(data[6:].decode())['id'],
+                         CONST.ALARM_DEVICE_ID + '1')
+
+        connection.close()
@@ -0,0 +1,70 @@
+"""Test that importing abodepy stays lightweight."""
+import json
+import subprocess
+import sys
+import unittest
+
+LAZY_MODULES = ['lomond', 'abodepy.socketio', 'abodepy.event_controller',
+                'abodepy.devices.camera', 'abodepy.helpers.timeline',
+                'abodepy.timeline_history', 'abodepy.batch',
+                'abodepy.panel_settings', 'abodepy.state_applier',
+                'abodepy.discovery', 'abodepy.subscriptions',
+                'abodepy.session_store', 'abodepy.event_broker',
+                'abodepy.gateway', 'abodepy.local_server', 'http.server',
+                'sqlite3', 'colorlog', 'numpy']
+
+IMPORT_SCRIPT = '''
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules": [name for name in {lazy} if name in sys.modules]
+}}))
+'''
+
+
+def measure_import(module):
+    """Import a module in a fresh interpreter, returning its import stats."""
+    output = subprocess.check_output(
+        [sys.executable, '-c',
+         IMPORT_SCRIPT.format(module=module, lazy=LAZY_MODULES)])
+
+    return json.loads(output.decode())
+
+
+class TestImport(unittest.TestCase):
+    """Test the AbodePy import footprint."""
+
+    def tests_import_abodepy(self):
+        """Tests that the SocketIO stack, camera and timeline load lazily."""
+        stats = measure_import('abodepy')
+
+        self.assertEqual(stats['modules'], [])
+
+    def tests_import_cli(self):
+        """Tests that the command line interface loads lazily."""
+        stats = measure_import('abodepy.__main__')
+
+        self.assertEqual(stats['modules'], [])
+
+    def tests_lazy_load(self):
+        """Tests that the lazy modules load on first use."""
+        import abodepy
+
+        abode = abodepy.Abode(disable_cache=True)
+
+        self.assertIsNotNone(abode.events.socketio)
+        self.assertIn('abodepy.socketio', sys.modules)
+
+
+if __name__ == '__main__':
+    # Run as a benchmark: python -m tests.test_import
+    for name in ('abodepy', 'abodepy.__main__'):
+        print('import {}: {:.1f} ms'.format(
+            name, measure_import(name)['seconds'] * 1000))
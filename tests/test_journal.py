@@ -0,0 +1,131 @@
+"""Test the Abode event journal."""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import abodepy
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+from abodepy.journal import AbodeEventJournal
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+TIMELINE_EVENT = {
+    'event_code': '5100',
+    'event_type': 'Opened',
+    'event_name': 'Front Door Opened',
+    'device_id': 'RF:00000001'
+}
+
+
+class TestEventJournal(unittest.TestCase):
+    """Test the AbodePy event journal."""
+
+    def setUp(self):
+        """Set up Abode module and a journal directory."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+        shutil.rmtree(self.path)
+
+    def tests_append_and_read(self):
+        """Tests that appended events are read back in order."""
+        journal = AbodeEventJournal(self.path)
+
+        journal.append(CONST.TIMELINE_EVENT, [TIMELINE_EVENT], timestamp=10)
+        journal.append(CONST.GATEWAY_MODE_EVENT, ['away'], timestamp=20)
+        journal.close()
+
+        # Reopen to make sure records persist
+        journal = AbodeEventJournal(self.path)
+        records = list(journal.read())
+
+        self.assertEqual(records, [
+            (10, CONST.TIMELINE_EVENT, [TIMELINE_EVENT]),
+            (20, CONST.GATEWAY_MODE_EVENT, ['away'])])
+
+        self.assertEqual(list(journal.read(start=15)),
+                         [(20, CONST.GATEWAY_MODE_EVENT, ['away'])])
+        self.assertEqual(list(journal.read(end=15)),
+                         [(10, CONST.TIMELINE_EVENT, [TIMELINE_EVENT])])
+
+        journal.close()
+
+    def tests_segments_and_retention(self):
+        """Tests that segments roll over and are retained by size and age."""
+        journal = AbodeEventJournal(self.path, segment_size=64)
+
+        for i in range(5):
+            journal.append(CONST.DEVICE_UPDATE_EVENT, ['RF:0000000' + str(i)],
+                           timestamp=i + 1)
+
+        self.assertEqual(len(journal.segments()), 5)
+        journal.close()
+
+        journal = AbodeEventJournal(self.path, segment_size=64, max_age=2)
+        journal.append(CONST.DEVICE_UPDATE_EVENT, ['RF:00000005'],
+                       timestamp=6)
+
+        timestamps = [record[0] for record in journal.read()]
+        self.assertEqual(timestamps, [4, 5, 6])
+        journal.close()
+
+        segment_size = os.path.getsize(journal.segments()[0])
+
+        journal = AbodeEventJournal(self.path, segment_size=64,
+                                    max_bytes=segment_size * 2)
+        journal.append(CONST.DEVICE_UPDATE_EVENT, ['RF:00000006'],
+                       timestamp=7)
+
+        timestamps = [record[0] for record in journal.read()]
+        self.assertEqual(timestamps, [6, 7])
+        self.assertLessEqual(journal.size, segment_size * 2)
+        journal.close()
+
+    def tests_retention_without_listing(self):
+        """Tests that segments are only listed when a segment rolls over."""
+        journal = AbodeEventJournal(self.path, max_bytes=1024, max_age=100)
+
+        with patch('os.listdir', wraps=os.listdir) as listdir:
+            for i in range(3):
+                journal.append(CONST.GATEWAY_MODE_EVENT, ['a'],
+                               timestamp=i + 1)
+
+            # Only the first append opened a segment
+            self.assertEqual(listdir.call_count, 1)
+
+        journal.close()
+
+    def tests_attach_and_replay(self):
+        """Tests that controller events are recorded and replayed."""
+        journal = AbodeEventJournal(self.path)
+        events = self.abode.events
+
+        journal.attach(events)
+
+        # pylint: disable=protected-access
+        events.socketio._handle_event(CONST.TIMELINE_EVENT, [TIMELINE_EVENT])
+
+        self.assertEqual(len(list(journal.read())), 1)
+
+        callback = Mock()
+        events.add_timeline_callback(TIMELINE.OPENED, callback)
+
+        self.assertEqual(journal.replay(events), 1)
+        callback.assert_called_with(TIMELINE_EVENT)
+
+        self.assertEqual(journal.replay(events, speed=1000.0), 1)
+        self.assertEqual(callback.call_count, 2)
+
+        self.assertFalse(events.dispatch('unknown.event', None))
+
+        journal.close()
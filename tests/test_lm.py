@@ -5,6 +5,7 @@ import requests_mock
 
 import abodepy
 import abodepy.helpers.constants as CONST
+import abodepy.sensor_history as SENSOR_HISTORY
 
 import tests.mock.login as LOGIN
 import tests.mock.oauth_claims as OAUTH_CLAIMS
@@ -64,6 +65,8 @@ class TestLM(unittest.TestCase):
         self.assertTrue(device.has_lux)
         self.assertEqual(device.temp, 72)
         self.assertEqual(device.temp_unit, '°F')
+        self.assertEqual(device.temp_fahrenheit, 72)
+        self.assertEqual(device.temp_celsius, 40 / 1.8)
         self.assertEqual(device.humidity, 34)
         self.assertEqual(device.humidity_unit, '%')
         self.assertEqual(device.lux, 14)
@@ -94,6 +97,8 @@ class TestLM(unittest.TestCase):
         self.assertTrue(device.has_lux)
         self.assertEqual(device.temp, 12)
         self.assertEqual(device.temp_unit, '°C')
+        self.assertEqual(device.temp_celsius, 12)
+        self.assertEqual(device.temp_fahrenheit, 53.6)
         self.assertEqual(device.humidity, 100)
         self.assertEqual(device.humidity_unit, '%')
         self.assertEqual(device.lux, 100)
@@ -172,3 +177,49 @@ class TestLM(unittest.TestCase):
         self.assertIsNone(device.humidity_unit)
         self.assertIsNone(device.lux)
         self.assertIsNone(device.lux_unit)
+
+    @requests_mock.mock()
+    def tests_lm_history(self, m):
+        """Tests that sensor/LM devices record reading history."""
+        # Set up URL's
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_STANDBY))
+        m.get(CONST.DEVICES_URL,
+              text=LM.device(devid=LM.DEVICE_ID,
+                             status='72 °F',
+                             temp='72 °F',
+                             lux='14 lx',
+                             humidity=''))
+
+        # Logout to reset everything
+        self.abode.logout()
+
+        # Get our sensor
+        device = self.abode.get_device(LM.DEVICE_ID)
+
+        # Test the initial readings were recorded
+        self.assertEqual(list(device.history(CONST.TEMP_STATUS_KEY).values()),
+                         [72])
+        self.assertEqual(len(device.history(CONST.HUMI_STATUS_KEY)), 0)
+        self.assertIsNone(device.history('unknown'))
+
+        # Update the device and test the new reading was recorded
+        device.update({'statuses': {'temperature': '74 °F',
+                                    'lux': '14 lx', 'humidity': ''}})
+
+        temp_history = device.history(CONST.TEMP_STATUS_KEY)
+        self.assertEqual(list(temp_history.values()), [72, 74])
+        self.assertEqual(temp_history.min(), 72)
+        self.assertEqual(temp_history.max(), 74)
+        self.assertEqual(temp_history.mean(), 73)
+
+        # Test exporting the fleet as columns
+        columns = SENSOR_HISTORY.export_columns(self.abode.get_devices(),
+                                                CONST.TEMP_STATUS_KEY)
+
+        self.assertEqual(columns['device_id'], [LM.DEVICE_ID, LM.DEVICE_ID])
+        self.assertEqual(list(columns['value']), [72, 74])
+        self.assertEqual(len(columns['timestamp']), 2)
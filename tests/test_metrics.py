@@ -0,0 +1,121 @@
+"""Test the Abode metrics registry."""
+import unittest
+from unittest.mock import Mock
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+import abodepy.metrics as METRICS
+from abodepy.metrics import MetricsRegistry
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+
+class TestMetrics(unittest.TestCase):
+    """Test the AbodePy metrics registry."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    def tests_disabled_registry(self):
+        """Tests that a disabled registry records nothing."""
+        registry = MetricsRegistry()
+
+        registry.inc(METRICS.LOGINS)
+        registry.observe(METRICS.REQUEST_SECONDS, 0.1)
+
+        with registry.timer(METRICS.CALLBACK_SECONDS):
+            pass
+
+        self.assertEqual(registry.collect(), {})
+        self.assertIsNone(registry.get(METRICS.LOGINS))
+
+    def tests_prometheus_rendering(self):
+        """Tests rendering counters and histograms as Prometheus text."""
+        registry = MetricsRegistry(enabled=True, buckets=(0.1, 1.0))
+
+        registry.inc(METRICS.LOGINS)
+        registry.inc(METRICS.LOGINS)
+        registry.observe(METRICS.REQUEST_SECONDS, 0.5, {'method': 'get'})
+        registry.set(METRICS.CALLBACKS_REGISTERED, 3, {'event': 'device'})
+
+        text = registry.render_prometheus()
+
+        self.assertIn('# TYPE abodepy_logins_total counter\n'
+                      'abodepy_logins_total 2\n', text)
+        self.assertIn('abodepy_request_seconds_bucket'
+                      '{le="0.1",method="get"} 0\n', text)
+        self.assertIn('abodepy_request_seconds_bucket'
+                      '{le="1.0",method="get"} 1\n', text)
+        self.assertIn('abodepy_request_seconds_bucket'
+                      '{le="+Inf",method="get"} 1\n', text)
+        self.assertIn('abodepy_request_seconds_count{method="get"} 1\n',
+                      text)
+        self.assertIn('abodepy_callbacks_registered{event="device"} 3\n',
+                      text)
+
+    def tests_endpoint_label(self):
+        """Tests that request URLs are reduced to endpoint templates."""
+        self.assertEqual(
+            METRICS.endpoint(CONST.DEVICE_URL.replace('$DEVID$', 'ZB:0001'),
+                             CONST.BASE_URL),
+            'api/v1/devices/{id}')
+        self.assertEqual(
+            METRICS.endpoint(CONST.get_timeline_url(10), CONST.BASE_URL),
+            'api/v1/timeline')
+        self.assertEqual(
+            METRICS.endpoint(CONST.LOGIN_URL, CONST.BASE_URL),
+            'api/auth2/login')
+
+    @requests_mock.mock()
+    def tests_abode_instrumentation(self, m):
+        """Tests that requests, logins and callbacks are instrumented."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, [{'status_code': 500, 'text': '{}'},
+                                {'text': PANEL.get_response_ok()}])
+
+        metrics = self.abode.metrics
+        metrics.enable()
+
+        self.abode.send_request('get', CONST.PANEL_URL)
+
+        self.assertEqual(metrics.get(METRICS.LOGINS), 2)
+        self.assertEqual(metrics.get(METRICS.REQUEST_RETRIES), 1)
+        self.assertEqual(metrics.get(METRICS.REQUESTS, {
+            'method': 'get', 'endpoint': 'api/v1/panel', 'status': '500'}), 1)
+        self.assertEqual(metrics.get(METRICS.REQUESTS, {
+            'method': 'get', 'endpoint': 'api/v1/panel', 'status': '200'}), 1)
+        self.assertEqual(metrics.get(METRICS.REQUEST_SECONDS, {
+            'method': 'get', 'endpoint': 'api/v1/panel'})['count'], 2)
+
+        events = self.abode.events
+        callback = Mock()
+        events.add_timeline_callback(TIMELINE.ALL, callback)
+
+        self.assertEqual(metrics.get(METRICS.CALLBACKS_REGISTERED,
+                                     {'event': 'timeline'}), 1)
+
+        # pylint: disable=protected-access
+        events._on_timeline_update({'event_code': '5100',
+                                    'event_type': 'Opened'})
+
+        self.assertEqual(metrics.get(METRICS.CALLBACK_SECONDS,
+                                     {'event': 'timeline'})['count'], 1)
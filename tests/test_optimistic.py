@@ -0,0 +1,212 @@
+"""Test optimistic device state updates."""
+import threading
+import unittest
+from unittest.mock import Mock
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices as DEVICES
+import tests.mock.devices.power_switch_sensor as POWERSENSOR
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+DEVICE_URL = str.replace(CONST.DEVICE_URL, '$DEVID$', POWERSENSOR.DEVICE_ID)
+
+
+class TestOptimistic(unittest.TestCase):
+    """Test the AbodePy optimistic device state."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True,
+                                   optimistic=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode.optimistic.disable()
+        self.abode = None
+
+    def _mock_device(self, m):
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+        m.get(CONST.DEVICES_URL,
+              text=POWERSENSOR.device(status=CONST.STATUS_OFF))
+
+    @requests_mock.mock()
+    def tests_confirmed_command(self, m):
+        """Tests that state is applied at once and confirmed later."""
+        self._mock_device(m)
+        m.put(CONST.BASE_URL + POWERSENSOR.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=POWERSENSOR.DEVICE_ID,
+                  status=CONST.STATUS_ON_INT))
+        m.get(DEVICE_URL, [
+            {'text': POWERSENSOR.device(status=CONST.STATUS_OFF)},
+            {'text': POWERSENSOR.device(status=CONST.STATUS_ON)}])
+
+        device = self.abode.get_device(POWERSENSOR.DEVICE_ID)
+        states = []
+
+        def callback(device):
+            states.append((device.status, m.call_count))
+
+        self.abode.events.add_device_callback(device.device_id, callback)
+        puts_before = m.call_count
+
+        self.assertTrue(device.switch_on())
+
+        # The callback ran with the new state before the PUT was sent
+        self.assertEqual(states, [(CONST.STATUS_ON, puts_before)])
+        self.assertEqual(self.abode.optimistic.pending(device.device_id),
+                         {'status': CONST.STATUS_ON})
+
+        # A stale refresh before the deadline keeps the expected state
+        self.abode.events.dispatch(CONST.DEVICE_UPDATE_EVENT,
+                                   [device.device_id])
+        self.assertTrue(device.is_on)
+        self.assertIsNotNone(self.abode.optimistic.pending(device.device_id))
+
+        # The refresh reporting the new state confirms it
+        self.abode.events.dispatch(CONST.DEVICE_UPDATE_EVENT,
+                                   [device.device_id])
+        self.assertTrue(device.is_on)
+        self.assertIsNone(self.abode.optimistic.pending(device.device_id))
+
+    @requests_mock.mock()
+    def tests_failed_command(self, m):
+        """Tests that a failed command restores the previous state."""
+        self._mock_device(m)
+        m.put(CONST.BASE_URL + POWERSENSOR.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=POWERSENSOR.DEVICE_ID,
+                  status=CONST.STATUS_OFF_INT))
+
+        device = self.abode.get_device(POWERSENSOR.DEVICE_ID)
+        callback = Mock()
+        self.abode.events.add_device_callback(device.device_id, callback)
+
+        with self.assertRaises(abodepy.AbodeException):
+            device.switch_on()
+
+        self.assertFalse(device.is_on)
+        self.assertEqual(callback.call_count, 2)
+        self.assertIsNone(self.abode.optimistic.pending(device.device_id))
+
+    @requests_mock.mock()
+    def tests_rollback_after_deadline(self, m):
+        """Tests the rollback when the device never reaches the state."""
+        self._mock_device(m)
+        m.put(CONST.BASE_URL + POWERSENSOR.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=POWERSENSOR.DEVICE_ID,
+                  status=CONST.STATUS_ON_INT))
+        m.get(DEVICE_URL, text=POWERSENSOR.device(status=CONST.STATUS_OFF))
+
+        device = self.abode.get_device(POWERSENSOR.DEVICE_ID)
+        rolled_back = threading.Event()
+        rollbacks = []
+
+        def rollback(device, expected, actual):
+            rollbacks.append((device.device_id, expected, actual,
+                              device.status))
+            rolled_back.set()
+
+        self.abode.optimistic.enable(timeout=0.05)
+        self.abode.optimistic.add_rollback_callback(rollback)
+
+        self.assertTrue(device.switch_on())
+        self.assertTrue(device.is_on)
+
+        self.assertTrue(rolled_back.wait(5))
+        # Callbacks already see the state the device reported
+        self.assertEqual(rollbacks, [(device.device_id,
+                                      {'status': CONST.STATUS_ON},
+                                      {'status': CONST.STATUS_OFF},
+                                      CONST.STATUS_OFF)])
+        self.assertFalse(device.is_on)
+        self.assertIsNone(self.abode.optimistic.pending(device.device_id))
+
+    @requests_mock.mock()
+    def tests_disabled(self, m):
+        """Tests that state waits for the PUT when disabled."""
+        self._mock_device(m)
+        m.put(CONST.BASE_URL + POWERSENSOR.CONTROL_URL,
+              text=DEVICES.status_put_response_ok(
+                  devid=POWERSENSOR.DEVICE_ID,
+                  status=CONST.STATUS_OFF_INT))
+
+        self.abode.optimistic.disable()
+        device = self.abode.get_device(POWERSENSOR.DEVICE_ID)
+
+        with self.assertRaises(abodepy.AbodeException):
+            device.switch_on()
+
+        self.assertFalse(device.is_on)
+        self.assertIsNone(self.abode.optimistic.pending(device.device_id))
+
+    @requests_mock.mock()
+    def tests_refresh_during_command(self, m):
+        """Tests that a refresh racing the command keeps the new state."""
+        self._mock_device(m)
+        m.get(DEVICE_URL, text=POWERSENSOR.device(status=CONST.STATUS_OFF))
+
+        device = self.abode.get_device(POWERSENSOR.DEVICE_ID)
+        optimistic = self.abode.optimistic
+
+        def command():
+            # The device_update lands while the PUT is in flight
+            self.abode.events.dispatch(CONST.DEVICE_UPDATE_EVENT,
+                                       [device.device_id])
+            return device.is_on
+
+        self.assertTrue(optimistic.execute(
+            device, {'status': CONST.STATUS_ON}, command))
+        self.assertTrue(device.is_on)
+        self.assertIsNotNone(optimistic.pending(device.device_id))
+
+    @requests_mock.mock()
+    def tests_unexpected_error(self, m):
+        """Tests that any command error rolls the state back."""
+        self._mock_device(m)
+
+        device = self.abode.get_device(POWERSENSOR.DEVICE_ID)
+        optimistic = self.abode.optimistic
+
+        def command():
+            raise RuntimeError("Connection reset")
+
+        with self.assertRaises(RuntimeError):
+            optimistic.execute(device, {'status': CONST.STATUS_ON}, command)
+
+        self.assertFalse(device.is_on)
+        self.assertIsNone(optimistic.pending(device.device_id))
+
+    @requests_mock.mock()
+    def tests_expire_removed_device(self, m):
+        """Tests that a device removed before its deadline is forgotten."""
+        self._mock_device(m)
+
+        device = self.abode.get_device(POWERSENSOR.DEVICE_ID)
+        optimistic = self.abode.optimistic
+
+        self.assertTrue(optimistic.execute(
+            device, {'status': CONST.STATUS_ON}, lambda: True))
+
+        # pylint: disable=protected-access
+        self.abode._devices.pop(device.device_id)
+        optimistic._expire(device.device_id)
+
+        self.assertIsNone(optimistic.pending(device.device_id))
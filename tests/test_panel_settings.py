@@ -0,0 +1,145 @@
+"""Test the cached panel settings."""
+import unittest
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+
+import tests.mock as MOCK
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices as DEVICES
+import tests.mock.settings as SETTINGS
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+
+class TestPanelSettings(unittest.TestCase):
+    """Test the AbodePy panel settings."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    def _mock_settings(self, m):
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+        m.get(CONST.DEVICES_URL, text=DEVICES.EMPTY_DEVICE_RESPONSE)
+        m.get(CONST.SETTINGS_URL,
+              text=SETTINGS.get_settings_response_ok(
+                  grayscale=CONST.SETTING_ENABLE))
+        m.get(CONST.AREAS_URL, text=SETTINGS.get_areas_response_ok())
+        m.get(CONST.SOUNDS_URL, text=SETTINGS.get_sounds_response_ok())
+
+    @requests_mock.mock()
+    def tests_read_settings(self, m):
+        """Tests that settings are loaded once and read from the cache."""
+        self._mock_settings(m)
+
+        settings = self.abode.panel_settings
+
+        self.assertEqual(settings.camera_resolution,
+                         CONST.SETTING_CAMERA_RES_640_480)
+        count = m.call_count
+
+        self.assertTrue(settings.camera_grayscale)
+        self.assertFalse(settings.sounds_silenced)
+        self.assertEqual(settings.entry_delay(), 30)
+        self.assertEqual(settings.exit_delay(CONST.MODE_HOME), 0)
+        self.assertEqual(settings.exit_delay(area='2'), 30)
+        self.assertEqual(settings.get(CONST.SETTING_DOOR_CHIME),
+                         CONST.SETTING_SOUND_LOW)
+        self.assertIsNone(settings.get(CONST.SETTING_DOOR_CHIME, '2'))
+        self.assertEqual(settings.mode(), CONST.MODE_STANDBY)
+
+        area_2 = settings.values('2')
+        self.assertEqual(area_2[CONST.SETTING_ENTRY_DELAY_AWAY], '10')
+        self.assertEqual(area_2[CONST.SETTING_CAMERA_GRAYSCALE],
+                         CONST.SETTING_ENABLE)
+        self.assertNotIn(CONST.SETTING_DOOR_CHIME, area_2)
+
+        self.assertEqual(m.call_count, count)
+
+    @requests_mock.mock()
+    def tests_diff_settings(self, m):
+        """Tests comparing desired settings with the cache."""
+        self._mock_settings(m)
+        m.put(CONST.SOUNDS_URL, text=MOCK.generic_response_ok())
+        m.put(CONST.SIREN_URL, text=MOCK.generic_response_ok())
+
+        settings = self.abode.panel_settings
+
+        desired = {
+            CONST.SETTING_CAMERA_GRAYSCALE: CONST.SETTING_ENABLE,
+            CONST.SETTING_ENTRY_DELAY_AWAY:
+                CONST.SETTING_ENTRY_EXIT_DELAY_30SEC,
+            CONST.SETTING_DOOR_CHIME: CONST.SETTING_SOUND_HIGH,
+            CONST.SETTING_SIREN_TAMPER_SOUNDS: CONST.SETTING_ENABLE,
+        }
+
+        drifts = settings.diff(desired)
+
+        self.assertEqual(
+            [(drift.setting, drift.area, drift.desired, drift.actual)
+             for drift in drifts],
+            [(CONST.SETTING_DOOR_CHIME, '1', CONST.SETTING_SOUND_HIGH,
+              CONST.SETTING_SOUND_LOW),
+             (CONST.SETTING_SIREN_TAMPER_SOUNDS, None, CONST.SETTING_ENABLE,
+              None)])
+
+        self.assertEqual(
+            len(settings.diff([(CONST.SETTING_ENTRY_DELAY_AWAY, '30', '2')])),
+            1)
+
+        # Writes update the cache without reloading it
+        count = m.call_count
+
+        self.abode.set_setting(CONST.SETTING_DOOR_CHIME,
+                               CONST.SETTING_SOUND_HIGH)
+        self.abode.set_settings({
+            CONST.SETTING_SIREN_TAMPER_SOUNDS: CONST.SETTING_ENABLE})
+
+        self.assertEqual(settings.diff(desired), [])
+        self.assertEqual(m.call_count, count + 2)
+
+    @requests_mock.mock()
+    def tests_settings_events(self, m):
+        """Tests that events update or invalidate the cache."""
+        self._mock_settings(m)
+
+        settings = self.abode.panel_settings
+        self.assertFalse(settings.sounds_silenced)
+
+        events = self.abode.events
+        events.dispatch(CONST.GATEWAY_MODE_EVENT, [CONST.MODE_AWAY])
+        self.assertEqual(settings.mode(), CONST.MODE_AWAY)
+
+        m.get(CONST.SETTINGS_URL,
+              text=SETTINGS.get_settings_response_ok(
+                  beeper_mute=CONST.SETTING_ENABLE))
+
+        # Unrelated timeline events keep the cache
+        events.dispatch(CONST.TIMELINE_EVENT, [{
+            'event_code': '5100', 'event_type': 'Opened'}])
+        self.assertFalse(settings.sounds_silenced)
+
+        self.assertEqual(
+            TIMELINE.map_event_code(TIMELINE.POWER_RESTORED['event_code']),
+            TIMELINE.PANEL_RESTORE_GROUP)
+
+        events.dispatch(CONST.TIMELINE_EVENT, [TIMELINE.POWER_RESTORED])
+        self.assertTrue(settings.sounds_silenced)
@@ -0,0 +1,89 @@
+"""Test the device type registry."""
+import json
+import unittest
+
+import abodepy
+from abodepy.devices.binary_sensor import AbodeBinarySensor
+from abodepy.devices.switch import AbodeSwitch
+import abodepy.devices.registry as REGISTRY
+import abodepy.helpers.constants as CONST
+
+import tests.mock.devices.glass as GLASS
+import tests.mock.devices.unknown as UNKNOWN
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+CUSTOM_TYPE_TAG = 'device_type.custom_plug'
+
+
+class TestRegistry(unittest.TestCase):
+    """Test the AbodePy device type registry."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+        # pylint: disable=protected-access
+        REGISTRY._REGISTRY.pop(CUSTOM_TYPE_TAG, None)
+        REGISTRY._UNKNOWN_TYPE_TAGS.discard(CUSTOM_TYPE_TAG)
+        CONST.GENERIC_TYPES.pop(CUSTOM_TYPE_TAG, None)
+
+    def tests_builtin_types(self):
+        """Tests that built in type tags map to their classes."""
+        device_type = REGISTRY.get_device_type(CONST.DEVICE_GLASS_BREAK)
+
+        self.assertEqual(device_type.generic_type, CONST.TYPE_CONNECTIVITY)
+        self.assertIs(device_type.device_class, AbodeBinarySensor)
+
+        device = abodepy.new_device(json.loads(GLASS.device()), self.abode)
+        self.assertIsInstance(device, AbodeBinarySensor)
+
+        self.assertEqual(REGISTRY.get_device_type(CONST.DEVICE_ALARM),
+                         (CONST.TYPE_ALARM, None, None))
+
+    def tests_register_device_type(self):
+        """Tests adding a type tag without patching abodepy."""
+        device_json = json.loads(UNKNOWN.device())
+        device_json['type_tag'] = CUSTOM_TYPE_TAG
+
+        with self.assertLogs('abodepy.devices.registry', 'DEBUG') as logs:
+            self.assertIsNone(abodepy.new_device(dict(device_json),
+                                                 self.abode))
+            self.assertIsNone(abodepy.new_device(dict(device_json),
+                                                 self.abode))
+
+        # Unknown type tags are only logged once
+        self.assertEqual(len(logs.output), 1)
+
+        REGISTRY.register_device_type(CUSTOM_TYPE_TAG, CONST.TYPE_SWITCH,
+                                      AbodeSwitch)
+
+        device = abodepy.new_device(dict(device_json), self.abode)
+        self.assertIsInstance(device, AbodeSwitch)
+        self.assertEqual(device.generic_type, CONST.TYPE_SWITCH)
+        self.assertEqual(CONST.get_generic_type(CUSTOM_TYPE_TAG.upper()),
+                         CONST.TYPE_SWITCH)
+
+        # Factories can pick a class from the device json
+        REGISTRY.register_device_type(
+            CUSTOM_TYPE_TAG, CONST.TYPE_CONNECTIVITY,
+            factory=lambda device_json, abode: (
+                AbodeBinarySensor(device_json, abode)
+                if device_json.get('name') else None))
+
+        self.assertIsInstance(
+            abodepy.new_device(dict(device_json), self.abode),
+            AbodeBinarySensor)
+        self.assertIsNone(
+            abodepy.new_device(dict(device_json, name=''), self.abode))
+
+        with self.assertRaises(abodepy.AbodeException):
+            REGISTRY.register_device_type(CUSTOM_TYPE_TAG, CONST.TYPE_SWITCH)
@@ -0,0 +1,51 @@
+"""Test the sensor history ring buffer."""
+import math
+import unittest
+
+from abodepy.sensor_history import SensorHistory
+
+
+class TestSensorHistory(unittest.TestCase):
+    """Test the AbodePy sensor history."""
+
+    def tests_ring_buffer(self):
+        """Tests that the oldest readings are overwritten when full."""
+        history = SensorHistory(capacity=3)
+
+        self.assertIsNone(history.latest())
+        self.assertIsNone(history.mean())
+
+        for i in range(5):
+            history.record(i, timestamp=i)
+
+        # Ignore missing readings
+        history.record(None)
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual(list(history.values()), [2, 3, 4])
+        self.assertEqual(list(history.timestamps()), [2, 3, 4])
+        self.assertEqual(history.latest(), (4, 4))
+        self.assertEqual(list(history.values(since=3)), [3, 4])
+        self.assertEqual(list(history.values(since=10)), [])
+
+        history.clear()
+        self.assertEqual(len(history), 0)
+
+    def tests_aggregation(self):
+        """Tests the aggregation helpers."""
+        history = SensorHistory(capacity=10)
+
+        for timestamp, value in ((0, 70), (10, 72), (20, 71), (20, 75)):
+            history.record(value, timestamp=timestamp)
+
+        self.assertEqual(history.min(), 70)
+        self.assertEqual(history.max(), 75)
+        self.assertEqual(history.mean(), 72)
+        self.assertEqual(history.mean(since=10), 218 / 3)
+
+        self.assertEqual(list(history.rolling_mean(2)), [71, 71.5, 73])
+        self.assertEqual(list(history.rolling_mean(5)), [])
+
+        rates = list(history.rate_of_change())
+        self.assertEqual(rates[:2], [0.2, -0.1])
+        self.assertTrue(math.isnan(rates[2]))
@@ -0,0 +1,169 @@
+"""Test the login session shared between processes."""
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests_mock
+
+import abodepy
+from abodepy.session_store import AbodeSessionStore
+import abodepy.helpers.constants as CONST
+import abodepy.utils as UTILS
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+OLD_TOKEN = 'web-old'
+NEW_TOKEN = 'web-new'
+
+
+class TestSessionStore(unittest.TestCase):
+    """Test the AbodePy session store."""
+
+    def setUp(self):
+        """Set up a shared session path."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'abode.session')
+
+    def tearDown(self):
+        """Clean up after test."""
+        shutil.rmtree(self.directory)
+
+    def worker(self):
+        """Create an Abode instance sharing the session."""
+        return abodepy.Abode(username=USERNAME,
+                             password=PASSWORD,
+                             disable_cache=True,
+                             session_path=self.path)
+
+    @staticmethod
+    def _logins(m):
+        return [request.url for request in m.request_history].count(
+            CONST.LOGIN_URL)
+
+    def tests_atomic_save(self):
+        """Tests that sessions are replaced whole and can be cleared."""
+        store = AbodeSessionStore(self.path)
+        self.assertIsNone(store.load())
+
+        with store.lock():
+            store.save({'token': OLD_TOKEN})
+
+        store.save({'token': NEW_TOKEN})
+        self.assertEqual(store.load(), {'token': NEW_TOKEN})
+
+        # No temporary files are left behind
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['abode.session', 'abode.session.lock'])
+
+        with open(self.path, 'wb') as handle:
+            handle.write(b'garbage')
+
+        self.assertIsNone(store.load())
+
+        store.clear()
+        store.clear()
+        self.assertFalse(os.path.exists(self.path))
+
+    @requests_mock.mock()
+    def tests_shared_login(self, m):
+        """Tests that workers share one login and one re-login."""
+        m.post(CONST.LOGIN_URL, [
+            {'text': LOGIN.post_response_ok(OLD_TOKEN)},
+            {'text': LOGIN.post_response_ok(NEW_TOKEN)}])
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+
+        expired = set()
+
+        def panel(request, context):
+            if request.headers['ABODE-API-KEY'] in expired:
+                context.status_code = 403
+                return '{}'
+
+            return PANEL.get_response_ok()
+
+        m.get(CONST.PANEL_URL, text=panel)
+
+        workers = [self.worker() for _ in range(3)]
+
+        for worker in workers:
+            worker.send_request('get', CONST.PANEL_URL)
+
+        self.assertEqual(self._logins(m), 1)
+
+        # pylint: disable=protected-access
+        self.assertTrue(all(worker._token == OLD_TOKEN
+                            for worker in workers))
+
+        # The first worker to fail logs in again, the others adopt it
+        expired.add(OLD_TOKEN)
+
+        for worker in workers:
+            self.assertTrue(worker.send_request('get', CONST.PANEL_URL).ok)
+
+        self.assertEqual(self._logins(m), 2)
+        self.assertTrue(all(worker._token == NEW_TOKEN
+                            for worker in workers))
+
+        # A new worker starts with the shared session
+        late = self.worker()
+        late.send_request('get', CONST.PANEL_URL)
+        self.assertEqual(self._logins(m), 2)
+
+        # Logging out removes the session for everyone
+        late.logout()
+        self.assertIsNone(AbodeSessionStore(self.path).load())
+
+    @requests_mock.mock()
+    def tests_other_account(self, m):
+        """Tests that a session of another account is not adopted."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok(NEW_TOKEN))
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+
+        AbodeSessionStore(self.path).save({
+            'username': 'someone-else',
+            'token': OLD_TOKEN
+        })
+
+        abode = self.worker()
+        abode.login()
+
+        self.assertEqual(self._logins(m), 1)
+        self.assertEqual(AbodeSessionStore(self.path).load()['token'],
+                         NEW_TOKEN)
+
+    @requests_mock.mock()
+    def tests_explicit_login(self, m):
+        """Tests that explicit logins share the stored session."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok(OLD_TOKEN))
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+
+        cache_path = os.path.join(self.directory, 'abode.pickle')
+        workers = [abodepy.Abode(username=USERNAME,
+                                 password=PASSWORD,
+                                 cache_path=cache_path,
+                                 session_path=self.path)
+                   for _ in range(2)]
+
+        # pylint: disable=protected-access
+        workers[0]._session.cookies.set('SESSION', 'shared')
+
+        for worker in workers:
+            self.assertTrue(worker.login())
+
+        self.assertEqual(self._logins(m), 1)
+        self.assertTrue(all(worker._token == OLD_TOKEN
+                            for worker in workers))
+        self.assertEqual(workers[1]._session.cookies.get('SESSION'),
+                         'shared')
+
+        # The cookies live in the session store, not the shared cache
+        self.assertIsNone(UTILS.load_cache(cache_path)[CONST.COOKIES])
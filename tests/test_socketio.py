@@ -0,0 +1,93 @@
+"""Test the SocketIO client."""
+import unittest
+from unittest.mock import Mock
+
+from lomond import events
+
+import abodepy.socketio as sio
+
+
+URL = 'wss://my.goabode.com/socket.io/'
+
+
+class TestSocketIO(unittest.TestCase):
+    """Test the AbodePy SocketIO client."""
+
+    def setUp(self):
+        """Set up SocketIO client."""
+        self.socketio = sio.SocketIO(url=URL, compress=True)
+        # pylint: disable=protected-access
+        self.socketio._websocket = Mock()
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.socketio = None
+
+    def tests_text_event(self):
+        """Tests that text event frames are dispatched and counted."""
+        callback = Mock()
+        self.socketio.on('com.goabode.device.update', callback)
+
+        text = '42["com.goabode.device.update","RF:00000001"]'
+
+        # pylint: disable=protected-access
+        self.socketio._on_websocket_text(events.Text(text))
+
+        callback.assert_called_with(['RF:00000001'])
+
+        stats = self.socketio.stats
+        self.assertEqual(stats[sio.FRAMES_RECEIVED], 1)
+        self.assertEqual(stats[sio.TEXT_FRAMES_RECEIVED], 1)
+        self.assertEqual(stats[sio.BYTES_RECEIVED], len(text))
+
+    def tests_binary_event(self):
+        """Tests that binary events are reassembled from attachments."""
+        callback = Mock()
+        self.socketio.on('com.goabode.image', callback)
+
+        header = ('451-["com.goabode.image",'
+                  '{"id":"RF:00000001","data":{"_placeholder":true,"num":0}}]')
+
+        # pylint: disable=protected-access
+        self.socketio._on_websocket_text(events.Text(header))
+        callback.assert_not_called()
+
+        self.socketio._on_websocket_binary(events.Binary(b'\x04\xff\xd8'))
+
+        callback.assert_called_with(
+            [{'id': 'RF:00000001', 'data': b'\xff\xd8'}])
+
+        stats = self.socketio.stats
+        self.assertEqual(stats[sio.FRAMES_RECEIVED], 2)
+        self.assertEqual(stats[sio.BINARY_FRAMES_RECEIVED], 1)
+        self.assertEqual(stats[sio.BYTES_RECEIVED], len(header) + 3)
+
+    def tests_binary_engineio_packet(self):
+        """Tests that binary engineio packets are decoded."""
+        callback = Mock()
+        self.socketio.on(sio.PONG, callback)
+
+        # pylint: disable=protected-access
+        self.socketio._on_websocket_binary(events.Binary(b'\x03'))
+
+        callback.assert_called_with()
+
+    def tests_undecodable_binary_packet(self):
+        """Tests that binary packets which are not UTF-8 are dropped."""
+        callback = Mock()
+        self.socketio.on(sio.EVENT, callback)
+
+        # pylint: disable=protected-access
+        self.socketio._on_websocket_binary(events.Binary(b'\x04\xff\xfe'))
+
+        callback.assert_not_called()
+
+    def tests_stats_reset(self):
+        """Tests that counters reset on a new connection."""
+        # pylint: disable=protected-access
+        self.socketio._send_text(sio.PACKET_PING)
+        self.assertEqual(self.socketio.stats[sio.BYTES_SENT], 1)
+
+        self.socketio._on_websocket_connected(None)
+        self.assertEqual(self.socketio.stats[sio.BYTES_SENT], 0)
+        self.assertFalse(self.socketio.stats[sio.COMPRESSED])
@@ -0,0 +1,230 @@
+"""Test applying push events to the cached devices."""
+import threading
+import unittest
+from unittest.mock import Mock
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices.door_contact as DOORCONTACT
+import tests.mock.devices.door_lock as DOORLOCK
+import tests.mock.devices.ir_camera as IRCAMERA
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+
+def timeline_event(timeline, devid=None, **kwargs):
+    """Build a timeline event for a device."""
+    return dict(timeline, device_id=devid, **kwargs)
+
+
+class TestStateApplier(unittest.TestCase):
+    """Test the AbodePy push event state applier."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        # pylint: disable=protected-access
+        self.abode.events._applier.cancel()
+        self.abode = None
+
+    def _mock_devices(self, m):
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_STANDBY))
+        m.get(CONST.DEVICES_URL,
+              text='[' +
+              DOORCONTACT.device(status=CONST.STATUS_CLOSED) + ',' +
+              DOORLOCK.device(status=CONST.STATUS_LOCKCLOSED) + ',' +
+              IRCAMERA.device() + ']')
+
+        self.abode.get_devices()
+
+    @requests_mock.mock()
+    def tests_device_status_events(self, m):
+        """Tests that opened and unlocked events update devices in place."""
+        self._mock_devices(m)
+
+        door = self.abode.get_device(DOORCONTACT.DEVICE_ID)
+        lock = self.abode.get_device(DOORLOCK.DEVICE_ID)
+        callback = Mock()
+        events = self.abode.events
+        events.add_device_callback([door, lock], callback)
+        requests = m.call_count
+
+        events.dispatch(CONST.TIMELINE_EVENT,
+                        timeline_event(TIMELINE.OPENED, door.device_id))
+        callback.assert_called_with(door)
+        self.assertEqual(door.status, CONST.STATUS_OPEN)
+
+        events.dispatch(CONST.TIMELINE_EVENT,
+                        timeline_event(TIMELINE.UNLOCKED, lock.device_id))
+        callback.assert_called_with(lock)
+        self.assertFalse(lock.is_locked)
+
+        # The device update that follows needs no refresh at all
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [door.device_id])
+        self.assertEqual(callback.call_count, 2)
+        self.assertEqual(m.call_count, requests)
+
+        # pylint: disable=protected-access
+        self.assertNotIn(door.device_id, events._applier._scheduled)
+
+        # An update the event doesn't explain is refreshed later
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [door.device_id])
+        self.assertIn(door.device_id, events._applier._scheduled)
+
+    @requests_mock.mock()
+    def tests_deferred_refresh(self, m):
+        """Tests that updates within the window refresh once it ends."""
+        self._mock_devices(m)
+
+        device_url = str.replace(CONST.DEVICE_URL,
+                                 '$DEVID$', DOORCONTACT.DEVICE_ID)
+        m.get(device_url, text=DOORCONTACT.device(status=CONST.STATUS_OPEN,
+                                                  low_battery=True))
+
+        door = self.abode.get_device(DOORCONTACT.DEVICE_ID)
+        refreshed = threading.Event()
+        events = self.abode.events
+
+        # pylint: disable=protected-access
+        events._applier._window = 0.2
+
+        events.dispatch(CONST.TIMELINE_EVENT,
+                        timeline_event(TIMELINE.OPENED, door.device_id))
+        events.add_device_callback(door, lambda device: refreshed.set())
+
+        # Another change lands within the window of the applied event
+        for _ in range(3):
+            events.dispatch(CONST.DEVICE_UPDATE_EVENT, [door.device_id])
+
+        self.assertFalse(door.battery_low)
+        self.assertTrue(refreshed.wait(5))
+        self.assertTrue(door.battery_low)
+
+        history = [request.url for request in m.request_history]
+        self.assertEqual(history.count(device_url), 1)
+
+    @requests_mock.mock()
+    def tests_mode_events(self, m):
+        """Tests that arm and disarm events set the alarm mode."""
+        self._mock_devices(m)
+
+        alarm = self.abode.get_alarm()
+        callback = Mock()
+        self.abode.events.add_device_callback(alarm, callback)
+        requests = m.call_count
+
+        self.abode.events.dispatch(
+            CONST.TIMELINE_EVENT, timeline_event(TIMELINE.SYSTEM_ARMED_AWAY))
+        callback.assert_called_with(alarm)
+        self.assertTrue(alarm.is_away)
+
+        self.abode.events.dispatch(CONST.GATEWAY_MODE_EVENT, CONST.MODE_HOME)
+        self.assertTrue(alarm.is_home)
+
+        self.abode.events.dispatch(
+            CONST.TIMELINE_EVENT, timeline_event(TIMELINE.SYSTEM_DISARMED))
+        self.assertTrue(alarm.is_standby)
+
+        self.assertEqual(callback.call_count, 3)
+        self.assertEqual(m.call_count, requests)
+
+    @requests_mock.mock()
+    def tests_mode_event_codes(self, m):
+        """Tests that every arm and disarm event code sets the mode."""
+        self._mock_devices(m)
+
+        alarm = self.abode.get_alarm()
+        requests = m.call_count
+
+        for event_code, mode in [
+                ('1400', CONST.MODE_STANDBY), ('3400', CONST.MODE_AWAY),
+                ('1401', CONST.MODE_STANDBY), ('3401', CONST.MODE_AWAY),
+                ('1407', CONST.MODE_STANDBY), ('3407', CONST.MODE_AWAY),
+                ('1400', CONST.MODE_STANDBY), ('3456', CONST.MODE_HOME),
+                ('1400', CONST.MODE_STANDBY), ('3758', CONST.MODE_HOME),
+                ('1400', CONST.MODE_STANDBY), ('6071', CONST.MODE_AWAY),
+                ('1400', CONST.MODE_STANDBY), ('6077', CONST.MODE_HOME)]:
+            self.abode.events.dispatch(
+                CONST.TIMELINE_EVENT,
+                {'event_code': event_code, 'event_type': 'System'})
+            self.assertEqual(alarm.mode, mode, event_code)
+
+        self.assertEqual(m.call_count, requests)
+
+    @requests_mock.mock()
+    def tests_unmapped_event_refresh(self, m):
+        """Tests that an unmapped event schedules one refresh."""
+        self._mock_devices(m)
+
+        device_url = str.replace(CONST.DEVICE_URL,
+                                 '$DEVID$', DOORLOCK.DEVICE_ID)
+        m.get(device_url, text=DOORLOCK.device(status=CONST.STATUS_LOCKOPEN))
+
+        lock = self.abode.get_device(DOORLOCK.DEVICE_ID)
+        refreshed = threading.Event()
+        self.abode.events.add_device_callback(
+            lock, lambda device: refreshed.set())
+
+        # pylint: disable=protected-access
+        self.abode.events._applier._refresh_delay = 0.05
+
+        # A lock can't be opened, so the event is not applied
+        for _ in range(3):
+            self.abode.events.dispatch(
+                CONST.TIMELINE_EVENT,
+                timeline_event(TIMELINE.OPENED, lock.device_id))
+
+        self.assertTrue(lock.is_locked)
+        self.assertTrue(refreshed.wait(5))
+        self.assertFalse(lock.is_locked)
+
+        history = [request.url for request in m.request_history]
+        self.assertEqual(history.count(device_url), 1)
+
+    @requests_mock.mock()
+    def tests_device_update_cancels_refresh(self, m):
+        """Tests that a device update drops the scheduled refresh."""
+        self._mock_devices(m)
+
+        device_url = str.replace(CONST.DEVICE_URL,
+                                 '$DEVID$', IRCAMERA.DEVICE_ID)
+        m.get(device_url, text=IRCAMERA.device())
+
+        events = self.abode.events
+
+        events.dispatch(CONST.TIMELINE_EVENT,
+                        timeline_event(TIMELINE.CAPTURE_IMAGE,
+                                       IRCAMERA.DEVICE_ID))
+        # pylint: disable=protected-access
+        self.assertIn(IRCAMERA.DEVICE_ID, events._applier._scheduled)
+
+        events.dispatch(CONST.DEVICE_UPDATE_EVENT, [IRCAMERA.DEVICE_ID])
+        self.assertNotIn(IRCAMERA.DEVICE_ID, events._applier._scheduled)
+
+        # Refreshed just now, so no new refresh is scheduled
+        events.dispatch(CONST.TIMELINE_EVENT,
+                        timeline_event(TIMELINE.CAPTURE_IMAGE,
+                                       IRCAMERA.DEVICE_ID))
+        self.assertNotIn(IRCAMERA.DEVICE_ID, events._applier._scheduled)
+
+        history = [request.url for request in m.request_history]
+        self.assertEqual(history.count(device_url), 1)
@@ -0,0 +1,159 @@
+"""Test callback subscriptions."""
+import gc
+import unittest
+from unittest.mock import Mock
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+from abodepy.subscriptions import SubscriptionRegistry
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices.door_contact as DOORCONTACT
+import tests.mock.devices.door_lock as DOORLOCK
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+
+class Listener():
+    """Object with a bound method callback."""
+
+    def __init__(self):
+        """Init the listener."""
+        self.calls = []
+
+    def on_update(self, value):
+        """Record an update."""
+        self.calls.append(value)
+
+
+class TestSubscriptions(unittest.TestCase):
+    """Test the AbodePy subscription registry."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    def tests_registry_cancel(self):
+        """Tests that a handle cancels its callback on every key."""
+        changes = Mock()
+        registry = SubscriptionRegistry(changes)
+        first = Mock()
+        second = Mock()
+
+        handle = registry.add(['a', 'b'], first)
+        registry.add(['b'], second)
+
+        self.assertTrue(handle)
+        self.assertEqual(registry.callbacks('a'), [first])
+        self.assertEqual(registry.callbacks('b'), [first, second])
+        self.assertEqual(registry.callbacks(), [first, second])
+        self.assertEqual(registry.count(), 3)
+
+        self.assertTrue(handle.cancel())
+        self.assertFalse(handle.cancel())
+        self.assertFalse(handle)
+
+        # Empty keys are dropped rather than left behind
+        self.assertNotIn('a', registry)
+        self.assertEqual(registry.callbacks('b'), [second])
+
+        self.assertTrue(registry.remove('b'))
+        self.assertFalse(registry.remove('b'))
+        self.assertEqual(registry.count(), 0)
+        self.assertEqual(changes.call_count, 4)
+
+    def tests_registry_weak_methods(self):
+        """Tests that bound methods don't keep their object alive."""
+        registry = SubscriptionRegistry()
+        listener = Listener()
+        strong = Listener()
+
+        handle = registry.add(['a'], listener.on_update, weak=True)
+        registry.add(['a'], strong.on_update)
+
+        for callback in registry.callbacks('a'):
+            callback(1)
+
+        self.assertEqual(listener.calls, [1])
+
+        del listener
+        gc.collect()
+
+        self.assertFalse(handle)
+        self.assertEqual(registry.callbacks('a'), [strong.on_update])
+        self.assertEqual(registry.count(), 1)
+
+    def tests_strong_by_default(self):
+        """Tests that callbacks of temporary objects are kept by default."""
+        events = self.abode.events
+
+        handle = events.add_device_callback(CONST.ALL_DEVICES,
+                                            Listener().on_update)
+        gc.collect()
+
+        self.assertTrue(handle)
+        # pylint: disable=protected-access
+        self.assertEqual(len(events._device_callbacks.callbacks(
+            CONST.ALL_DEVICES)), 1)
+
+    @requests_mock.mock()
+    def tests_register_without_requests(self, m):
+        """Tests that registering before the devices are fetched is local."""
+        events = self.abode.events
+        callback = Mock()
+
+        handle = events.add_device_callback(DOORLOCK.DEVICE_ID, callback)
+        self.assertTrue(handle)
+        self.assertTrue(events.remove_all_device_callbacks(
+            DOORLOCK.DEVICE_ID))
+        self.assertTrue(events.add_device_callback(CONST.ALL_DEVICES,
+                                                   callback))
+        self.assertTrue(events.add_timeline_callback(TIMELINE.ALL, callback))
+
+        self.assertEqual(m.call_count, 0)
+
+    @requests_mock.mock()
+    def tests_all_devices_callback(self, m):
+        """Tests that a wildcard subscription sees every device."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL,
+              text=PANEL.get_response_ok(mode=CONST.MODE_STANDBY))
+        m.get(CONST.DEVICES_URL,
+              text='[' + DOORCONTACT.device() + ',' +
+              DOORLOCK.device() + ']')
+
+        events = self.abode.events
+        callback = Mock()
+        handle = events.add_device_callback(CONST.ALL_DEVICES, callback)
+
+        door = self.abode.get_device(DOORCONTACT.DEVICE_ID)
+        lock = self.abode.get_device(DOORLOCK.DEVICE_ID)
+
+        events.dispatch(CONST.TIMELINE_EVENT,
+                        dict(TIMELINE.OPENED, device_id=door.device_id))
+        events.dispatch(CONST.TIMELINE_EVENT,
+                        dict(TIMELINE.UNLOCKED, device_id=lock.device_id))
+        events.dispatch(CONST.GATEWAY_MODE_EVENT, CONST.MODE_AWAY)
+
+        self.assertEqual([args[0][0] for args in callback.call_args_list],
+                         [door, lock, self.abode.get_alarm()])
+
+        handle.cancel()
+        events.dispatch(CONST.GATEWAY_MODE_EVENT, CONST.MODE_HOME)
+        self.assertEqual(callback.call_count, 3)
@@ -0,0 +1,161 @@
+"""Test the Abode timeline history."""
+import json
+import unittest
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+import abodepy.helpers.timeline as TIMELINE
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+PAGE_SIZE = 2
+
+
+def timeline_event(event_id, event_code='5100', devid='RF:00000001'):
+    """Return a minimal timeline event dict."""
+    return {
+        'id': str(event_id),
+        'event_utc': str(1500000000 + event_id),
+        'event_code': event_code,
+        'device_id': devid,
+        'event_type': 'Opened'
+    }
+
+
+def page(*events):
+    """Return a timeline page response."""
+    return json.dumps(list(events))
+
+
+class TestTimelineHistory(unittest.TestCase):
+    """Test the AbodePy timeline history."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    @requests_mock.mock()
+    def tests_history_pages_and_caches(self, m):
+        """Tests that history pages lazily and reuses stored pages."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+
+        head = m.get(CONST.get_timeline_url(PAGE_SIZE), complete_qs=True,
+                     text=page(timeline_event(5),
+                               timeline_event(4, '1100')))
+        tail = m.get(CONST.get_timeline_url(PAGE_SIZE, '4'),
+                     complete_qs=True,
+                     text=page(timeline_event(3, devid='RF:00000002')))
+
+        timeline = self.abode.timeline
+
+        # Consuming only the first event only fetches the first page
+        events = timeline.history(page_size=PAGE_SIZE)
+        self.assertEqual(next(events)['id'], '5')
+        self.assertEqual(head.call_count, 1)
+        self.assertEqual(tail.call_count, 0)
+
+        events = list(events)
+        self.assertEqual([event['id'] for event in events], ['4', '3'])
+        self.assertEqual(tail.call_count, 1)
+        self.assertEqual(timeline.store.count(), 3)
+
+        # A second pass only checks the head page
+        events = list(timeline.history(page_size=PAGE_SIZE))
+        self.assertEqual([event['id'] for event in events], ['5', '4', '3'])
+        self.assertEqual(head.call_count, 2)
+        self.assertEqual(tail.call_count, 1)
+
+        # Filters apply to stored events
+        events = list(timeline.history(
+            event_groups=TIMELINE.ALARM_GROUP, page_size=PAGE_SIZE))
+        self.assertEqual([event['id'] for event in events], ['4'])
+
+        events = list(timeline.history(
+            device_id='RF:00000002', page_size=PAGE_SIZE))
+        self.assertEqual([event['id'] for event in events], ['3'])
+
+        events = list(timeline.history(
+            since=1500000004, page_size=PAGE_SIZE))
+        self.assertEqual([event['id'] for event in events], ['5', '4'])
+
+    @requests_mock.mock()
+    def tests_history_new_events(self, m):
+        """Tests that new events close the gap with the stored history."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+
+        m.get(CONST.get_timeline_url(PAGE_SIZE), complete_qs=True,
+              text=page(timeline_event(2), timeline_event(1)))
+        m.get(CONST.get_timeline_url(PAGE_SIZE, '1'), complete_qs=True,
+              text=page())
+
+        timeline = self.abode.timeline
+
+        events = list(timeline.history(page_size=PAGE_SIZE))
+        self.assertEqual([event['id'] for event in events], ['2', '1'])
+
+        m.get(CONST.get_timeline_url(PAGE_SIZE), complete_qs=True,
+              text=page(timeline_event(4), timeline_event(3)))
+        gap = m.get(CONST.get_timeline_url(PAGE_SIZE, '3'), complete_qs=True,
+                    text=page(timeline_event(2), timeline_event(1)))
+        tail = m.get(CONST.get_timeline_url(PAGE_SIZE, '1'),
+                     complete_qs=True, text=page())
+
+        events = list(timeline.history(page_size=PAGE_SIZE))
+        self.assertEqual([event['id'] for event in events],
+                         ['4', '3', '2', '1'])
+        self.assertEqual(gap.call_count, 1)
+
+        # The end of the timeline was already reached
+        self.assertEqual(tail.call_count, 0)
+
+    @requests_mock.mock()
+    def tests_history_resumes_gap(self, m):
+        """Tests that a head sync stopped early is resumed later."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+
+        m.get(CONST.get_timeline_url(PAGE_SIZE), complete_qs=True,
+              text=page(timeline_event(2), timeline_event(1)))
+        m.get(CONST.get_timeline_url(PAGE_SIZE, '1'), complete_qs=True,
+              text=page())
+
+        timeline = self.abode.timeline
+        list(timeline.history(page_size=PAGE_SIZE))
+
+        m.get(CONST.get_timeline_url(PAGE_SIZE), complete_qs=True,
+              text=page(timeline_event(6), timeline_event(5)))
+        gap = m.get(CONST.get_timeline_url(PAGE_SIZE, '5'), complete_qs=True,
+                    text=page(timeline_event(4), timeline_event(3)))
+        m.get(CONST.get_timeline_url(PAGE_SIZE, '3'), complete_qs=True,
+              text=page(timeline_event(2), timeline_event(1)))
+
+        # Stop after the first new event, before the gap is closed
+        events = timeline.history(page_size=PAGE_SIZE)
+        self.assertEqual(next(events)['id'], '6')
+        events.close()
+        self.assertEqual(gap.call_count, 0)
+
+        events = list(timeline.history(page_size=PAGE_SIZE))
+        self.assertEqual([event['id'] for event in events],
+                         ['6', '5', '4', '3', '2', '1'])
+        self.assertEqual(gap.call_count, 1)
+        self.assertEqual(timeline.store.count(), 6)
@@ -0,0 +1,151 @@
+"""Test the Abode tracing hooks."""
+import contextlib
+import unittest
+from unittest.mock import Mock
+
+import requests_mock
+
+import abodepy
+import abodepy.helpers.constants as CONST
+import abodepy.tracing as TRACING
+
+import tests.mock.login as LOGIN
+import tests.mock.oauth_claims as OAUTH_CLAIMS
+import tests.mock.logout as LOGOUT
+import tests.mock.panel as PANEL
+import tests.mock.devices.door_contact as DOORCONTACT
+
+
+USERNAME = 'foobar'
+PASSWORD = 'deadbeef'
+
+
+class FakeSpan():
+    """Span recording its attributes and parent."""
+
+    def __init__(self, name, attributes, parent):
+        """Init the span."""
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+
+    def set_attribute(self, key, value):
+        """Set an attribute."""
+        self.attributes[key] = value
+
+
+class FakeTracer():
+    """Tracer with the OpenTelemetry start_as_current_span interface."""
+
+    def __init__(self):
+        """Init the tracer."""
+        self.spans = []
+        self._stack = []
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        """Start a span as a child of the current span."""
+        span = FakeSpan(name, attributes,
+                        self._stack[-1] if self._stack else None)
+        self.spans.append(span)
+        self._stack.append(span)
+
+        try:
+            yield span
+        finally:
+            self._stack.pop()
+
+    def find(self, name):
+        """Get all spans with a name."""
+        return [span for span in self.spans if span.name == name]
+
+
+class TestTracing(unittest.TestCase):
+    """Test the AbodePy tracing hooks."""
+
+    def setUp(self):
+        """Set up Abode module."""
+        self.tracer = FakeTracer()
+        self.abode = abodepy.Abode(username=USERNAME,
+                                   password=PASSWORD,
+                                   disable_cache=True,
+                                   tracer=self.tracer)
+
+    def tearDown(self):
+        """Clean up after test."""
+        self.abode = None
+
+    def tests_no_tracer(self):
+        """Tests that spans are no-ops without a tracer."""
+        tracer = TRACING.AbodeTracer()
+
+        self.assertFalse(tracer.enabled)
+
+        with tracer.span(TRACING.LOGIN, {'device_id': None}) as span:
+            span.set_attribute('key', 'value')
+            self.assertFalse(span.is_recording())
+
+    @requests_mock.mock()
+    def tests_device_update_spans(self, m):
+        """Tests that a device update event traces refresh and callbacks."""
+        m.post(CONST.LOGIN_URL, text=LOGIN.post_response_ok())
+        m.get(CONST.OAUTH_TOKEN_URL, text=OAUTH_CLAIMS.get_response_ok())
+        m.post(CONST.LOGOUT_URL, text=LOGOUT.post_response_ok())
+        m.get(CONST.PANEL_URL, text=PANEL.get_response_ok())
+        m.get(CONST.DEVICES_URL, text=DOORCONTACT.device())
+        m.get(str.replace(CONST.DEVICE_URL, '$DEVID$', DOORCONTACT.DEVICE_ID),
+              text=DOORCONTACT.device(status=CONST.STATUS_OPEN))
+
+        self.abode.get_devices()
+
+        login = self.tracer.find(TRACING.LOGIN)[0]
+        self.assertEqual(login.parent.name, TRACING.GET_DEVICES)
+
+        events = self.abode.events
+        callback = Mock()
+        events.add_device_callback(DOORCONTACT.DEVICE_ID, callback)
+
+        self.tracer.spans = []
+
+        # Simulate the frame arriving from the SocketIO server
+        # pylint: disable=protected-access
+        events.socketio._handle_event(CONST.DEVICE_UPDATE_EVENT,
+                                      [DOORCONTACT.DEVICE_ID])
+
+        callback.assert_called_once()
+
+        root = self.tracer.spans[0]
+        self.assertEqual(root.name, TRACING.SOCKETIO_EVENT)
+        self.assertIsNone(root.parent)
+
+        update = self.tracer.find(TRACING.DEVICE_UPDATE)[0]
+        self.assertEqual(update.parent, root)
+        self.assertEqual(update.attributes['device_id'],
+                         DOORCONTACT.DEVICE_ID)
+
+        request = self.tracer.find(TRACING.SEND_REQUEST)[0]
+        self.assertEqual(request.parent, update)
+        self.assertEqual(request.attributes['http.status_code'], 200)
+
+        callback_span = self.tracer.find(TRACING.CALLBACK)[0]
+        self.assertEqual(callback_span.parent, update)
+        self.assertEqual(callback_span.attributes['device_id'],
+                         DOORCONTACT.DEVICE_ID)
+
+    def tests_timeline_spans(self):
+        """Tests that timeline events carry the event code."""
+        events = self.abode.events
+        events.add_timeline_callback({'event_code': '5100'}, Mock())
+
+        events.dispatch(CONST.TIMELINE_EVENT, [{
+            'event_code': '5100', 'event_type': 'Opened',
+            'device_id': DOORCONTACT.DEVICE_ID}])
+
+        timeline = self.tracer.find(TRACING.TIMELINE_UPDATE)[0]
+        self.assertEqual(timeline.attributes['event_code'], '5100')
+        self.assertEqual(timeline.attributes['device_id'],
+                         DOORCONTACT.DEVICE_ID)
+
+        callback_span = self.tracer.find(TRACING.CALLBACK)[0]
+        self.assertEqual(callback_span.parent, timeline)
+        self.assertEqual(callback_span.attributes['event_code'], '5100')